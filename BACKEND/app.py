@@ -19,6 +19,7 @@ load_dotenv()
 
 # Import database
 from db import init_db
+from services.readiness import get_readiness, start_model_loading
 
 # Import blueprints
 from routes.pdf_routes import pdf_bp
@@ -28,6 +29,8 @@ from routes.auth_routes import auth_bp
 from routes.history_routes import history_bp
 from routes.admin_routes import admin_bp
 from routes.online_books_routes import online_books_bp
+from routes.ingestion_routes import ingestion_bp
+from routes.streaming_routes import streaming_bp, sock
 
 # Check eSpeak availability at startup
 # Check if eSpeak is installed (required for phoneme generation)
@@ -81,6 +84,19 @@ def create_app():
     app.register_blueprint(history_bp, url_prefix='/api/history')  # Reading history
     app.register_blueprint(admin_bp, url_prefix='/api/admin')      # Admin endpoints
     app.register_blueprint(online_books_bp, url_prefix='/api/online-books') # Online books library
+    app.register_blueprint(ingestion_bp, url_prefix='/api/ingest')  # Background ingestion jobs
+
+    # Streaming evaluation over WebSocket (optional flask-sock)
+    if sock is not None:
+        app.register_blueprint(streaming_bp, url_prefix='/api/practice')
+        sock.init_app(app)
+    else:
+        print("[WARN] flask-sock not installed; /api/practice/stream is disabled")
+
+    # =========================
+    # MODEL LOADING (see Config.MODEL_LOADING)
+    # =========================
+    start_model_loading()
 
     # =========================
     # SIMPLE TEST ENDPOINT
@@ -107,9 +123,26 @@ def create_app():
             'status': 'healthy',
             'service': 'Dyslexia Reading Assistant API',
             'version': '1.0.0',
-            'auth': 'enabled'
+            'auth': 'enabled',
+            'ready': get_readiness().is_ready
         }
 
+    # =========================
+    # READINESS (models warm, unlike /api/health)
+    # =========================
+    @app.route('/api/ready')
+    def readiness_check():
+        report = get_readiness().report()
+        return report, 200 if report['ready'] else 503
+
+    # =========================
+    # MODEL MEMORY
+    # =========================
+    @app.route('/api/models')
+    def model_report():
+        from models.model_registry import get_model_registry
+        return get_model_registry().memory_report()
+
     # =========================
     # DEBUG ROUTES
     # =========================
@@ -129,9 +162,8 @@ def create_app():
 
 if __name__ == '__main__':
     print(">>> Starting Dyslexia Reading Assistant Backend...")
-    # Pre-loading moved to lazy load in services to avoid startup delays
-    # from services.speech_service import load_wav2vec2_model
-    # load_wav2vec2_model()
+    # Models load lazily through models/model_registry.py; gunicorn.conf.py
+    # preloads them in the master before forking workers
 
     app = create_app()
     print("API available at: http://localhost:5000")
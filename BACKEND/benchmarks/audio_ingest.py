@@ -0,0 +1,144 @@
+# backend/benchmarks/audio_ingest.py
+"""
+Memory profile of audio ingestion: services/audio_ingest.py against the
+previous path (upload.read() -> sf.read float64 -> divide -> trim ->
+astype(float32) -> processor).
+
+    python -m benchmarks.audio_ingest --seconds 10,60 --format 48000x2
+
+tracemalloc measures, per step, the peak memory allocated above what was
+live when the step started, and the overall peak of the pipeline. Peaks
+are also given as a multiple of the final 16kHz float32 clip size, i.e.
+how many clip-sized buffers were alive at once.
+"""
+import argparse
+import io
+import time
+import tracemalloc
+from contextlib import contextmanager
+from math import gcd
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+from transformers import Wav2Vec2FeatureExtractor
+from services.audio_ingest import batch_input_values, normalize_peak, read_audio
+from services.vad import get_vad
+from services.warmup import synthetic_clip
+
+MB = 1024 * 1024
+
+
+class StepTracer:
+    """Per-step and overall tracemalloc peaks (call inside tracemalloc.start/stop)"""
+
+    def __init__(self):
+        self.start, _ = tracemalloc.get_traced_memory()
+        self.peak = 0
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak - self.start)
+        self.steps.append((name, peak - baseline, (time.perf_counter() - start) * 1000))
+
+
+class _Untraced:
+    @contextmanager
+    def step(self, name):
+        yield
+
+
+def make_upload(seconds, rate, channels):
+    """A WAV upload with pauses, as the browser would send it"""
+    speech = synthetic_clip(seconds * 0.7, sample_rate=rate)
+    pause = np.zeros(int(seconds * 0.15 * rate), dtype=np.float32)
+    mono = np.concatenate([pause, speech[:len(speech) // 2], pause, speech[len(speech) // 2:]])
+    data = np.stack([mono] * channels, axis=1) * 0.5
+    buffer = io.BytesIO()
+    sf.write(buffer, data, rate, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+
+def previous_pipeline(stream, extractor, tracer):
+    with tracer.step('read upload'):
+        audio_bytes = stream.read()
+    with tracer.step('decode float64'):
+        audio, sr = sf.read(io.BytesIO(audio_bytes))
+    with tracer.step('downmix'):
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+    with tracer.step('resample'):
+        if sr != 16000:
+            divisor = gcd(sr, 16000)
+            audio = resample_poly(audio, 16000 // divisor, sr // divisor)
+    with tracer.step('normalize'):
+        audio = audio / (np.max(np.abs(audio)) + 1e-8)
+    with tracer.step('trim'):
+        indices = np.where(np.abs(audio) > 0.02)[0]
+        if len(indices):
+            audio = audio[max(0, indices[0] - 500):indices[-1] + 500]
+    with tracer.step('astype float32'):
+        audio = audio.astype(np.float32)
+    with tracer.step('feature extractor'):
+        inputs = extractor(audio, sampling_rate=16000, return_tensors='np', padding=True, return_attention_mask=True)
+    return inputs['input_values']
+
+
+def new_pipeline(stream, extractor, tracer):
+    with tracer.step('decode+downmix+resample'):
+        audio, _ = read_audio(stream)
+    with tracer.step('normalize in place'):
+        normalize_peak(audio)
+    with tracer.step('vad'):
+        audio = get_vad().remove_silence(audio)
+    with tracer.step('batch inputs'):
+        input_values, _ = batch_input_values([audio], do_normalize=extractor.do_normalize)
+    return input_values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', default='10,60')
+    parser.add_argument('--format', default='48000x2', help='<rate>x<channels> of the upload')
+    args = parser.parse_args()
+
+    rate, channels = (int(v) for v in args.format.split('x'))
+    extractor = Wav2Vec2FeatureExtractor(do_normalize=True, return_attention_mask=False)
+
+    # Untraced warm-up, so lazy imports and one-off caches are not counted
+    warmup = make_upload(1.0, rate, channels)
+    for pipeline in (previous_pipeline, new_pipeline):
+        pipeline(io.BytesIO(warmup), extractor, _Untraced())
+
+    for seconds in (float(s) for s in args.seconds.split(',')):
+        upload = make_upload(seconds, rate, channels)
+        clip_bytes = int(seconds * 16000) * 4
+        print(f"\n{seconds:.0f}s upload, {rate} Hz x{channels}: {len(upload) / MB:.1f} MB file, "
+              f"{clip_bytes / MB:.2f} MB as a 16kHz float32 clip")
+
+        results = {}
+        for name, pipeline in (('previous', previous_pipeline), ('audio_ingest', new_pipeline)):
+            stream = io.BytesIO(upload)  # stands in for the werkzeug upload stream
+            tracemalloc.start()
+            tracer = StepTracer()
+            pipeline(stream, extractor, tracer)
+            tracemalloc.stop()
+            peak = tracer.peak
+            results[name] = peak
+
+            print(f"  {name}: peak {peak / MB:.2f} MB ({peak / clip_bytes:.1f}x clip), "
+                  f"{sum(ms for _, _, ms in tracer.steps):.1f} ms")
+            for step, extra, ms in tracer.steps:
+                print(f"    {step:<26} {extra / MB:>7.2f} MB {ms:>8.1f} ms")
+
+        ratio = results['previous'] / max(1, results['audio_ingest'])
+        print(f"  peak reduction: {ratio:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# backend/benchmarks/ctc_decoding.py
+"""
+CTC decoding cost and accuracy per clip: services/ctc_decoding.py in
+'greedy', 'beam' (document language model) and 'reference' (biased to
+the expected sentence) mode.
+
+    python -m benchmarks.ctc_decoding --words 10,50,200
+
+Logits are synthetic, shaped like wav2vec2-base-960h output (50 frames
+per second, its 32-token vocabulary): each character of what the reader
+said is a peak followed by confident blanks (as wav2vec2's mostly are),
+and some characters are unclear, with a competing letter slightly ahead. Word error rates are measured against
+what was said (benchmarks.scoring.make_pair misreadings), so a decoder
+that "hears" the expected text where the reader said something else
+is penalized, not rewarded.
+"""
+import argparse
+import random
+import statistics
+import time
+import numpy as np
+from benchmarks.scoring import VOCABULARY, make_pair
+from services.ctc_decoding import MODES, CTCDecoder, DocumentLanguageModel
+from services.scoring_engine import get_scoring_engine
+
+# facebook/wav2vec2-base-960h vocabulary, by id
+LABELS = ['<pad>', '<s>', '</s>', '<unk>', '|', 'E', 'T', 'A', 'O', 'N', 'I', 'H', 'S', 'R', 'D', 'L',
+          'U', 'M', 'W', 'C', 'F', 'G', 'Y', 'P', 'B', 'V', 'K', "'", 'X', 'J', 'Q', 'Z']
+LETTERS = [i for i, label in enumerate(LABELS) if label.isalpha() and len(label) == 1]
+
+
+def make_logits(text, rng, unclear=0.15):
+    """Frames x vocabulary logits for text; unclear characters lose narrowly to another letter"""
+    ids = {label.lower(): i for i, label in enumerate(LABELS)}
+    frames = []
+    for char in text.replace(' ', '|'):
+        target = ids[char.lower()] if char != '|' else 4
+        for _ in range(rng.integers(1, 3)):
+            frame = rng.normal(0, 1, len(LABELS))
+            if target != 4 and rng.random() < unclear:
+                frame[target] += 6.0
+                frame[rng.choice(LETTERS)] += 6.5
+            else:
+                frame[target] += 10.0
+            frames.append(frame)
+        for _ in range(rng.integers(1, 4)):
+            frame = rng.normal(0, 1, len(LABELS))
+            frame[0] += 14.0
+            frames.append(frame)
+    return np.array(frames, dtype=np.float32)
+
+
+def word_error_rate(reference, hypothesis):
+    words = reference.split()
+    return get_scoring_engine().distance(words, hypothesis.split()) / max(len(words), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', default='10,50,200')
+    parser.add_argument('--clips', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--beam-width', type=int, default=16)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    noise = np.random.default_rng(0)
+    decoders = {mode: CTCDecoder(LABELS, 0, mode=mode, beam_width=args.beam_width) for mode in MODES}
+    # The "document": the clips' sentences plus unrelated text from the same vocabulary
+    for n_words in (int(w) for w in args.words.split(',')):
+        clips = []
+        for _ in range(args.clips):
+            expected, spoken = make_pair(n_words, rng)
+            clips.append((expected, spoken, make_logits(spoken, noise)))
+        document = DocumentLanguageModel(
+            [e.split() for e, _, _ in clips] + [rng.choices(VOCABULARY, k=20) for _ in range(50)]
+        )
+        seconds = statistics.mean(len(logits) for _, _, logits in clips) / 50
+        print(f"\n{n_words} words (~{seconds:.1f} s of audio)")
+
+        greedy_ms = None
+        for mode, decoder in decoders.items():
+            models = [decoder.language_model({'tokens': e.split()}, document) for e, _, _ in clips]
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                texts = [decoder.decode(logits, lm) for (_, _, logits), lm in zip(clips, models)]
+                times.append((time.perf_counter() - start) * 1000 / len(clips))
+            ms = statistics.median(times)
+            greedy_ms = greedy_ms or ms
+            wer = statistics.mean(word_error_rate(s, t) for (_, s, _), t in zip(clips, texts))
+            to_expected = statistics.mean(word_error_rate(e, t) for (e, _, _), t in zip(clips, texts))
+            print(f"  {mode:>9}: {ms:8.2f} ms/clip ({ms / greedy_ms:6.1f}x greedy)  "
+                  f"WER vs said {wer:.3f}  vs expected {to_expected:.3f}")
+
+
+if __name__ == '__main__':
+    main()
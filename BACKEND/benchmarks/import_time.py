@@ -0,0 +1,80 @@
+# backend/benchmarks/import_time.py
+"""
+Import-time budget for the Flask app.
+
+Imports app.py in fresh interpreters with MODEL_LOADING=lazy and reports
+the median cumulative import time, the slowest direct imports, and any
+heavy module that got imported although it should load lazily.
+
+    python -m benchmarks.import_time --runs 5 --budget-ms 1000
+
+Exits with status 1 when over budget or when a heavy module is imported.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by importing the app
+HEAVY_MODULES = (
+    'torch', 'transformers', 'onnxruntime', 'librosa', 'phonemizer',
+    'pdfplumber', 'fitz', 'pyttsx3', 'speech_recognition', 'soundfile',
+)
+
+
+def measure_once():
+    """(total_ms, {module: cumulative_ms}, {module: depth}) for one 'import app'"""
+    env = dict(os.environ, MODEL_LOADING='lazy')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import app failed:\n{result.stderr[-2000:]}")
+
+    cumulative, depth = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        module = name.rstrip()
+        stripped = module.lstrip()
+        depth[stripped] = (len(module) - len(stripped) - 1) // 2
+        cumulative[stripped] = int(cumulative_us) / 1000
+    return cumulative.get('app', 0.0), cumulative, depth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    totals = [total for total, _, _ in runs]
+    median_total = statistics.median(totals)
+    _, cumulative, depth = min(runs, key=lambda run: abs(run[0] - median_total))
+
+    print(f"import app: median {median_total:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}), budget {args.budget_ms:.0f} ms")
+
+    direct = sorted(((ms, m) for m, ms in cumulative.items() if depth.get(m) == 1), reverse=True)
+    print("\nSlowest direct imports of app:")
+    for ms, module in direct[:args.top]:
+        print(f"  {ms:8.1f} ms  {module}")
+
+    leaked = sorted({m.split('.')[0] for m in cumulative} & set(HEAVY_MODULES))
+    if leaked:
+        print(f"\nHeavy modules imported eagerly: {', '.join(leaked)}")
+
+    failed = median_total > args.budget_ms or bool(leaked)
+    print("\nFAIL" if failed else "\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
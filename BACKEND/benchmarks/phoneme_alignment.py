@@ -0,0 +1,100 @@
+# backend/benchmarks/phoneme_alignment.py
+"""
+Phoneme scoring cost: the previous pronunciation_score (dtw-python with a
+Python lambda as the distance, one call per cell) against
+services/phoneme_alignment.py (integer ids, vectorized DP, confusion
+costs).
+
+    python -m benchmarks.phoneme_alignment --words 10,50,200,1000
+
+The baseline is what the previous code ran: dtw over whole-word IPA
+strings, one cell per word pair. The new engine works per phoneme, so it
+does more (and finer) work than the baseline at every size. Sentences
+are synthetic IPA, so espeak is not needed.
+dtw-python is no longer a dependency; install it to include the
+previous implementation.
+"""
+import argparse
+import random
+import statistics
+import time
+import numpy as np
+from services.phoneme_alignment import CLOSE_PAIRS, INVENTORY, get_phoneme_aligner, segment
+
+try:
+    from dtw import dtw
+except ImportError:
+    dtw = None
+
+
+def make_pair(n_words, rng):
+    """Expected per-word IPA and a misread version (close substitutions, drops)"""
+    close = {}
+    for a, b in CLOSE_PAIRS:
+        close.setdefault(a, []).append(b)
+        close.setdefault(b, []).append(a)
+    expected, spoken = [], []
+    for _ in range(n_words):
+        word = [rng.choice(INVENTORY) for _ in range(rng.randint(2, 7))]
+        heard = []
+        for phoneme in word:
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            if roll < 0.15:
+                phoneme = rng.choice(close.get(phoneme, INVENTORY))
+            heard.append(phoneme)
+        expected.append("ˈ" + "".join(word))
+        spoken.append("ˈ" + "".join(heard))
+    return expected, spoken
+
+
+def previous_score(exp_ph, spk_ph):
+    # The previous code unpacked a 4-tuple, which dtw-python's DTW object
+    # does not support (TypeError); .distance is the value it meant
+    dist = dtw(
+        np.array(exp_ph).reshape(-1, 1),
+        np.array(spk_ph).reshape(-1, 1),
+        lambda x, y: 0 if x == y else 1
+    ).distance
+    return max(0, 1 - (dist / max(len(exp_ph), 1)))
+
+
+def time_ms(fn, pairs, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for expected, spoken in pairs:
+            fn(expected, spoken)
+        times.append((time.perf_counter() - start) * 1000 / len(pairs))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', default='10,50,200,1000')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--pairs', type=int, default=5)
+    args = parser.parse_args()
+    if dtw is None:
+        print("dtw-python not installed; timing the new engine only")
+
+    aligner = get_phoneme_aligner()
+    rng = random.Random(0)
+    for n_words in (int(w) for w in args.words.split(',')):
+        pairs = [make_pair(n_words, rng) for _ in range(args.pairs)]
+        n_phonemes = statistics.mean(len(segment("".join(e))) for e, _ in pairs)
+        line = f"{n_words:>5} words ({n_phonemes:.0f} phonemes):"
+
+        new_ms = time_ms(aligner.align, pairs, args.runs)
+        if dtw is not None:
+            word_ms = time_ms(previous_score, pairs, args.runs)
+            line += f" dtw per word {word_ms:8.2f} ms "
+        line += f" phoneme_alignment {new_ms:7.2f} ms"
+        if dtw is not None:
+            line += f" ({word_ms / new_ms:.2f}x vs dtw per word)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
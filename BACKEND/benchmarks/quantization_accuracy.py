@@ -0,0 +1,136 @@
+# backend/benchmarks/quantization_accuracy.py
+"""
+Accuracy regression harness for INT8 vs FP32 wav2vec2.
+
+Runs every clip of a fixed set through both precisions and reports WER,
+pronunciation-score deltas and latency. A clip set is a folder of WAV files
+with a same-named .txt holding the reference text; without --clips a fixed
+sentence list is synthesized with the TTS engine.
+
+    python -m benchmarks.quantization_accuracy --clips path/to/clips
+    python -m benchmarks.quantization_accuracy --max-wer-delta 0.02 --max-score-delta 0.05
+
+Exits with status 1 when a delta exceeds its limit.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models.wav2vec2_pronunciation_model import Wav2Vec2PronunciationModel
+
+DEFAULT_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog.",
+    "She sells sea shells by the sea shore.",
+    "Reading every day makes the words easier to recognise.",
+    "My favourite book is about a dragon who learns to fly.",
+    "Please close the window before it starts to rain.",
+    "The library opens at nine in the morning.",
+    "Thirty three thousand feathers on a thrush's throat.",
+    "We walked along the river until the sun went down.",
+]
+
+
+def word_errors(reference, hypothesis):
+    """(edit distance, reference length) over normalized words"""
+    ref = re.sub(r"[^\w\s']", ' ', reference.lower()).split()
+    hyp = re.sub(r"[^\w\s']", ' ', hypothesis.lower()).split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_clips(folder):
+    clips = []
+    for wav_path in sorted(glob.glob(os.path.join(folder, '*.wav'))):
+        txt_path = os.path.splitext(wav_path)[0] + '.txt'
+        if not os.path.exists(txt_path):
+            print(f"[WARN] Skipping {wav_path}: no reference text")
+            continue
+        with open(wav_path, 'rb') as f, open(txt_path, encoding='utf-8') as t:
+            clips.append((os.path.basename(wav_path), f.read(), t.read().strip()))
+    return clips
+
+
+def synthesize_clips(sentences):
+    from services.tts_engine_pool import get_tts_pool
+    clips = []
+    for i, sentence in enumerate(sentences):
+        audio = get_tts_pool().synthesize(sentence, rate=Config.SPEECH_RATE)
+        if not audio:
+            raise SystemExit("TTS is unavailable; pass --clips with recorded WAV files")
+        clips.append((f"tts_{i:02d}.wav", audio, sentence))
+    return clips
+
+
+def run(model, clips):
+    results = []
+    for name, audio_bytes, reference in clips:
+        audio, _ = model.load_audio_from_bytes(audio_bytes)
+        start = time.perf_counter()
+        text = model.transcribe_batch([audio.astype('float32')])[0].lower().strip()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        score, *_ = model.pronunciation_score_simple(reference, text)
+        errors, words = word_errors(reference, text)
+        results.append({'name': name, 'text': text, 'score': score,
+                        'errors': errors, 'words': words, 'ms': elapsed_ms})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', help='folder of .wav clips with .txt references')
+    parser.add_argument('--model', default='facebook/wav2vec2-base-960h')
+    parser.add_argument('--max-wer-delta', type=float, default=0.02)
+    parser.add_argument('--max-score-delta', type=float, default=0.05)
+    args = parser.parse_args()
+
+    clips = load_clips(args.clips) if args.clips else synthesize_clips(DEFAULT_SENTENCES)
+    if not clips:
+        raise SystemExit("No clips found")
+
+    runs = {}
+    for precision in ('fp32', 'int8'):
+        model = Wav2Vec2PronunciationModel(args.model, precision=precision)
+        run(model, clips[:1])  # warm-up
+        runs[precision] = run(model, clips)
+
+    print(f"\n{'clip':<24}{'fp32 score':>11}{'int8 score':>11}{'delta':>8}  transcripts differ")
+    score_deltas = []
+    for fp32, int8 in zip(runs['fp32'], runs['int8']):
+        delta = int8['score'] - fp32['score']
+        score_deltas.append(abs(delta))
+        print(f"{fp32['name']:<24}{fp32['score']:>11.2f}{int8['score']:>11.2f}{delta:>+8.2f}  "
+              f"{'yes' if fp32['text'] != int8['text'] else 'no'}")
+
+    total_words = sum(r['words'] for r in runs['fp32']) or 1
+    wer = {p: sum(r['errors'] for r in results) / total_words for p, results in runs.items()}
+    latency = {p: sum(r['ms'] for r in results) / len(results) for p, results in runs.items()}
+    wer_delta = wer['int8'] - wer['fp32']
+    mean_score_delta = sum(score_deltas) / len(score_deltas)
+
+    print(f"\nWER          fp32 {wer['fp32']:.3f}   int8 {wer['int8']:.3f}   delta {wer_delta:+.3f}")
+    print(f"Score delta  mean |d| {mean_score_delta:.3f}   max |d| {max(score_deltas):.3f}")
+    print(f"Latency      fp32 {latency['fp32']:.1f} ms   int8 {latency['int8']:.1f} ms   "
+          f"speedup {latency['fp32'] / latency['int8']:.2f}x")
+
+    failed = wer_delta > args.max_wer_delta or mean_score_delta > args.max_score_delta
+    print("\nFAIL: INT8 accuracy regression over limits" if failed else "\nOK: INT8 within limits")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
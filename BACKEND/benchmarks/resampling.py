@@ -0,0 +1,107 @@
+# backend/benchmarks/resampling.py
+"""
+Resampling quality and speed: services/resampling.py against the previous
+librosa.resample path, for the rates browsers record at.
+
+    python -m benchmarks.resampling --seconds 5 --runs 20
+
+Quality is measured on pure tones, where the ideal 16kHz output is known:
+- in-band SNR: tones below 8kHz must come through unchanged
+- alias rejection: a tone above the new Nyquist must disappear
+Speed is the median over --runs calls, plus the cold first call (import and
+filter design included).
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from services.resampling import TARGET_RATE, polyphase_filter, resample
+
+# Speech band; the anti-aliasing transition band starts above ~6.5kHz
+IN_BAND_HZ = (300.0, 1000.0, 3000.0, 6000.0)
+ALIAS_HZ = 11000.0
+
+
+def tones(freqs, seconds, rate):
+    t = np.arange(int(seconds * rate)) / rate
+    return sum(np.sin(2 * np.pi * f * t) for f in freqs).astype(np.float32) / len(freqs)
+
+
+def snr_db(reference, estimate):
+    n = min(len(reference), len(estimate))
+    # Edges are dominated by filter start-up; compare the middle 80%
+    edge = n // 10
+    ref, est = reference[edge:n - edge], estimate[edge:n - edge]
+    noise = np.sum((ref - est) ** 2) + 1e-20
+    return 10 * np.log10(np.sum(ref ** 2) / noise)
+
+
+def rms_db(signal):
+    n = len(signal)
+    return 10 * np.log10(np.mean(signal[n // 10:n - n // 10] ** 2) + 1e-20)
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def librosa_resample():
+    """The previous path (function-level import), or None when librosa is missing"""
+    try:
+        import librosa
+    except ImportError:
+        return None
+    return lambda audio, sr: librosa.resample(audio, orig_sr=sr, target_sr=TARGET_RATE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--rates', default='44100,48000')
+    args = parser.parse_args()
+
+    # Cold first call of the old path: import librosa + resample
+    start = time.perf_counter()
+    old = librosa_resample()
+    if old is not None:
+        old(tones(IN_BAND_HZ, args.seconds, 48000), 48000)
+    old_cold_ms = (time.perf_counter() - start) * 1000
+    if old is None:
+        print("librosa is not installed: the previous path fails on every non-16kHz upload\n")
+
+    ideal = tones(IN_BAND_HZ, args.seconds, TARGET_RATE)
+    methods = {'resampling': resample}
+    if old is not None:
+        methods['librosa'] = old
+
+    print(f"{'method':<12} {'rate':>6} {'in-band SNR':>12} {'alias':>9} {'median':>9} {'cold':>9}")
+    for rate in (int(r) for r in args.rates.split(',')):
+        in_band = tones(IN_BAND_HZ, args.seconds, rate)
+        alias = tones((ALIAS_HZ,), args.seconds, rate)
+        for name, fn in methods.items():
+            if name == 'resampling':
+                polyphase_filter.cache_clear()
+                start = time.perf_counter()
+                fn(in_band, rate)
+                cold_ms = (time.perf_counter() - start) * 1000
+            else:
+                cold_ms = old_cold_ms if rate == 48000 else float('nan')
+            snr = snr_db(ideal, fn(in_band, rate))
+            alias_db = rms_db(fn(alias, rate)) - rms_db(alias)
+            median_ms = timed(lambda: fn(in_band, rate), args.runs)
+            print(f"{name:<12} {rate:>6} {snr:>10.1f}dB {alias_db:>7.1f}dB {median_ms:>7.2f}ms {cold_ms:>7.1f}ms")
+
+    if old is not None:
+        for rate in (int(r) for r in args.rates.split(',')):
+            clip = tones((220.0, 440.0, 1760.0, 5000.0), args.seconds, rate)
+            print(f"agreement at {rate}: {snr_db(old(clip, rate), resample(clip, rate)):.1f} dB SNR between methods")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/scoring.py
+"""
+Text-scoring cost per evaluation: services/scoring_engine.py in 'compat'
+(difflib), 'fast' with the NumPy/bit-parallel backend, and 'fast' with
+rapidfuzz (when installed).
+
+    python -m benchmarks.scoring --words 10,100,400 --runs 20
+
+One evaluation = sentence similarity + character similarity + word-level
+feedback, which is what /evaluate-pronunciation computes. Also reports how
+far fast-mode similarities drift from the compat ones.
+"""
+import argparse
+import random
+import statistics
+import time
+from services.scoring_engine import ScoringEngine, _Levenshtein
+from services.text_aligner import TextAligner
+import services.text_aligner as text_aligner_module
+
+VOCABULARY = (
+    "the a quick brown fox jumps over lazy dog reading children book story "
+    "little house garden river mountain happy friend school teacher window "
+    "morning evening beautiful wonderful together remember because through"
+).split()
+
+
+def make_pair(n_words, rng, vocabulary=VOCABULARY, weights=None):
+    """Expected text and a plausible misreading (skips, substitutions, typos)"""
+    expected = rng.choices(vocabulary, weights=weights, k=n_words)
+    spoken = []
+    for word in expected:
+        roll = rng.random()
+        if roll < 0.08:
+            continue
+        if roll < 0.16:
+            word = rng.choices(vocabulary, weights=weights)[0]
+        elif roll < 0.26 and len(word) > 3:
+            k = rng.randrange(len(word))
+            word = word[:k] + rng.choice('aeioustr') + word[k + 1:]
+        spoken.append(word)
+    return " ".join(expected), " ".join(spoken)
+
+
+def evaluate(engine, aligner, expected, spoken):
+    sentence = engine.ratio(expected, spoken)
+    characters = engine.ratio(expected.replace(" ", ""), spoken.replace(" ", ""))
+    words = aligner.word_level_feedback(expected, spoken)
+    return sentence, characters, words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', default='10,100,400')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--pairs', type=int, default=20)
+    args = parser.parse_args()
+
+    engines = {'compat': ScoringEngine('compat'), 'numpy': ScoringEngine('fast', use_rapidfuzz=False)}
+    if _Levenshtein is not None:
+        engines['rapidfuzz'] = ScoringEngine('fast')
+    else:
+        print("rapidfuzz not installed; skipping the compiled backend")
+
+    rng = random.Random(0)
+    aligner = TextAligner()
+    for n_words in (int(w) for w in args.words.split(',')):
+        pairs = [make_pair(n_words, rng) for _ in range(args.pairs)]
+        print(f"\n{n_words} words per sentence ({args.pairs} pairs)")
+        results = {}
+        for name, engine in engines.items():
+            # TextAligner looks the engine up through get_scoring_engine()
+            text_aligner_module.get_scoring_engine = lambda engine=engine: engine
+            times = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                results[name] = [evaluate(engine, aligner, e, s) for e, s in pairs]
+                times.append((time.perf_counter() - start) * 1000 / len(pairs))
+            print(f"  {name:<10} {statistics.median(times):>8.3f} ms/evaluation")
+
+        for name in engines:
+            if name == 'compat':
+                continue
+            drift = [abs(f[i] - c[i]) for f, c in zip(results[name], results['compat']) for i in (0, 1)]
+            changed = sum(
+                [w['status'] for w in f[2]] != [w['status'] for w in c[2]]
+                for f, c in zip(results[name], results['compat'])
+            )
+            print(f"  {name} vs compat: similarity drift mean {statistics.mean(drift):.4f} "
+                  f"max {max(drift):.4f}; word feedback differs in {changed}/{len(pairs)} pairs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# backend/benchmarks/word_scoring.py
+"""
+Word scoring cost per evaluation: the previous path (nested-loop word
+accuracy in pronunciation_score_simple, then a separate difflib alignment
+for word feedback) against services/word_scorer.py, which does both in
+one in-order alignment.
+
+    python -m benchmarks.word_scoring --words 10,100,1000,5000
+
+'zipf' texts draw from a 2000-word vocabulary with Zipfian frequencies,
+like running prose; 'small' texts repeat a 34-word vocabulary, which is
+the worst case for in-order anchoring.
+"""
+import argparse
+import random
+import statistics
+import time
+from difflib import SequenceMatcher
+from benchmarks.scoring import VOCABULARY, make_pair
+from services.word_scorer import clean_word, get_word_scorer, word_feedback
+
+
+def zipf_vocabulary(rng, size=2000):
+    """VOCABULARY plus made-up words, with 1/rank weights"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = list(VOCABULARY)
+    while len(vocabulary) < size:
+        vocabulary.append("".join(rng.choice(letters) for _ in range(rng.randint(3, 9))))
+    return vocabulary, [1.0 / rank for rank in range(1, size + 1)]
+
+
+def previous_accuracy(exp_words, spk_words):
+    """The word-accuracy block pronunciation_score_simple used to run"""
+    correct_words = 0
+    for exp_word in exp_words:
+        for spk_word in spk_words:
+            if exp_word == spk_word:
+                correct_words += 1
+                break
+            elif exp_word in spk_word or spk_word in exp_word:
+                correct_words += 0.5
+                break
+    return correct_words / len(exp_words) if exp_words else 0
+
+
+def previous_feedback(orig_words, spk_words):
+    """The word feedback TextAligner used to compute with difflib"""
+    clean_orig = [clean_word(w) for w in orig_words]
+    feedback = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, clean_orig, spk_words).get_opcodes():
+        for i in range(i1, i2):
+            if tag == 'equal':
+                feedback.append({'word': orig_words[i], 'status': 'correct'})
+            elif tag == 'replace' and j1 + (i - i1) < j2:
+                sim = SequenceMatcher(None, clean_orig[i], spk_words[j1 + (i - i1)]).ratio()
+                feedback.append({'word': orig_words[i], 'status': 'mispronounced' if sim > 0.6 else 'missed'})
+            elif tag != 'insert':
+                feedback.append({'word': orig_words[i], 'status': 'missed'})
+    return feedback
+
+
+def previous(expected, spoken):
+    exp_words, spk_words = expected.split(), spoken.split()
+    return previous_accuracy(exp_words, spk_words), previous_feedback(exp_words, spk_words)
+
+
+def current(expected, spoken):
+    scored = get_word_scorer().score(expected, spoken)
+    return scored['accuracy'], word_feedback(scored)
+
+
+def time_ms(fn, pairs, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for expected, spoken in pairs:
+            fn(expected, spoken)
+        times.append((time.perf_counter() - start) * 1000 / len(pairs))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', default='10,100,1000,5000')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--pairs', type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary, weights = zipf_vocabulary(rng)
+    current("warm up", "warm up")
+    for text in ('zipf', 'small'):
+        print(f"\n{text} vocabulary")
+        for n_words in (int(w) for w in args.words.split(',')):
+            if text == 'zipf':
+                pairs = [make_pair(n_words, rng, vocabulary, weights) for _ in range(args.pairs)]
+            else:
+                pairs = [make_pair(n_words, rng) for _ in range(args.pairs)]
+            old_ms = time_ms(previous, pairs, args.runs)
+            new_ms = time_ms(current, pairs, args.runs)
+            old_acc = statistics.mean(previous(e, s)[0] for e, s in pairs)
+            new_acc = statistics.mean(current(e, s)[0] for e, s in pairs)
+            print(f"  {n_words:>6} words: previous {old_ms:9.2f} ms  word_scorer {new_ms:8.2f} ms "
+                  f"({old_ms / new_ms:5.1f}x)  accuracy {old_acc:.3f} -> {new_acc:.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -10,9 +10,102 @@ class Config:
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
     SELECTIONS_FOLDER = os.path.join(BASE_DIR, 'static', 'selections')
     
+    # PDF extraction: engine is 'pdfplumber' or 'pymupdf' (faster, plain text only)
+    PDF_EXTRACT_ENGINE = os.getenv('PDF_EXTRACT_ENGINE', 'pdfplumber')
+    PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '16'))
+    DOCUMENT_STORE_MAX_DOCUMENTS = int(os.getenv('DOCUMENT_STORE_MAX_DOCUMENTS', '64'))
+    DOCUMENT_WAIT_SECONDS = float(os.getenv('DOCUMENT_WAIT_SECONDS', '30'))
+    # Per-user document state: bytes of resident sentences, tracked (user, document) pairs
+    DOCUMENT_STATE_MAX_BYTES = int(os.getenv('DOCUMENT_STATE_MAX_BYTES', str(256 * 1024 * 1024)))
+    DOCUMENT_STATE_MAX_STATES = int(os.getenv('DOCUMENT_STATE_MAX_STATES', '10000'))
+    EXTRACTION_CACHE_FOLDER = os.getenv('EXTRACTION_CACHE_FOLDER', os.path.join(BASE_DIR, 'static', 'extraction_cache'))
+    
+    # Background ingestion jobs (PDF extraction, online-book downloads)
+    INGEST_MAX_WORKERS = int(os.getenv('INGEST_MAX_WORKERS', '2'))
+    INGEST_MAX_JOBS_PER_USER = int(os.getenv('INGEST_MAX_JOBS_PER_USER', '2'))
+    INGEST_JOB_RETENTION_SECONDS = float(os.getenv('INGEST_JOB_RETENTION_SECONDS', '3600'))
+    
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     SPEECH_RATE = 100
+    TTS_POOL_SIZE = int(os.getenv('TTS_POOL_SIZE', '1'))
     SIMILARITY_THRESHOLD = 0.75
+    # Text scoring (services/scoring_engine.py): 'fast' (LCS / Levenshtein) or 'compat' (difflib, old scores)
+    SCORING_MODE = os.getenv('SCORING_MODE', 'fast').lower()
+
+    # CTC decoding (services/ctc_decoding.py): 'greedy' (argmax), 'beam', or 'reference'
+    # (beam search biased to the document and the expected sentence; skips the Google fallback)
+    CTC_DECODING_MODE = os.getenv('CTC_DECODING_MODE', 'greedy').lower()
+    CTC_BEAM_WIDTH = int(os.getenv('CTC_BEAM_WIDTH', '16'))
+    CTC_LM_ALPHA = float(os.getenv('CTC_LM_ALPHA', '0.5'))
+    CTC_LM_BETA = float(os.getenv('CTC_LM_BETA', '1.0'))
+    CTC_REFERENCE_WEIGHT = float(os.getenv('CTC_REFERENCE_WEIGHT', '0.5'))
+    # Sentence evaluation: 'transcribe' (transcribe, then compare texts) or 'forced_alignment'
+    # (align the expected text to the emissions, services/forced_alignment.py)
+    EVALUATION_STRATEGY = os.getenv('EVALUATION_STRATEGY', 'transcribe').lower()
+
+    # Startup: 'background' (load models on a thread, see /api/ready), 'eager' or 'lazy'
+    MODEL_LOADING = os.getenv('MODEL_LOADING', 'background').lower()
+    # Warm-up (services/warmup.py): 'startup' (after model loading), 'post_fork' (gunicorn workers) or 'off'
+    WARMUP_MODE = os.getenv('WARMUP_MODE', 'startup').lower()
+    WARMUP_CLIP_SECONDS = [float(s) for s in os.getenv('WARMUP_CLIP_SECONDS', '1,3,6').split(',') if s.strip()]
+    WARMUP_ITERATIONS = int(os.getenv('WARMUP_ITERATIONS', '2'))
+
+    # Wav2Vec2 micro-batching (services/inference_batcher.py). Only used by
+    # models whose feature extractor returns an attention mask (e.g.
+    # wav2vec2-large-960h-lv60-self); wav2vec2-base-960h's group norm sees
+    # zero padding, so it would only batch equal-length clips and runs unbatched
+    ASR_BATCHING_ENABLED = os.getenv('ASR_BATCHING_ENABLED', 'true').lower() == 'true'
+    ASR_MAX_BATCH_SIZE = int(os.getenv('ASR_MAX_BATCH_SIZE', '8'))
+    ASR_MAX_WAIT_MS = float(os.getenv('ASR_MAX_WAIT_MS', '10'))
+    # Runtime: 'torch' or 'onnx' (models/asr_backends.py)
+    ASR_BACKEND = os.getenv('ASR_BACKEND', 'torch').lower()
+    # 'fp32' or 'int8' (dynamic quantization of linear layers, torch on CPU only)
+    ASR_PRECISION = os.getenv('ASR_PRECISION', 'fp32').lower()
+    ASR_MODEL_CACHE_FOLDER = os.getenv('ASR_MODEL_CACHE_FOLDER', os.path.join(BASE_DIR, 'static', 'model_cache'))
+    ASR_ONNX_PATH = os.getenv('ASR_ONNX_PATH', '')  # '' = <model cache folder>/<model>.onnx
+    ASR_ONNX_INTRA_OP_THREADS = int(os.getenv('ASR_ONNX_INTRA_OP_THREADS', '0'))  # 0 = onnxruntime default
+    ASR_ONNX_INTER_OP_THREADS = int(os.getenv('ASR_ONNX_INTER_OP_THREADS', '1'))
+
+    # Voice activity detection (services/vad.py) in the audio front end
+    VAD_ENABLED = os.getenv('VAD_ENABLED', 'true').lower() == 'true'
+    VAD_ENERGY_MARGIN_DB = float(os.getenv('VAD_ENERGY_MARGIN_DB', '10'))
+    VAD_MAX_FLATNESS = float(os.getenv('VAD_MAX_FLATNESS', '0.4'))
+    VAD_MIN_SPEECH_SECONDS = float(os.getenv('VAD_MIN_SPEECH_SECONDS', '0.05'))
+    VAD_HANGOVER_SECONDS = float(os.getenv('VAD_HANGOVER_SECONDS', '0.15'))
+    VAD_MAX_PAUSE_SECONDS = float(os.getenv('VAD_MAX_PAUSE_SECONDS', '0.5'))  # longer pauses are cut down
+    VAD_PADDING_SECONDS = float(os.getenv('VAD_PADDING_SECONDS', '0.1'))
+    VAD_ENDPOINT_SILENCE_SECONDS = float(os.getenv('VAD_ENDPOINT_SILENCE_SECONDS', '1.2'))
+
+    # WebSocket streaming evaluation (routes/streaming_routes.py, needs flask-sock)
+    STREAMING_AUTO_ENDPOINT = os.getenv('STREAMING_AUTO_ENDPOINT', 'true').lower() == 'true'
+    STREAMING_CONTEXT_SECONDS = float(os.getenv('STREAMING_CONTEXT_SECONDS', '1.5'))
+    STREAMING_STEP_SECONDS = float(os.getenv('STREAMING_STEP_SECONDS', '0.5'))
+    STREAMING_LOOKAHEAD_SECONDS = float(os.getenv('STREAMING_LOOKAHEAD_SECONDS', '0.5'))
+    STREAMING_MAX_SECONDS = float(os.getenv('STREAMING_MAX_SECONDS', '60'))
+    STREAMING_IDLE_TIMEOUT_SECONDS = float(os.getenv('STREAMING_IDLE_TIMEOUT_SECONDS', '30'))
+
+    # Sampled debug audio capture (services/debug_capture.py), off by default
+    DEBUG_CAPTURE_ENABLED = os.getenv('DEBUG_CAPTURE_ENABLED', 'false').lower() == 'true'
+    DEBUG_CAPTURE_SAMPLE_RATE = float(os.getenv('DEBUG_CAPTURE_SAMPLE_RATE', '0.05'))
+    DEBUG_CAPTURE_FOLDER = os.getenv('DEBUG_CAPTURE_FOLDER', os.path.join(BASE_DIR, 'static', 'debug_captures'))
+    DEBUG_CAPTURE_QUEUE_SIZE = int(os.getenv('DEBUG_CAPTURE_QUEUE_SIZE', '64'))
+
+    # Phoneme cache (services/phoneme_service.py); empty store path = memory only
+    PHONEME_CACHE_SIZE = int(os.getenv('PHONEME_CACHE_SIZE', '4096'))
+    PHONEME_CACHE_TTL_SECONDS = float(os.getenv('PHONEME_CACHE_TTL_SECONDS', '86400'))
+    PHONEME_STORE_PATH = os.getenv('PHONEME_STORE_PATH', '')
+
+    # Expected-sentence artifacts prepared at ingest (services/reference_store.py)
+    REFERENCE_STORE_MAX_SENTENCES = int(os.getenv('REFERENCE_STORE_MAX_SENTENCES', '100000'))
+    REFERENCE_STORE_MAX_DOCUMENTS = int(os.getenv('REFERENCE_STORE_MAX_DOCUMENTS', '256'))
+
+    # Synthesized speech cache (services/tts_cache.py)
+    TTS_CACHE_FOLDER = os.getenv('TTS_CACHE_FOLDER', os.path.join(BASE_DIR, 'static', 'tts_cache'))
+    TTS_CACHE_MEMORY_BYTES = int(os.getenv('TTS_CACHE_MEMORY_BYTES', str(32 * 1024 * 1024)))
+    TTS_CACHE_DISK_BYTES = int(os.getenv('TTS_CACHE_DISK_BYTES', str(512 * 1024 * 1024)))
+    TTS_PREFETCH_WORKERS = int(os.getenv('TTS_PREFETCH_WORKERS', '1'))
+    TTS_PREFETCH_COUNT = int(os.getenv('TTS_PREFETCH_COUNT', '3'))
 
 # Create directories without any fancy error handling
 try:
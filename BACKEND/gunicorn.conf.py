@@ -0,0 +1,51 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings for serving create_app() with several workers:
+
+    gunicorn -c gunicorn.conf.py "app:create_app()"
+
+Models are loaded once in the master before fork and frozen out of the
+garbage collector, so workers share the weights copy-on-write instead of
+each loading their own copy.
+"""
+import gc
+import os
+
+# The master loads models synchronously so forked workers share them; the
+# warm-up runs forward passes, so it happens in each worker after fork
+os.environ.setdefault('MODEL_LOADING', 'eager')
+os.environ.setdefault('WARMUP_MODE', 'post_fork')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before workers are forked"""
+    from models.model_registry import get_model_registry, preload_default_models
+
+    preload_default_models()
+    report = get_model_registry().memory_report()
+    server.log.info(f"Preloaded models: {report['total_bytes'] / (1024 * 1024):.0f} MB")
+
+    # Objects that survive until now live for the whole process; freezing
+    # them keeps the collector from touching (and so copying) their pages
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Split CPU threads between workers; torch defaults to one per core each"""
+    import torch
+
+    per_worker = max(1, (os.cpu_count() or 1) // workers)
+    torch.set_num_threads(int(os.getenv('TORCH_NUM_THREADS', str(per_worker))))
+
+    # Prime this worker before it accepts requests
+    from config import Config
+    if Config.WARMUP_MODE == 'post_fork':
+        from services.warmup import run_warmup
+        run_warmup()
@@ -0,0 +1,189 @@
+# backend/models/asr_backends.py
+"""
+Pluggable ASR inference backends for wav2vec2 CTC models.
+
+A backend turns a padded batch of 16kHz input values into CTC logits; the
+processor, padding and decoding stay in Wav2Vec2PronunciationModel, so
+switching runtime (Config.ASR_BACKEND) needs no route changes.
+
+Export an ONNX model ahead of deployment with:
+
+    python -m models.asr_backends export --model facebook/wav2vec2-base-960h
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import numpy as np
+from config import Config
+
+BACKENDS = ('torch', 'onnx')
+
+# Bump whenever the export recipe changes so stale ONNX files are not reused
+ONNX_EXPORT_REVISION = 1
+
+
+class ASRBackend:
+    """
+    Interface of an ASR runtime:
+    - logits(input_values, attention_mask) -> float32 (batch, frames, vocab)
+    - output_lengths(sample_lengths) -> valid logit frames per clip
+    """
+
+    name = "base"
+
+    def __init__(self, processor, config):
+        self.processor = processor
+        self.config = config
+        # wav2vec2-base was trained without attention masks; its inputs are
+        # zero-padded and the padded frames are cut off after decoding
+        self.use_attention_mask = bool(processor.feature_extractor.return_attention_mask)
+
+    def logits(self, input_values: np.ndarray, attention_mask: np.ndarray | None = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def output_lengths(self, sample_lengths) -> np.ndarray:
+        """Logit frames produced by the conv feature encoder for each input length"""
+        lengths = np.asarray(sample_lengths, dtype=np.int64)
+        for kernel, stride in zip(self.config.conv_kernel, self.config.conv_stride):
+            lengths = (lengths - kernel) // stride + 1
+        return np.maximum(lengths, 0)
+
+
+class TorchASRBackend(ASRBackend):
+    """PyTorch eager inference, FP32 or dynamically quantized INT8"""
+
+    name = "torch"
+
+    def __init__(self, model_name, precision=None):
+        import torch
+        from models.wav2vec2_loader import load_wav2vec2
+
+        self.precision = precision or Config.ASR_PRECISION
+        processor, self.model = load_wav2vec2(model_name, precision=self.precision)
+        super().__init__(processor, self.model.config)
+
+        # Dynamically quantized kernels only exist for CPU
+        self.device = "cuda" if torch.cuda.is_available() and self.precision == "fp32" else "cpu"
+        self.model.to(self.device)
+
+    def logits(self, input_values, attention_mask=None):
+        import torch
+
+        with torch.no_grad():
+            inputs = torch.from_numpy(input_values).to(self.device)
+            if self.use_attention_mask and attention_mask is not None:
+                mask = torch.from_numpy(attention_mask).to(self.device)
+                logits = self.model(inputs, attention_mask=mask).logits
+            else:
+                logits = self.model(inputs).logits
+        return logits.float().cpu().numpy()
+
+
+class OnnxASRBackend(ASRBackend):
+    """
+    ONNX Runtime inference on CPU. The model is exported on first use if
+    the file does not exist yet; thread counts come from Config.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name, onnx_path=None, intra_op_threads=None, inter_op_threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("ASR_BACKEND=onnx needs the onnxruntime package (pip install onnxruntime)")
+        from transformers import Wav2Vec2Config, Wav2Vec2Processor
+
+        processor = Wav2Vec2Processor.from_pretrained(model_name)
+        super().__init__(processor, Wav2Vec2Config.from_pretrained(model_name))
+
+        self.onnx_path = onnx_path or Config.ASR_ONNX_PATH or onnx_model_path(model_name)
+        if not os.path.exists(self.onnx_path):
+            export_onnx(model_name, self.onnx_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = Config.ASR_ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+        options.inter_op_num_threads = Config.ASR_ONNX_INTER_OP_THREADS if inter_op_threads is None else inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.onnx_path, options, providers=['CPUExecutionProvider'])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        print(f"[ASR] ONNX Runtime session ready: {self.onnx_path}")
+
+    def logits(self, input_values, attention_mask=None):
+        feeds = {'input_values': np.ascontiguousarray(input_values, dtype=np.float32)}
+        if 'attention_mask' in self._input_names:
+            if attention_mask is None:
+                attention_mask = np.ones(input_values.shape, dtype=np.int64)
+            feeds['attention_mask'] = attention_mask.astype(np.int64)
+        return self.session.run(['logits'], feeds)[0]
+
+
+def onnx_model_path(model_name, folder=None):
+    """Default location of the exported ONNX model for model_name"""
+    folder = folder or Config.ASR_MODEL_CACHE_FOLDER
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+    return os.path.join(folder, f"{safe_name}-r{ONNX_EXPORT_REVISION}.onnx")
+
+
+def export_onnx(model_name, output_path, opset=17):
+    """Export the FP32 torch model with dynamic batch and sequence length"""
+    import torch
+    from transformers import Wav2Vec2ForCTC, Wav2Vec2FeatureExtractor
+
+    start = time.perf_counter()
+    model = Wav2Vec2ForCTC.from_pretrained(model_name).eval()
+    with_mask = bool(Wav2Vec2FeatureExtractor.from_pretrained(model_name).return_attention_mask)
+
+    dummy = torch.randn(1, 16000)
+    args = (dummy, torch.ones(1, 16000, dtype=torch.long)) if with_mask else (dummy,)
+    input_names = ['input_values', 'attention_mask'] if with_mask else ['input_values']
+    dynamic_axes = {name: {0: 'batch', 1: 'samples'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch', 1: 'frames'}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            model, args, tmp_path,
+            input_names=input_names,
+            output_names=['logits'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+            dynamo=False
+        )
+    os.replace(tmp_path, output_path)
+    print(f"[ASR] Exported {model_name} to ONNX in {time.perf_counter() - start:.1f}s: {output_path}")
+    return output_path
+
+
+def create_asr_backend(model_name="facebook/wav2vec2-base-960h", backend=None, precision=None) -> ASRBackend:
+    """Backend selected by Config.ASR_BACKEND ('torch' or 'onnx')"""
+    backend = backend or Config.ASR_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {backend}")
+    if backend == 'onnx':
+        if (precision or Config.ASR_PRECISION) != 'fp32':
+            print("[WARN] ASR_PRECISION only applies to the torch backend; ONNX runs FP32")
+        return OnnxASRBackend(model_name)
+    return TorchASRBackend(model_name, precision=precision)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR backend tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help='export a wav2vec2 CTC model to ONNX')
+    export.add_argument('--model', default='facebook/wav2vec2-base-960h')
+    export.add_argument('--output', help='defaults to Config.ASR_ONNX_PATH or the model cache folder')
+    export.add_argument('--opset', type=int, default=17)
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_onnx(args.model, args.output or Config.ASR_ONNX_PATH or onnx_model_path(args.model), opset=args.opset)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
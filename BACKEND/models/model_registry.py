@@ -0,0 +1,145 @@
+# backend/models/model_registry.py
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+from config import Config
+
+DEFAULT_ASR_MODEL = "facebook/wav2vec2-base-960h"
+
+
+def _tensor_bytes(value) -> int:
+    """Bytes held by a tensor, or by the tensors inside a tuple/list (packed params)"""
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(v) for v in value)
+    if hasattr(value, 'element_size') and hasattr(value, 'nelement'):
+        return value.element_size() * value.nelement()
+    return 0
+
+
+def model_nbytes(model) -> int:
+    """Approximate weight memory of a loaded model or ASR backend"""
+    if hasattr(model, 'backend'):
+        # Wrappers share a registry-owned backend, which is reported on its own
+        return 0
+    torch_model = getattr(model, 'model', model)
+    if hasattr(torch_model, 'state_dict'):
+        # state_dict also covers quantized packed weights, which parameters() misses
+        return sum(_tensor_bytes(v) for v in torch_model.state_dict().values())
+    onnx_path = getattr(model, 'onnx_path', None)
+    if onnx_path and os.path.exists(onnx_path):
+        return os.path.getsize(onnx_path)
+    return 0
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of heavy models:
+    - Each key is loaded exactly once, even under concurrent first use;
+      every caller gets the same shared object
+    - Loaders can be registered up front and loaded with preload(), e.g. in
+      the gunicorn master before fork so workers share weights copy-on-write
+    - memory_report() lists the weight bytes and load time of each model
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, loader: Callable[[], Any]):
+        with self._lock:
+            self._loaders.setdefault(key, loader)
+
+    def get(self, key: str, loader: Callable[[], Any] | None = None):
+        """Shared model for key, loading it on first use"""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            if loader is not None:
+                self._loaders.setdefault(key, loader)
+            loader = self._loaders.get(key)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if loader is None:
+            raise KeyError(f"No loader registered for model {key}")
+
+        # Per-key lock: other models keep loading in parallel
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                print(f"[MODELS] Loading {key}...")
+                start = time.perf_counter()
+                model = loader()
+                self._load_seconds[key] = time.perf_counter() - start
+                self._models[key] = model
+                print(f"[MODELS] {key} loaded in {self._load_seconds[key]:.1f}s")
+        return model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def preload(self, keys=None):
+        """Load registered models now (all of them by default)"""
+        for key in list(keys or self._loaders):
+            self.get(key)
+
+    def memory_report(self) -> Dict[str, Any]:
+        models = {}
+        for key, model in list(self._models.items()):
+            nbytes = model_nbytes(model)
+            models[key] = {
+                'bytes': nbytes,
+                'mb': round(nbytes / (1024 * 1024), 1),
+                'load_seconds': round(self._load_seconds.get(key, 0.0), 2)
+            }
+        return {
+            'pid': os.getpid(),
+            'models': models,
+            'registered': sorted(self._loaders),
+            'total_bytes': sum(m['bytes'] for m in models.values())
+        }
+
+
+_model_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide model registry"""
+    global _model_registry
+    if _model_registry is None:
+        with _registry_lock:
+            if _model_registry is None:
+                _model_registry = ModelRegistry()
+    return _model_registry
+
+
+def asr_backend_key(model_name=DEFAULT_ASR_MODEL, backend=None, precision=None) -> str:
+    return f"asr:{model_name}:{backend or Config.ASR_BACKEND}:{precision or Config.ASR_PRECISION}"
+
+
+def get_asr_backend(model_name=DEFAULT_ASR_MODEL, backend=None, precision=None):
+    """Shared ASR backend (models/asr_backends.py) for this model, runtime and precision"""
+    def load():
+        from models.asr_backends import create_asr_backend
+        return create_asr_backend(model_name, backend=backend, precision=precision)
+
+    return get_model_registry().get(asr_backend_key(model_name, backend, precision), load)
+
+
+def get_pronunciation_model():
+    """Shared Wav2Vec2PronunciationModel (imports torch/transformers on first use)"""
+    def load():
+        from models.wav2vec2_pronunciation_model import Wav2Vec2PronunciationModel
+        return Wav2Vec2PronunciationModel()
+
+    return get_model_registry().get("pronunciation", load)
+
+
+def preload_default_models():
+    """Load the models every worker needs; call before forking workers"""
+    get_pronunciation_model()
@@ -1,8 +1,52 @@
-import fitz  # PyMuPDF
-import pdfplumber
 import uuid
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any
+from config import Config
+from services.extraction_cache import get_extraction_cache, hash_file
+
+ENGINES = ('pdfplumber', 'pymupdf')
+
+_process_pool = None
+
+
+def _get_process_pool():
+    """Shared pool for page-range extraction (spawned, so it is safe next to torch threads)"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=Config.PDF_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _process_pool
+
+
+def _iter_page_range(pdf_path: str, start: int, end: int, engine: str):
+    """Yield the text of pages [start, end) one page at a time"""
+    # PDF libraries are imported on first use to keep app startup fast
+    if engine == 'pymupdf':
+        import fitz  # PyMuPDF
+        with fitz.open(pdf_path) as doc:
+            for page_num in range(start, end):
+                yield doc[page_num].get_text("text") or ""
+        return
+
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            yield page.extract_text() or ""
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int, engine: str) -> List[str]:
+    """Text of pages [start, end); runs inside pool workers"""
+    return list(_iter_page_range(pdf_path, start, end, engine))
+
+
+def count_pages(pdf_path: str) -> int:
+    import fitz  # PyMuPDF
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
 
 
 class PDFProcessor:
@@ -11,47 +55,120 @@ class PDFProcessor:
     - Extracts every word with exact coordinates (PDF)
     - Supports word selection
     - Tracks practice statistics
+    Large PDFs are split into page ranges that are extracted in parallel
+    by a process pool; 'pymupdf' is a faster engine for plain text lines.
     """
 
+    # Bump whenever extraction output changes so cached results are not reused
+    EXTRACTOR_REVISION = 1
+
     def __init__(self):
         self.words: List[Dict[str, Any]] = []
         self.sentences: List[Dict[str, Any]] = []
         self.page_texts: List[str] = []
         self.pages: int = 0
         self.current_pdf_path: str | None = None
+        self.content_hash: str | None = None
+
+    @classmethod
+    def extractor_version(cls, engine: str) -> str:
+        return f"{engine}-lines-{cls.EXTRACTOR_REVISION}"
+
+    def _iter_page_texts(self, pdf_path: str, engine: str, workers: int):
+        """Yield page texts in page order, from one process or a pool"""
+        if workers <= 1 or self.pages < Config.PDF_PARALLEL_MIN_PAGES:
+            yield from _iter_page_range(pdf_path, 0, self.pages, engine)
+            return
+
+        # A few ranges per worker keeps the pool busy when pages vary in cost
+        chunk = max(1, -(-self.pages // (workers * 4)))
+        starts = list(range(0, self.pages, chunk))
+        ranges = _get_process_pool().map(
+            _extract_page_range,
+            [pdf_path] * len(starts),
+            starts,
+            [min(start + chunk, self.pages) for start in starts],
+            [engine] * len(starts)
+        )
+        for texts in ranges:
+            for text in texts:
+                yield text
+
+    def _add_page(self, page_num: int, text: str):
+        self.page_texts.append(text)
+
+        # Split by lines as they appear in the PDF
+        raw_lines = text.split('\n')
 
-    def _extract_from_pdf(self, pdf_path: str):
-        with pdfplumber.open(pdf_path) as pdf:
-            self.pages = len(pdf.pages)
-            for page_num, page in enumerate(pdf.pages):
-                text = page.extract_text() or ""
-                self.page_texts.append(text)
-                
-                # Split by lines as they appear in the PDF
-                raw_lines = text.split('\n')
-                
-                line_in_page = 1
-                for line_text in raw_lines:
-                    line_text = line_text.strip()
-                    if line_text:
-                        self.sentences.append({
-                            'text': line_text,
-                            'page': page_num + 1,
-                            'line': line_in_page,
-                            'selected': False,
-                            'global_index': len(self.sentences)
-                        })
-                        line_in_page += 1
-
-    def extract_text_with_positions(self, file_path: str) -> List[Dict[str, Any]]:
+        line_in_page = 1
+        for line_text in raw_lines:
+            line_text = line_text.strip()
+            if line_text:
+                self.sentences.append({
+                    'text': line_text,
+                    'page': page_num + 1,
+                    'line': line_in_page,
+                    'selected': False,
+                    'global_index': len(self.sentences)
+                })
+                line_in_page += 1
+
+    def iter_pages(self, file_path: str, engine: str | None = None, workers: int | None = None,
+                   content_hash: str | None = None):
         """
-        Extract text from PDF and split into lines for practice.
+        Extract page by page, yielding (page_number, page_sentences) as soon
+        as each page is ready. Cached documents are replayed page by page.
+        engine: 'pdfplumber' (default) or 'pymupdf' (fast path, no coordinates).
+        workers: processes for page-range extraction (Config.PDF_EXTRACT_WORKERS).
         """
+        engine = engine or Config.PDF_EXTRACT_ENGINE
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown PDF extraction engine: {engine}")
+        workers = Config.PDF_EXTRACT_WORKERS if workers is None else workers
+
         self.sentences = []
         self.page_texts = []
         self.current_pdf_path = file_path
-        
-        self._extract_from_pdf(file_path)
+
+        # Reuse the extraction of an identical file if we have one
+        self.content_hash = content_hash or hash_file(file_path)
+        if self.load_cached(self.content_hash, engine, file_path):
+            by_page: List[List[Dict[str, Any]]] = [[] for _ in range(self.pages)]
+            for sentence in self.sentences:
+                by_page[sentence['page'] - 1].append(sentence)
+            for page_num, page_sentences in enumerate(by_page):
+                yield page_num + 1, page_sentences
+            return
+
+        self.pages = count_pages(file_path)
+        for page_num, text in enumerate(self._iter_page_texts(file_path, engine, workers)):
+            first = len(self.sentences)
+            self._add_page(page_num, text)
+            yield page_num + 1, self.sentences[first:]
+
+        get_extraction_cache().save(self.content_hash, self.extractor_version(engine), self.pages, self.page_texts, self.sentences)
+
+    def load_cached(self, content_hash: str, engine: str | None = None, file_path: str | None = None) -> bool:
+        """Restore a previous extraction from the extraction cache; False on a miss"""
+        engine = engine or Config.PDF_EXTRACT_ENGINE
+        cached = get_extraction_cache().load(content_hash, self.extractor_version(engine))
+        if cached is None:
+            return False
+
+        self.sentences = cached['sentences']
+        self.page_texts = cached['page_texts']
+        self.pages = cached['pages']
+        self.current_pdf_path = file_path
+        self.content_hash = content_hash
+        return True
+
+    def extract_text_with_positions(self, file_path: str, engine: str | None = None,
+                                    workers: int | None = None) -> List[Dict[str, Any]]:
+        """
+        Extract text from PDF and split into lines for practice.
+        """
+        for _ in self.iter_pages(file_path, engine=engine, workers=workers):
+            pass
                         
         return self.sentences
 
@@ -66,3 +183,20 @@ class PDFProcessor:
             'completion_rate': (selected / total * 100) if total > 0 else 0,
             'total_pages': self.pages
         }
+
+    def update_sentence_selection(self, sentence_indices: List[int], selected: bool = True):
+        """Mark sentences (by global index) as selected or not"""
+        for index in sentence_indices:
+            if 0 <= index < len(self.sentences):
+                self.sentences[index]['selected'] = selected
+
+    def get_selected_sentences(self) -> List[Dict[str, Any]]:
+        """All sentences currently marked as selected"""
+        return [s for s in self.sentences if s.get('selected')]
+
+    def update_sentence_text(self, sentence_index: int, new_text: str):
+        """Replace the practice text of one sentence"""
+        if not 0 <= sentence_index < len(self.sentences):
+            raise IndexError(f"Sentence index {sentence_index} out of range")
+        self.sentences[sentence_index]['text'] = new_text
+        self.sentences[sentence_index]['customized'] = True
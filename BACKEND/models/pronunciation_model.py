@@ -6,7 +6,7 @@ import torch
 from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
 
 from phonemizer import phonemize
-from dtw import dtw
+from services.phoneme_alignment import get_phoneme_aligner
 
 
 class Wav2Vec2PronunciationModel:
@@ -61,14 +61,9 @@ class Wav2Vec2PronunciationModel:
         exp_ph = self.word_to_phonemes(expected)
         spk_ph = self.word_to_phonemes(spoken)
 
-        dist, _, _, _ = dtw(
-            np.array(exp_ph).reshape(-1, 1),
-            np.array(spk_ph).reshape(-1, 1),
-            lambda x, y: 0 if x == y else 1
-        )
-
-        score = max(0, 1 - (dist / max(len(exp_ph), 1)))
-        return round(score, 2), exp_ph, spk_ph
+        # Confusion-weighted phoneme alignment (services/phoneme_alignment.py)
+        alignment = get_phoneme_aligner().align(exp_ph, spk_ph)
+        return alignment['score'], exp_ph, spk_ph, alignment
 
     # ---------- MAIN ENTRYPOINT ----------
     def evaluate(self, audio_bytes, expected_word):
@@ -77,7 +72,7 @@ class Wav2Vec2PronunciationModel:
 
         spoken_text = self.transcribe(audio)
 
-        score, expected_ph, spoken_ph = self.pronunciation_score(
+        score, expected_ph, spoken_ph, alignment = self.pronunciation_score(
             expected_word,
             spoken_text
         )
@@ -102,5 +97,6 @@ class Wav2Vec2PronunciationModel:
             "status": status,
             "expected_phonemes": expected_ph,
             "spoken_phonemes": spoken_ph,
+            "phoneme_alignment": alignment['path'],
             "feedback": feedback
         }
@@ -0,0 +1,84 @@
+# backend/models/wav2vec2_loader.py
+import os
+import re
+import time
+import torch
+import transformers
+from transformers import Wav2Vec2Config, Wav2Vec2ForCTC, Wav2Vec2Processor
+from config import Config
+
+try:
+    from transformers.initialization import no_init_weights
+except ImportError:  # transformers < 5
+    from transformers.modeling_utils import no_init_weights
+
+PRECISIONS = ('fp32', 'int8')
+
+# Bump whenever the quantization recipe changes so cached weights are rebuilt
+QUANTIZATION_REVISION = 1
+
+
+def quantize_int8(model):
+    """Dynamic INT8 quantization of every nn.Linear (weights int8, activations fp32)"""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_cache_path(model_name, folder=None):
+    """Where the INT8 weights of model_name are cached for this torch/transformers"""
+    folder = folder or Config.ASR_MODEL_CACHE_FOLDER
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+    return os.path.join(
+        folder,
+        f"{safe_name}-int8-r{QUANTIZATION_REVISION}"
+        f"-torch{torch.__version__}-tf{transformers.__version__}.pt"
+    )
+
+
+def load_wav2vec2(model_name="facebook/wav2vec2-base-960h", precision=None):
+    """
+    Load (processor, model) in eval mode.
+    precision: 'fp32' (default) or 'int8' (dynamic quantization, CPU only).
+    INT8 weights are cached on disk, so later starts skip the FP32 load and
+    the conversion.
+    """
+    precision = precision or Config.ASR_PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown ASR precision: {precision}")
+
+    processor = Wav2Vec2Processor.from_pretrained(model_name)
+    if precision == 'int8':
+        model = _load_int8(model_name)
+    else:
+        model = Wav2Vec2ForCTC.from_pretrained(model_name)
+    model.eval()
+    return processor, model
+
+
+def _load_int8(model_name):
+    path = quantized_cache_path(model_name)
+    start = time.perf_counter()
+
+    if os.path.exists(path):
+        try:
+            # Build the quantized module skeleton without touching the FP32
+            # checkpoint, then fill it from the cache
+            config = Wav2Vec2Config.from_pretrained(model_name)
+            with no_init_weights():
+                skeleton = Wav2Vec2ForCTC(config)
+            model = quantize_int8(skeleton.eval())
+            model.load_state_dict(torch.load(path, map_location='cpu'))
+            print(f"[ASR] Loaded cached INT8 weights in {time.perf_counter() - start:.2f}s: {path}")
+            return model
+        except Exception as e:
+            print(f"[WARN] Ignoring unusable INT8 cache {path}: {e}")
+
+    model = quantize_int8(Wav2Vec2ForCTC.from_pretrained(model_name).eval())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARN] Could not cache INT8 weights: {e}")
+    print(f"[ASR] Quantized {model_name} to INT8 in {time.perf_counter() - start:.2f}s")
+    return model
@@ -1,65 +1,85 @@
 import io
 import re
 import numpy as np
-import soundfile as sf
-import torch
-from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
-from phonemizer import phonemize
-from dtw import dtw
 import warnings
+from config import Config
+from models.model_registry import get_asr_backend
+from services.inference_batcher import BatchedInferenceEngine
+from services.ctc_decoding import CTCDecoder
+from services.forced_alignment import ForcedAligner
+from services.debug_capture import get_debug_capture
+from services.phoneme_service import get_phoneme_service
+from services.vad import get_vad
+from services.scoring_engine import get_scoring_engine
+from services.word_scorer import get_word_scorer, unordered_word_accuracy, word_feedback
+from services.phoneme_alignment import get_phoneme_aligner
+from services.reference_store import get_reference_store
+from services.audio_ingest import batch_input_values, normalize_peak, read_audio, source_bytes, source_size
 warnings.filterwarnings('ignore')
 
+EVALUATION_STRATEGIES = ('transcribe', 'forced_alignment')
+
 
 class Wav2Vec2PronunciationModel:
 
-    def __init__(self, model_name="facebook/wav2vec2-base-960h"):
+    def __init__(self, model_name="facebook/wav2vec2-base-960h", precision=None, backend=None):
         print("Loading wav2vec2 model...")
-        self.processor = Wav2Vec2Processor.from_pretrained(model_name)
-        self.model = Wav2Vec2ForCTC.from_pretrained(model_name)
-        self.model.eval()
+        # Runtime (torch / onnx) and precision come from Config unless given;
+        # the backend is shared process-wide through the model registry
+        self.backend = get_asr_backend(model_name, backend=backend, precision=precision)
+        self.processor = self.backend.processor
+        print(f"Wav2vec2 backend: {self.backend.name}")
+        # Logits -> text (Config.CTC_DECODING_MODE)
+        self.decoder = CTCDecoder.from_tokenizer(self.processor.tokenizer)
+        # Expected text -> word timings for the 'forced_alignment' strategy
+        self.aligner = ForcedAligner.from_tokenizer(self.processor.tokenizer)
+        self.evaluation_strategy = Config.EVALUATION_STRATEGY
+        if self.evaluation_strategy not in EVALUATION_STRATEGIES:
+            raise ValueError(f"Unknown EVALUATION_STRATEGY: {self.evaluation_strategy}")
 
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(self.device)
+        # Concurrent requests share forward passes through the micro-batcher;
+        # it returns logits, decoding stays on the calling thread. Models
+        # without attention masks (wav2vec2-base) can only batch clips of
+        # exactly equal length, which uploads practically never are, so the
+        # worker would only add queueing delay: they call the backend directly.
+        self.inference_engine = None
+        self.batching_disabled_reason = None
+        if not Config.ASR_BATCHING_ENABLED:
+            self.batching_disabled_reason = "ASR_BATCHING_ENABLED is false"
+        elif not self.backend.use_attention_mask:
+            self.batching_disabled_reason = "model has no attention mask; only equal-length clips could share a batch"
+            print(f"Wav2vec2 micro-batching off: {self.batching_disabled_reason}")
+        else:
+            self.inference_engine = BatchedInferenceEngine(
+                self.batch_logits,
+                max_batch_size=Config.ASR_MAX_BATCH_SIZE,
+                max_wait_ms=Config.ASR_MAX_WAIT_MS,
+                name="wav2vec2"
+            )
         print("Wav2vec2 ready")
 
     # ---------- AUDIO ----------
-    def load_audio_from_bytes(self, audio_bytes):
-        """Load and resample audio to 16kHz"""
+    def load_audio_from_bytes(self, audio_bytes, capture_id=None):
+        """Load and resample audio to 16kHz; audio_bytes may also be an upload stream"""
         try:
-            # Debug: Save audio to file to check quality
-            self.save_debug_audio(audio_bytes, "before_processing.wav")
-            
-            # Load audio
-            audio, sr = sf.read(io.BytesIO(audio_bytes))
-            
-            print(f"DEBUG: Original audio - Shape: {audio.shape}, SR: {sr}, Duration: {len(audio)/sr:.2f}s")
+            # Sampled debug capture of the raw upload (no-op unless enabled)
+            if capture_id is not None:
+                get_debug_capture().capture_bytes(capture_id, "before_processing.wav", source_bytes(audio_bytes))
             
-            # Convert to mono if stereo
-            if len(audio.shape) > 1:
-                print(f"DEBUG: Converting stereo to mono")
-                audio = audio.mean(axis=1)
+            # Decode straight to mono float32 at 16kHz (services/audio_ingest.py)
+            audio, original_sr = read_audio(audio_bytes, target_rate=16000)
+            sr = 16000
+            print(f"DEBUG: Decoded audio - Original SR: {original_sr}, Samples at 16kHz: {len(audio)}, Duration: {len(audio)/sr:.2f}s")
             
-            # Resample to 16kHz if needed
-            if sr != 16000:
-                print(f"DEBUG: Resampling from {sr}Hz to 16000Hz")
-                import librosa
-                audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
-                sr = 16000
+            # Normalize audio in place
+            normalize_peak(audio)
             
-            # Normalize audio
-            if len(audio) > 0:
-                max_val = np.max(np.abs(audio))
-                print(f"DEBUG: Max audio value before normalization: {max_val}")
-                if max_val > 0:
-                    audio = audio / (max_val + 1e-8)
-                    print(f"DEBUG: Audio normalized")
-            
-            # Trim silence
-            audio = self.trim_silence(audio)
+            # Drop leading/trailing silence and long pauses before the model
+            audio = self.remove_silence(audio)
             print(f"DEBUG: After trimming - Length: {len(audio)}, Duration: {len(audio)/sr:.2f}s")
             
-            # Save processed audio for debugging
-            self.save_audio_to_file(audio, sr, "after_processing.wav")
+            # Sampled debug capture of the processed clip
+            get_debug_capture().capture_audio(capture_id, "after_processing.wav", audio, sr)
             
             return audio, sr
         except Exception as e:
@@ -68,23 +88,17 @@ class Wav2Vec2PronunciationModel:
             traceback.print_exc()
             return np.array([]), 16000
     
-    def save_debug_audio(self, audio_bytes, filename):
-        """Save audio bytes to file for debugging"""
-        try:
-            with open(filename, "wb") as f:
-                f.write(audio_bytes)
-            print(f"DEBUG: Saved raw audio to {filename} ({len(audio_bytes)} bytes)")
-        except Exception as e:
-            print(f"DEBUG: Failed to save audio: {e}")
-    
-    def save_audio_to_file(self, audio, sr, filename):
-        """Save numpy audio array to file"""
-        try:
-            sf.write(filename, audio, sr)
-            print(f"DEBUG: Saved processed audio to {filename}")
-        except Exception as e:
-            print(f"DEBUG: Failed to save processed audio: {e}")
-    
+    def remove_silence(self, audio):
+        """Cut non-speech with the VAD (services/vad.py); amplitude trim if disabled or nothing found"""
+        if not Config.VAD_ENABLED or len(audio) == 0:
+            return self.trim_silence(audio)
+        speech = get_vad().remove_silence(audio.astype(np.float32))
+        if len(speech) == 0:
+            print("DEBUG: VAD found no speech, falling back to amplitude trim")
+            return self.trim_silence(audio)
+        print(f"DEBUG: VAD kept {len(speech)}/{len(audio)} samples")
+        return speech
+
     def trim_silence(self, audio, threshold=0.02):
         """Remove leading and trailing silence"""
         if len(audio) == 0:
@@ -104,8 +118,8 @@ class Wav2Vec2PronunciationModel:
         return audio
 
     # ---------- ASR ----------
-    def transcribe(self, audio):
-        """Transcribe audio to text"""
+    def transcribe(self, audio, language_model=None):
+        """Transcribe audio to text (language_model: see CTCDecoder.language_model)"""
         if len(audio) == 0:
             print("DEBUG: Empty audio, cannot transcribe")
             return ""
@@ -113,29 +127,13 @@ class Wav2Vec2PronunciationModel:
         try:
             print(f"DEBUG: Transcribing audio of length {len(audio)}")
             
-            # Ensure audio is float32
-            audio = audio.astype(np.float32)
+            # Ensure audio is float32 (no copy if it already is)
+            audio = np.asarray(audio, dtype=np.float32)
             
             # Check audio statistics
             print(f"DEBUG: Audio stats - Min: {audio.min():.4f}, Max: {audio.max():.4f}, Mean: {audio.mean():.4f}")
             
-            # Play audio for debugging (optional)
-            self.play_audio_for_debug(audio, 16000)
-            
-            inputs = self.processor(
-                audio,
-                sampling_rate=16000,
-                return_tensors="pt",
-                padding=True
-            )
-
-            print(f"DEBUG: Input shape to model: {inputs.input_values.shape}")
-            
-            with torch.no_grad():
-                logits = self.model(inputs.input_values.to(self.device)).logits
-
-            pred_ids = torch.argmax(logits, dim=-1)
-            transcription = self.processor.decode(pred_ids[0])
+            transcription = self.decoder.decode(self.clip_logits(audio), language_model)
             
             print(f"DEBUG: Raw transcription: '{transcription}'")
             return transcription.lower().strip()
@@ -144,54 +142,82 @@ class Wav2Vec2PronunciationModel:
             import traceback
             traceback.print_exc()
             return ""
-    
-    def play_audio_for_debug(self, audio, sr):
-        """Play audio for debugging (optional)"""
-        try:
-            import sounddevice as sd
-            print(f"DEBUG: Playing audio for {len(audio)/sr:.2f} seconds...")
-            sd.play(audio, sr)
-            # Don't wait for playback to complete
-            # sd.wait()
-        except Exception as e:
-            print(f"DEBUG: Could not play audio: {e}")
+
+    def transcribe_batch(self, audios, language_models=None):
+        """Transcribe several 16kHz clips with as few forward passes as batch_logits allows"""
+        language_models = language_models or [None] * len(audios)
+        return [
+            self.decoder.decode(logits, language_model)
+            for logits, language_model in zip(self.batch_logits(audios), language_models)
+        ]
+
+    def batch_logits(self, audios):
+        """
+        Logits of several 16kHz clips (frames x vocabulary each, padding
+        frames removed). Models without attention masks (wav2vec2-base:
+        group norm sees the zero padding) only share a forward pass between
+        clips of the same length, so batching never changes a clip's logits.
+        """
+        if self.backend.use_attention_mask:
+            groups = [list(range(len(audios)))]
+        else:
+            by_length = {}
+            for index, audio in enumerate(audios):
+                by_length.setdefault(len(audio), []).append(index)
+            groups = list(by_length.values())
+
+        results = [None] * len(audios)
+        for group in groups:
+            # Same values as self.processor(..., padding=True), one allocation per batch
+            input_values, attention_mask = batch_input_values(
+                [audios[i] for i in group], do_normalize=self.processor.feature_extractor.do_normalize
+            )
+            print(f"DEBUG: Input shape to model: {input_values.shape}")
+            logits = self.backend.logits(input_values, attention_mask)
+
+            # Padded frames are cut off before decoding
+            frame_lengths = self.backend.output_lengths(attention_mask.sum(-1))
+            for row, index in enumerate(group):
+                results[index] = logits[row, :int(frame_lengths[row])]
+        return results
+
+    def clip_logits(self, audio):
+        """Logits of one 16kHz clip (frames x vocabulary), through the micro-batcher when enabled"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.inference_engine is not None:
+            return self.inference_engine.infer(audio)
+        return self.batch_logits([audio])[0]
 
     # ---------- PHONEMES ----------
     def word_to_phonemes(self, text):
-        """Convert text to phonemes"""
+        """Convert text to phonemes (cached, see services/phoneme_service.py)"""
         if not text or len(text.strip()) == 0:
             return []
-        try:
-            print(f"DEBUG: Converting to phonemes: '{text}'")
-            ph = phonemize(
-                text,
-                language="en-us",
-                backend="espeak",
-                strip=True,
-                preserve_punctuation=False,
-                with_stress=True
-            )
-            # Split by spaces, filter empty strings
-            phonemes = [p for p in ph.split() if p]
-            print(f"DEBUG: Phonemes: {phonemes}")
-            return phonemes
-        except Exception as e:
-            print(f"Phonemizer failed: {e}")
-            return []
+        print(f"DEBUG: Converting to phonemes: '{text}'")
+        phonemes = get_phoneme_service().phonemize(text, language="en-us")
+        print(f"DEBUG: Phonemes: {phonemes}")
+        return phonemes
 
     # ---------- SIMPLIFIED SCORING ----------
-    def pronunciation_score_simple(self, expected, spoken):
-        """Simplified scoring - more reliable"""
+    def pronunciation_score_simple(self, expected, spoken, reference=None):
+        """
+        Simplified scoring - more reliable. Returns (score, expected phonemes,
+        spoken phonemes, word scores). reference: the expected sentence's
+        artifacts (services/reference_store.py), looked up by text if omitted.
+        """
+        if reference is None and expected:
+            reference = get_reference_store().for_text(expected)
+        word_scores = get_word_scorer().score(expected, spoken, reference['tokens'] if reference else None)
         if not expected or not spoken:
             print(f"DEBUG: Missing text - Expected: {expected}, Spoken: {spoken}")
-            return 0.0, [], []
+            return 0.0, [], [], word_scores
         
         print(f"\n{'='*30} SCORING {'='*30}")
         print(f"Original Expected: '{expected}'")
         print(f"Original Spoken: '{spoken}'")
         
         # Clean texts
-        clean_exp = re.sub(r'[^\w\s]', '', expected.lower()).strip()
+        clean_exp = reference['normalized']
         clean_spk = re.sub(r'[^\w\s]', '', spoken.lower()).strip()
         
         print(f"Cleaned Expected: '{clean_exp}'")
@@ -200,12 +226,12 @@ class Wav2Vec2PronunciationModel:
         # 1. Exact word match (for short words/phrases)
         if clean_exp == clean_spk:
             print("DEBUG: Perfect match!")
-            return 1.0, [], []
+            return 1.0, [], [], word_scores
         
-        # 2. Use SequenceMatcher for similarity
-        from difflib import SequenceMatcher
-        similarity = SequenceMatcher(None, clean_exp, clean_spk).ratio()
-        print(f"DEBUG: SequenceMatcher similarity: {similarity:.4f}")
+        # 2. Sentence similarity (services/scoring_engine.py, Config.SCORING_MODE)
+        engine = get_scoring_engine()
+        similarity = engine.ratio(clean_exp, clean_spk)
+        print(f"DEBUG: Sentence similarity ({engine.backend}): {similarity:.4f}")
         
         # 3. Check for partial matches
         exp_words = clean_exp.split()
@@ -215,25 +241,16 @@ class Wav2Vec2PronunciationModel:
         print(f"DEBUG: Spoken words: {spk_words}")
         
         if len(exp_words) > 0 and len(spk_words) > 0:
-            # Calculate word-level accuracy
-            correct_words = 0
-            for exp_word in exp_words:
-                # Check if this expected word appears in spoken words
-                for spk_word in spk_words:
-                    if exp_word == spk_word:
-                        correct_words += 1
-                        break
-                    # Partial match (substring)
-                    elif exp_word in spk_word or spk_word in exp_word:
-                        correct_words += 0.5
-                        break
-            
-            word_accuracy = correct_words / len(exp_words) if exp_words else 0
-            print(f"DEBUG: Word-level accuracy: {word_accuracy:.4f} ({correct_words}/{len(exp_words)})")
+            # In-order word alignment (services/word_scorer.py), reused as word feedback;
+            # compat mode keeps the earlier order-insensitive accuracy in the score
+            if engine.mode == 'compat':
+                word_accuracy = unordered_word_accuracy(exp_words, spk_words)
+            else:
+                word_accuracy = word_scores['accuracy']
+            print(f"DEBUG: Word-level accuracy: {word_accuracy:.4f} ({word_scores['extra_words']} extra spoken words)")
             
             # Calculate character-level accuracy
-            char_similarity = SequenceMatcher(None, clean_exp.replace(" ", ""), 
-                                            clean_spk.replace(" ", "")).ratio()
+            char_similarity = engine.ratio(clean_exp.replace(" ", ""), clean_spk.replace(" ", ""))
             print(f"DEBUG: Character-level similarity: {char_similarity:.4f}")
             
             # Combine scores with weights
@@ -248,24 +265,136 @@ class Wav2Vec2PronunciationModel:
         print(f"DEBUG: Final calculated score: {final_score:.4f}")
         print(f"{'='*70}\n")
         
-        # Get phonemes for feedback
-        exp_ph = self.word_to_phonemes(expected)
+        # Get phonemes for feedback (expected side prepared with the reference)
+        exp_ph = reference['phonemes']
         spk_ph = self.word_to_phonemes(spoken)
         
-        return round(final_score, 2), exp_ph, spk_ph
+        return round(final_score, 2), exp_ph, spk_ph, word_scores
 
     # ---------- SENTENCE-LEVEL EVALUATION ----------
-    def evaluate_sentence(self, audio_bytes, expected_sentence):
-        """Evaluate pronunciation of a full sentence"""
+    def evaluate_sentence(self, audio_bytes, expected_sentence, reference=None, document_model=None, strategy=None):
+        """
+        Evaluate pronunciation of a full sentence with the given strategy
+        (default Config.EVALUATION_STRATEGY): 'transcribe' or
+        'forced_alignment' (see evaluate_sentence_aligned). reference: see
+        pronunciation_score_simple; document_model: the document's word
+        language model for beam decoding (ReferenceStore.language_model)
+        """
+        if (strategy or self.evaluation_strategy) == 'forced_alignment':
+            return self.evaluate_sentence_aligned(audio_bytes, expected_sentence)
+
+        audio, sr, capture_id, error = self._load_evaluation_audio(audio_bytes, expected_sentence)
+        if error is not None:
+            return error
+        
+        # Transcribe using wav2vec2
+        print(f"\nTranscribing with wav2vec2 ({self.decoder.mode} decoding)...")
+        if reference is None and self.decoder.mode == 'reference':
+            reference = get_reference_store().for_text(expected_sentence)
+        spoken_text = self.transcribe(audio, self.decoder.language_model(reference, document_model))
+        print(f"Wav2Vec2 transcription: '{spoken_text}'")
+        
+        # If transcription is poor, try Google fallback; decoding biased to
+        # the expected text already recovers what the fallback was for
+        should_use_fallback = self.decoder.mode != 'reference' and (
+            not spoken_text or 
+            len(spoken_text) < len(expected_sentence) * 0.3 or
+            spoken_text.strip() == ""
+        )
+        
+        if should_use_fallback:
+            print("\nTranscription poor, trying Google fallback...")
+            google_text = self.google_fallback_safe(audio, sr, capture_id=capture_id)
+            if google_text and len(google_text) > 0:
+                print(f"Google fallback result: '{google_text}'")
+                # Use Google if it's better
+                if len(google_text) > len(spoken_text) * 1.2:
+                    spoken_text = google_text
+                    print("Using Google transcription")
+                else:
+                    print("Keeping wav2vec2 transcription")
+        
+        result = self.score_transcription(expected_sentence, spoken_text, reference)
+        if spoken_text and spoken_text.strip():
+            result["debug_info"] = {
+                "audio_samples": len(audio),
+                "audio_duration": f"{len(audio)/sr:.2f}s",
+                "sample_rate": sr,
+                "model_used": "wav2vec2" if self.decoder.mode == 'reference' else "wav2vec2 with Google fallback",
+                "decoding": self.decoder.mode
+            }
+        return result
+
+    def evaluate_sentence_aligned(self, audio_bytes, expected_sentence):
+        """
+        Evaluate a sentence by CTC forced alignment of the expected text
+        against the emissions (services/forced_alignment.py): per-word
+        times and confidences from one Viterbi pass, without transcription
+        or phonemizer. spoken_text is the greedy reading of the same logits,
+        for the feedback message only.
+        """
+        audio, sr, _, error = self._load_evaluation_audio(audio_bytes, expected_sentence)
+        if error is not None:
+            return error
+
+        print("\nAligning expected text with wav2vec2 emissions...")
+        result = self.score_alignment(expected_sentence, self.clip_logits(audio), sr)
+        if "debug_info" in result:
+            result["debug_info"] = {
+                "audio_samples": len(audio),
+                "audio_duration": f"{len(audio)/sr:.2f}s",
+                "sample_rate": sr,
+                **result["debug_info"]
+            }
+        return result
+
+    def score_alignment(self, expected_sentence, logits, sample_rate=16000, spoken_text=None):
+        """
+        Result of the 'forced_alignment' strategy from one clip's logits
+        (also used for the final pass of a stream). spoken_text defaults
+        to the greedy reading of the logits.
+        """
+        frame_seconds = float(np.prod(self.backend.config.conv_stride)) / sample_rate
+        alignment = self.aligner.align(logits, expected_sentence, frame_seconds)
+        if spoken_text is None:
+            spoken_text = self.decoder.greedy(logits).lower()
+        if alignment is None:
+            return self._too_short(expected_sentence, f"Cannot align {len(logits)} frames to the expected text")
+
+        score = alignment['score']
+        status, feedback = self.score_feedback(score, expected_sentence, spoken_text)
+        print(f"Forced alignment score: {score:.2f}/1.00, status {status}")
+        print(f"{'='*50}\n")
+
+        return {
+            "expected_sentence": expected_sentence,
+            "spoken_text": spoken_text,
+            "score": float(score),
+            "status": status,
+            "expected_phonemes": [],
+            "spoken_phonemes": [],
+            "phoneme_alignment": None,
+            "feedback": feedback,
+            "word_feedback": [{'word': w['word'], 'status': w['status']} for w in alignment['words']],
+            "word_timings": alignment['words'],
+            "debug_info": {
+                "model_used": "wav2vec2 forced alignment",
+                "log_likelihood": alignment['log_likelihood']
+            }
+        }
+
+    def _load_evaluation_audio(self, audio_bytes, expected_sentence):
+        """Decode and check the recording; returns (audio, sr, capture_id, error result or None)"""
         print(f"\n{'='*50}")
         print(f"EVALUATION STARTED")
         print(f"Expected sentence: '{expected_sentence}'")
-        print(f"Audio bytes received: {len(audio_bytes)} bytes")
+        audio_size = source_size(audio_bytes) if audio_bytes is not None else 0
+        print(f"Audio bytes received: {audio_size} bytes")
         
         # Check if audio_bytes is valid
-        if audio_bytes is None or len(audio_bytes) < 100:
+        if audio_size < 100:
             print("ERROR: No audio bytes or too short")
-            return {
+            return None, None, None, {
                 "expected_sentence": expected_sentence,
                 "spoken_text": "",
                 "score": 0.0,
@@ -274,48 +403,31 @@ class Wav2Vec2PronunciationModel:
                 "debug": "No audio bytes or too short"
             }
         
-        # Load and transcribe audio
+        # Load audio
         print("Loading audio...")
-        audio, sr = self.load_audio_from_bytes(audio_bytes)
+        capture_id = get_debug_capture().start_capture()
+        audio, sr = self.load_audio_from_bytes(audio_bytes, capture_id=capture_id)
         
         if len(audio) < 800:  # Less than 0.05 second at 16kHz
             print(f"ERROR: Audio too short after processing: {len(audio)} samples")
-            return {
-                "expected_sentence": expected_sentence,
-                "spoken_text": "",
-                "score": 0.0,
-                "status": "error",
-                "feedback": "Audio recording was too short. Please speak for at least 1-2 seconds.",
-                "debug": f"Audio too short: {len(audio)} samples"
-            }
+            return audio, sr, capture_id, self._too_short(expected_sentence, f"Audio too short: {len(audio)} samples")
         
         print(f"Audio loaded successfully: {len(audio)} samples, {sr} Hz")
         print(f"Audio duration: {len(audio)/sr:.2f} seconds")
-        
-        # Transcribe using wav2vec2
-        print("\nTranscribing with wav2vec2...")
-        spoken_text = self.transcribe(audio)
-        print(f"Wav2Vec2 transcription: '{spoken_text}'")
-        
-        # If transcription is poor, try Google fallback
-        should_use_fallback = (
-            not spoken_text or 
-            len(spoken_text) < len(expected_sentence) * 0.3 or
-            spoken_text.strip() == ""
-        )
-        
-        if should_use_fallback:
-            print("\nTranscription poor, trying Google fallback...")
-            google_text = self.google_fallback_safe(audio, sr)
-            if google_text and len(google_text) > 0:
-                print(f"Google fallback result: '{google_text}'")
-                # Use Google if it's better
-                if len(google_text) > len(spoken_text) * 1.2:
-                    spoken_text = google_text
-                    print("Using Google transcription")
-                else:
-                    print("Keeping wav2vec2 transcription")
-        
+        return audio, sr, capture_id, None
+
+    def _too_short(self, expected_sentence, debug):
+        return {
+            "expected_sentence": expected_sentence,
+            "spoken_text": "",
+            "score": 0.0,
+            "status": "error",
+            "feedback": "Audio recording was too short. Please speak for at least 1-2 seconds.",
+            "debug": debug
+        }
+
+    def score_transcription(self, expected_sentence, spoken_text, reference=None):
+        """Score a finished transcription against the expected sentence"""
         # If still empty, provide helpful feedback
         if not spoken_text or spoken_text.strip() == "":
             print("ERROR: No transcription obtained")
@@ -329,11 +441,14 @@ class Wav2Vec2PronunciationModel:
             }
         
         print(f"\nFinal transcription to evaluate: '{spoken_text}'")
+        if reference is None:
+            reference = get_reference_store().for_text(expected_sentence)
         
         # Calculate pronunciation score
-        score, exp_ph, spk_ph = self.pronunciation_score_simple(
+        score, exp_ph, spk_ph, word_scores = self.pronunciation_score_simple(
             expected_sentence,
-            spoken_text
+            spoken_text,
+            reference
         )
         
         print(f"\nSCORE CALCULATION COMPLETE")
@@ -342,26 +457,14 @@ class Wav2Vec2PronunciationModel:
         print(f"Score: {score:.2f}/1.00")
         
         # Determine feedback based on score
-        if score >= 0.85:
-            status = "excellent"
-            feedback = f"Perfect! You pronounced it correctly: '{expected_sentence}'"
-        elif score >= 0.70:
-            status = "good"
-            feedback = f"Good job! You said: '{spoken_text}'. Very close to: '{expected_sentence}'"
-        elif score >= 0.50:
-            status = "fair"
-            feedback = f"Almost there! You said: '{spoken_text}'. Try to match: '{expected_sentence}'"
-        elif score >= 0.30:
-            status = "needs_improvement"
-            feedback = f"Getting closer. You said: '{spoken_text}'. Listen to the example and repeat: '{expected_sentence}'"
-        else:
-            status = "mispronounced"
-            feedback = f"Let's try again. You said: '{spoken_text}'. Please listen carefully and repeat: '{expected_sentence}'"
+        status, feedback = self.score_feedback(score, expected_sentence, spoken_text)
         
         # Add phoneme feedback if available
+        phoneme_alignment = None
         if exp_ph and spk_ph and len(exp_ph) > 0 and len(spk_ph) > 0:
             if exp_ph != spk_ph:
                 feedback += f"\nPhonemes: Expected {exp_ph}, Heard {spk_ph}"
+            phoneme_alignment = get_phoneme_aligner().align_reference(reference, spk_ph)['path']
         
         print(f"Status: {status}")
         print(f"Feedback: {feedback}")
@@ -374,16 +477,31 @@ class Wav2Vec2PronunciationModel:
             "status": status,
             "expected_phonemes": exp_ph,
             "spoken_phonemes": spk_ph,
+            "phoneme_alignment": phoneme_alignment,
             "feedback": feedback,
-            "debug_info": {
-                "audio_samples": len(audio),
-                "audio_duration": f"{len(audio)/sr:.2f}s",
-                "sample_rate": sr,
-                "model_used": "wav2vec2 with Google fallback"
-            }
+            "word_feedback": word_feedback(word_scores)
         }
 
-    def google_fallback_safe(self, audio, sr):
+    def score_feedback(self, score, expected_sentence, spoken_text):
+        """Status and feedback message for a sentence score"""
+        if score >= 0.85:
+            status = "excellent"
+            feedback = f"Perfect! You pronounced it correctly: '{expected_sentence}'"
+        elif score >= 0.70:
+            status = "good"
+            feedback = f"Good job! You said: '{spoken_text}'. Very close to: '{expected_sentence}'"
+        elif score >= 0.50:
+            status = "fair"
+            feedback = f"Almost there! You said: '{spoken_text}'. Try to match: '{expected_sentence}'"
+        elif score >= 0.30:
+            status = "needs_improvement"
+            feedback = f"Getting closer. You said: '{spoken_text}'. Listen to the example and repeat: '{expected_sentence}'"
+        else:
+            status = "mispronounced"
+            feedback = f"Let's try again. You said: '{spoken_text}'. Please listen carefully and repeat: '{expected_sentence}'"
+        return status, feedback
+
+    def google_fallback_safe(self, audio, sr, capture_id=None):
         """Safer Google fallback using speech_recognition"""
         try:
             print("DEBUG: Attempting Google Speech Recognition fallback...")
@@ -413,10 +531,8 @@ class Wav2Vec2PronunciationModel:
             
             wav_data = wav_io.getvalue()
             
-            # Save for debugging
-            with open("google_fallback_input.wav", "wb") as f:
-                f.write(wav_data)
-            print("DEBUG: Saved audio for Google fallback to 'google_fallback_input.wav'")
+            # Sampled debug capture of what Google receives
+            get_debug_capture().capture_bytes(capture_id, "google_fallback_input.wav", wav_data)
             
             # Use speech_recognition
             recognizer = sr_module.Recognizer()
@@ -439,9 +555,9 @@ class Wav2Vec2PronunciationModel:
             return ""
 
     # ---------- LEGACY COMPATIBILITY ----------
-    def evaluate(self, audio_bytes, expected_word):
+    def evaluate(self, audio_bytes, expected_word, reference=None, document_model=None):
         """Alias for backward compatibility"""
-        return self.evaluate_sentence(audio_bytes, expected_word)
+        return self.evaluate_sentence(audio_bytes, expected_word, reference, document_model)
 
 
 # Test function with actual recording simulation
@@ -532,6 +648,7 @@ def diagnose_audio_recording(audio_bytes, expected_text="test"):
     
     # Try to load and analyze
     try:
+        import soundfile as sf
         audio, sr = sf.read(io.BytesIO(audio_bytes))
         print(f"Successfully loaded audio:")
         print(f"  Shape: {audio.shape}")
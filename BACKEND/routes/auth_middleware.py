@@ -1,6 +1,6 @@
 # backend/routes/auth_middleware.py
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, request
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
 
 def jwt_required_custom(fn):
@@ -23,4 +23,16 @@ def get_current_user_id():
     try:
         return get_jwt_identity()
     except:
-        return None
\ No newline at end of file
+        return None
+
+def get_optional_user_id():
+    """Get current user ID if a valid JWT was sent, otherwise None"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except:
+        return None
+
+def get_session_key():
+    """Key for per-user state: the JWT identity, or the client address when anonymous"""
+    return str(get_optional_user_id() or f"anon:{request.remote_addr}")
@@ -0,0 +1,142 @@
+# backend/routes/ingestion_routes.py
+from flask import Blueprint, request, jsonify
+from werkzeug.utils import secure_filename
+import os
+import uuid
+from config import Config
+from routes.auth_middleware import jwt_required_custom, get_current_user_id
+from services.document_store import get_document_store
+from services.ingestion_jobs import JobCancelled, JobLimitExceeded, get_job_backend
+from services.online_book_processor import OnlineBookProcessor
+from services.reference_store import get_reference_store
+
+ingestion_bp = Blueprint('ingestion', __name__)
+
+
+def _run_online_book(job, text_url):
+    """Job body: download and split an online book, reporting bytes downloaded"""
+    def on_progress(bytes_downloaded, bytes_total):
+        job.report(bytes_downloaded=bytes_downloaded, bytes_total=bytes_total)
+
+    result = OnlineBookProcessor.extract_text_from_url(text_url, progress_callback=on_progress)
+    if job.cancel_requested:
+        raise JobCancelled()
+    if not result['success']:
+        raise RuntimeError(result['error'])
+
+    # Prepare the book's reference artifacts in the background for scoring
+    get_reference_store().ingest_async(result['document_id'], result['sentences'])
+    return result
+
+
+def _get_job_or_404(job_id):
+    job = get_job_backend().get(job_id)
+    if job is None or get_current_user_id() not in job.owners:
+        return None, (jsonify({'success': False, 'error': 'Job not found'}), 404)
+    return job, None
+
+
+@ingestion_bp.route('/jobs', methods=['POST'])
+@jwt_required_custom
+def submit_job():
+    """
+    Queue an ingestion job and return its id right away:
+    - multipart 'pdf': upload and extract a PDF
+    - JSON 'filename': extract an already uploaded PDF
+    - JSON 'text_url': download and process an online book
+    Identical jobs already in flight are joined instead of started again.
+    """
+    user_id = get_current_user_id()
+    try:
+        data = request.get_json(silent=True) or {}
+        document_id = None
+
+        if 'pdf' in request.files or data.get('filename'):
+            if 'pdf' in request.files:
+                pdf_file = request.files['pdf']
+                if not pdf_file.filename or not pdf_file.filename.lower().endswith('.pdf'):
+                    return jsonify({'success': False, 'error': 'File must be a PDF'}), 400
+                filename = f"{uuid.uuid4()}_{secure_filename(pdf_file.filename)}"
+                file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
+                pdf_file.save(file_path)
+                original_filename = pdf_file.filename
+            else:
+                filename = secure_filename(data['filename'])
+                file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
+                if not filename or not os.path.exists(file_path):
+                    return jsonify({'success': False, 'error': 'PDF file not found'}), 404
+                original_filename = filename
+
+            handle, job = get_document_store().ingest(file_path, original_filename, user_id=user_id)
+            document_id = handle.id
+
+        elif data.get('text_url', '').strip():
+            text_url = data['text_url'].strip()
+            job = get_job_backend().submit(
+                'online_book', _run_online_book, text_url,
+                user_id=user_id,
+                dedup_key=f"url:{text_url}"
+            )
+
+        else:
+            return jsonify({'success': False, 'error': 'Provide a PDF, a filename or a text_url'}), 400
+
+        response = {'success': True, **job.to_dict()}
+        if document_id:
+            response['document_id'] = document_id
+        return jsonify(response), 202
+
+    except JobLimitExceeded as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
+    except Exception as e:
+        print(f"[ERROR] Ingestion submit error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@ingestion_bp.route('/jobs', methods=['GET'])
+@jwt_required_custom
+def list_jobs():
+    """Current user's queued, running and recently finished jobs"""
+    jobs = get_job_backend().list_jobs(get_current_user_id())
+    jobs.sort(key=lambda job: job.created_at, reverse=True)
+    return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs]})
+
+
+@ingestion_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required_custom
+def get_job_status(job_id):
+    """Status and progress (pages done / bytes downloaded) of a job"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@ingestion_bp.route('/jobs/<job_id>/result', methods=['GET'])
+@jwt_required_custom
+def get_job_result(job_id):
+    """Result of a finished job; 202 while it is still queued or running"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+
+    if job.active:
+        return jsonify({'success': False, **job.to_dict()}), 202
+    if job.status == 'cancelled':
+        return jsonify({'success': False, **job.to_dict()}), 409
+    if job.status == 'failed':
+        return jsonify({'success': False, **job.to_dict()}), 500
+    return jsonify({'success': True, **job.to_dict(include_result=True)})
+
+
+@ingestion_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+@jwt_required_custom
+def cancel_job(job_id):
+    """Cancel a job; shared jobs keep running for their other owners"""
+    job, error = _get_job_or_404(job_id)
+    if error:
+        return error
+
+    if not get_job_backend().cancel(job_id, user_id=get_current_user_id()):
+        return jsonify({'success': False, 'error': f'Job already {job.status}', **job.to_dict()}), 409
+    return jsonify({'success': True, **job.to_dict()})
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify
 from routes.auth_middleware import jwt_required_custom
 from services.online_books_service import OnlineBooksService
 from services.online_book_processor import OnlineBookProcessor
+from services.reference_store import get_reference_store
 
 online_books_bp = Blueprint('online_books', __name__)
 
@@ -70,6 +71,9 @@ def process_online_book():
             return jsonify({'success': False, 'error': 'Text URL required'}), 400
         
         result = OnlineBookProcessor.extract_text_from_url(text_url)
+        if result['success']:
+            # Prepare the book's reference artifacts in the background for scoring
+            get_reference_store().ingest_async(result['document_id'], result['sentences'])
         return jsonify(result), 200 if result['success'] else 500
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
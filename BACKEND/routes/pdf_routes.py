@@ -1,13 +1,17 @@
 # backend/routes/pdf_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from werkzeug.utils import secure_filename
 import os
+import json
 import uuid
 from config import Config
-from models.pdf_processor import PDFProcessor
+from routes.auth_middleware import get_session_key
+from services.reference_store import get_reference_store
+from services.document_store import get_document_store
+from services.document_state_store import get_document_state_store
 import tempfile
 
 pdf_bp = Blueprint('pdf', __name__)
-pdf_processor = PDFProcessor()
 
 @pdf_bp.route('/upload-pdf', methods=['POST'])
 def upload_pdf():
@@ -35,8 +39,13 @@ def upload_pdf():
         file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
         pdf_file.save(file_path)
         
-        # Extract text from PDF
-        sentences = pdf_processor.extract_text_with_positions(file_path)
+        # Extract text from PDF into this user's document state
+        state = get_document_state_store().open(get_session_key(), file_path, pdf_file.filename)
+        pdf_processor = state.ensure_loaded()
+        sentences = pdf_processor.sentences
+
+        # Prepare every sentence's reference artifacts in the background for scoring
+        get_reference_store().ingest_async(state.document_id, sentences)
         
         # Generate the public URL for the PDF (absolute URL so frontend can fetch across ports)
         base = request.host_url.rstrip('/')
@@ -47,6 +56,7 @@ def upload_pdf():
         response_data = {
             'success': True,
             'filename': filename,  # Return the actual stored filename (with UUID prefix)
+            'document_id': state.document_id,
             'original_filename': pdf_file.filename,
             'pdf_url': pdf_url,
             'total_sentences': len(sentences),
@@ -65,13 +75,24 @@ def upload_pdf():
 
 @pdf_bp.route('/pdf-info', methods=['GET'])
 def get_pdf_info():
-    """Get information about the currently loaded PDF"""
+    """Get information about the current user's loaded PDF (or ?document_id=)"""
     try:
+        state = get_document_state_store().get(get_session_key(), request.args.get('document_id'))
+        if state is None:
+            return jsonify({
+                'success': True,
+                'has_pdf': False,
+                'stats': {'total_sentences': 0, 'selected_sentences': 0, 'completion_rate': 0, 'total_pages': 0},
+                'current_pdf': None
+            })
+
+        pdf_processor = state.ensure_loaded()
         stats = pdf_processor.get_sentence_stats()
         
         return jsonify({
             'success': True,
             'has_pdf': len(pdf_processor.sentences) > 0,
+            'document_id': state.document_id,
             'stats': stats,
             'current_pdf': pdf_processor.current_pdf_path
         })
@@ -114,8 +135,13 @@ def load_pdf():
         
         print(f"[PDF] Loading PDF: {pdf_filename}")
         
-        # Extract text from PDF
-        sentences = pdf_processor.extract_text_with_positions(file_path)
+        # Extract text from PDF into this user's document state
+        state = get_document_state_store().open(get_session_key(), file_path, pdf_filename)
+        pdf_processor = state.ensure_loaded()
+        sentences = pdf_processor.sentences
+
+        # Prepare every sentence's reference artifacts in the background for scoring
+        get_reference_store().ingest_async(state.document_id, sentences)
         
         # Generate the public URL for the PDF (absolute URL so frontend can fetch across ports)
         base = request.host_url.rstrip('/')
@@ -126,6 +152,7 @@ def load_pdf():
         response_data = {
             'success': True,
             'filename': pdf_filename,
+            'document_id': state.document_id,
             'pdf_url': pdf_url,
             'total_sentences': len(sentences),
             'pages': pdf_processor.pages,
@@ -141,3 +168,131 @@ def load_pdf():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+
+# ==========================================
+# DOCUMENT HANDLES (paginated / streamed sentences)
+# ==========================================
+def _document_response(handle, status_code=200):
+    base = request.host_url.rstrip('/')
+    data = handle.summary()
+    data['success'] = handle.status != 'failed'
+    data['pdf_url'] = f"{base}/static/uploads/{os.path.basename(handle.file_path)}"
+    return jsonify(data), status_code
+
+
+def _get_document_or_404(document_id):
+    handle = get_document_store().get(document_id)
+    if handle is None:
+        return None, (jsonify({'success': False, 'error': 'Document not found'}), 404)
+    return handle, None
+
+
+@pdf_bp.route('/documents', methods=['POST'])
+def open_document():
+    """
+    Upload a PDF (multipart 'pdf') or open an uploaded one (JSON 'filename').
+    Returns a document id and page count right away; sentences are then
+    fetched from /documents/<id>/sentences or /documents/<id>/stream.
+    """
+    try:
+        if 'pdf' in request.files:
+            pdf_file = request.files['pdf']
+            if not pdf_file.filename or not pdf_file.filename.lower().endswith('.pdf'):
+                return jsonify({'success': False, 'error': 'File must be a PDF'}), 400
+
+            filename = f"{uuid.uuid4()}_{secure_filename(pdf_file.filename)}"
+            file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
+            pdf_file.save(file_path)
+            original_filename = pdf_file.filename
+        else:
+            data = request.get_json(silent=True) or {}
+            filename = secure_filename(data.get('filename') or '')
+            file_path = os.path.join(Config.UPLOAD_FOLDER, filename)
+            if not filename or not os.path.exists(file_path):
+                return jsonify({'success': False, 'error': 'PDF file not found'}), 404
+            original_filename = filename
+
+        handle = get_document_store().open(file_path, original_filename)
+        return _document_response(handle, 202 if not handle.finished else 200)
+
+    except Exception as e:
+        print(f"[ERROR] Document open error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@pdf_bp.route('/documents/<document_id>', methods=['GET'])
+def get_document(document_id):
+    """Extraction status of a document"""
+    handle, error = _get_document_or_404(document_id)
+    if error:
+        return error
+    return _document_response(handle)
+
+
+@pdf_bp.route('/documents/<document_id>/sentences', methods=['GET'])
+def get_document_sentences(document_id):
+    """
+    Sentences by page (?page=N) or by range (?offset=&limit=).
+    Waits up to DOCUMENT_WAIT_SECONDS for pages that are still being extracted.
+    """
+    handle, error = _get_document_or_404(document_id)
+    if error:
+        return error
+
+    page = request.args.get('page', type=int)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = min(max(1, request.args.get('limit', 200, type=int)), 1000)
+
+    if page is not None:
+        if page < 1 or page > handle.pages:
+            return jsonify({'success': False, 'error': f'Page must be between 1 and {handle.pages}'}), 400
+        ready = handle.wait_for(lambda h: h.pages_done >= page, Config.DOCUMENT_WAIT_SECONDS)
+        sentences = handle.page_sentences(page)
+    else:
+        ready = handle.wait_for(lambda h: len(h.sentences) >= offset + limit, Config.DOCUMENT_WAIT_SECONDS)
+        sentences = handle.sentences[offset:offset + limit]
+
+    if not ready:
+        return jsonify({'success': False, 'error': 'Extraction still in progress', **handle.summary()}), 503
+
+    return jsonify({
+        'success': True,
+        'document_id': handle.id,
+        'status': handle.status,
+        'page': page,
+        'offset': sentences[0]['global_index'] if sentences else offset,
+        'count': len(sentences),
+        'total_sentences': len(handle.sentences),
+        'pages': handle.pages,
+        'pages_done': handle.pages_done,
+        'sentences': sentences
+    })
+
+
+@pdf_bp.route('/documents/<document_id>/stream', methods=['GET'])
+def stream_document_sentences(document_id):
+    """NDJSON stream with one line per page as extraction progresses"""
+    handle, error = _get_document_or_404(document_id)
+    if error:
+        return error
+
+    start_page = max(1, request.args.get('from_page', 1, type=int))
+
+    def generate():
+        yield json.dumps({'type': 'document', **handle.summary()}) + '\n'
+
+        page = start_page
+        while page <= handle.pages:
+            if not handle.wait_for(lambda h: h.pages_done >= page, Config.DOCUMENT_WAIT_SECONDS):
+                yield json.dumps({'type': 'error', 'error': 'Timed out waiting for extraction'}) + '\n'
+                return
+            if handle.pages_done < page:
+                break
+            yield json.dumps({'type': 'page', 'page': page, 'sentences': handle.page_sentences(page)}) + '\n'
+            page += 1
+
+        handle.wait_for(lambda h: h.finished, Config.DOCUMENT_WAIT_SECONDS)
+        yield json.dumps({'type': 'done', **handle.summary()}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
@@ -1,18 +1,24 @@
-from flask import Blueprint, request, jsonify, send_from_directory
+from flask import Blueprint, request, jsonify, send_from_directory, Response
 from urllib.parse import quote
 import PyPDF2
 import io
 import re
 import os
+from services.reference_store import get_reference_store
+from services.text_aligner import get_text_aligner
+from services.tts_engine_pool import TTSBusy, get_tts_pool
+from services.tts_cache import get_tts_cache
+from services.document_store import get_document_store
+from services.document_state_store import get_document_state_store
+from config import Config
+from routes.auth_middleware import get_session_key
+from models.model_registry import get_model_registry, get_pronunciation_model
 
 # ---------- BLUEPRINT ----------
 practice_bp = Blueprint('practice', __name__)
 
 # ---------- PRONUNCIATION MODEL ----------
-print("--- Loading Wav2Vec2 pronunciation model...")
-from models.wav2vec2_pronunciation_model import Wav2Vec2PronunciationModel
-pronunciation_model = Wav2Vec2PronunciationModel()
-print("[OK] Pronunciation model ready!")
+# Loaded on first use (or by the startup loader), see models/model_registry.py
 
 
 # ---------- PDF SENTENCE EXTRACTION ----------
@@ -84,6 +90,9 @@ def upload_pdf_practice():
         processor = PDFProcessor()
         sentences = processor.extract_text_with_positions(file_path)
 
+        # Prepare every sentence's reference artifacts in the background for scoring
+        get_reference_store().ingest_async(processor.content_hash, sentences)
+
         if not sentences:
             return jsonify({
                 'success': False,
@@ -95,6 +104,7 @@ def upload_pdf_practice():
         return jsonify({
             'success': True,
             'filename': pdf_file.filename,
+            'document_id': processor.content_hash,
             'sentences': sentences,
             'total_sentences': len(sentences),
             'pdf_url': pdf_url,
@@ -107,30 +117,101 @@ def upload_pdf_practice():
 
 
 # ---------- TTS AUDIO GENERATION ----------
-@practice_bp.route('/tts', methods=['POST'])
+def _tts_audio_response(audio_bytes, key):
+    """Serve cached speech with ETag and Range support"""
+    response = Response(audio_bytes, mimetype='audio/wav')
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(audio_bytes))
+
+
+@practice_bp.route('/tts', methods=['GET', 'POST'])
 def get_tts_audio():
-    data = request.json
+    data = request.json if request.method == 'POST' else request.args
     text = data.get('text')
     
     if not text:
         return jsonify({'error': 'No text provided'}), 400
         
     try:
-        from services.speech_service import SpeechService
-        speech_service = SpeechService()
-        
-        audio_bytes = speech_service.generate_tts_audio(text)
+        key, audio_bytes = get_tts_cache().get_or_synthesize(
+            text,
+            voice=data.get('voice'),
+            rate=data.get('rate', type=int) if request.method == 'GET' else data.get('rate')
+        )
         
         if not audio_bytes:
             return jsonify({'error': 'Failed to generate audio'}), 500
             
-        return io.BytesIO(audio_bytes).read(), 200, {'Content-Type': 'audio/wav'}
+        return _tts_audio_response(audio_bytes, key)
         
+    except TTSBusy as e:
+        print(f"[WARN] TTS busy: {e}")
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         print(f"[ERROR] TTS error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@practice_bp.route('/tts/audio/<key>', methods=['GET'])
+def get_cached_tts_audio(key):
+    """Serve a previously synthesized (e.g. prefetched) clip by its cache key"""
+    if not re.fullmatch(r'[0-9a-f]{64}', key):
+        return jsonify({'error': 'Invalid audio key'}), 400
+
+    audio_bytes = get_tts_cache().get(key)
+    if audio_bytes is None:
+        return jsonify({'error': 'Audio not cached'}), 404
+
+    return _tts_audio_response(audio_bytes, key)
+
+
+@practice_bp.route('/tts/prefetch', methods=['POST'])
+def prefetch_tts_audio():
+    """
+    Synthesize the next sentences of a document in the background
+    while the student reads the current one. The sentences come from
+    the stored document ('document_id', else the caller's current PDF),
+    at most TTS_PREFETCH_COUNT of them.
+    """
+    data = request.json or {}
+    try:
+        start = int(data.get('current_index', -1)) + 1
+        count = int(data.get('count', Config.TTS_PREFETCH_COUNT))
+        rate = int(data['rate']) if data.get('rate') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'current_index, count and rate must be integers'}), 400
+    voice = data.get('voice')
+    if voice is not None and not isinstance(voice, str):
+        return jsonify({'error': 'voice must be a string'}), 400
+
+    sentences = _document_sentences(data.get('document_id'))
+    if sentences is None:
+        return jsonify({'error': 'Document not found'}), 404
+
+    count = min(max(0, count), Config.TTS_PREFETCH_COUNT)
+    start = max(0, start)
+    texts = [s['text'] for s in sentences[start:start + count]]
+    cache = get_tts_cache()
+    queued = cache.prefetch(texts, voice=voice, rate=rate)
+
+    return jsonify({
+        'success': True,
+        'queued': len(queued),
+        'keys': [cache.make_key(t, voice, rate) for t in texts if t and t.strip()]
+    })
+
+
+def _document_sentences(document_id):
+    """Sentences of a stored document, or of the caller's loaded PDF; None if neither exists"""
+    if document_id:
+        handle = get_document_store().get(document_id)
+        if handle is not None:
+            return handle.sentences
+    state = get_document_state_store().get(get_session_key(), document_id)
+    return state.ensure_loaded().sentences if state is not None else None
+
+
 # ---------- TTS SPEAK SENTENCE (Direct Play) ----------
 @practice_bp.route('/speak-sentence', methods=['POST'])
 def speak_sentence():
@@ -142,19 +223,15 @@ def speak_sentence():
         return jsonify({'error': 'No sentence provided'}), 400
 
     try:
-        from services.speech_service import SpeechService
-        speech_service = SpeechService()
-
-        if rate:
-            speech_service.engine.setProperty('rate', rate)
-
-        speech_service.speak(sentence)
+        get_tts_pool().speak(sentence, rate=rate, session_key=get_session_key())
 
         return jsonify({
             'success': True,
             'message': 'Sentence spoken successfully'
         })
 
+    except TTSBusy as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -170,7 +247,7 @@ def practice_sentence():
 
     try:
         from services.speech_service import SpeechService
-        speech_service = SpeechService()
+        speech_service = SpeechService(session_key=get_session_key())
 
         result = speech_service.practice_sentence(sentence_text)
         return jsonify(result)
@@ -197,7 +274,50 @@ def serve_pdf(filename):
     return send_from_directory(upload_dir, filename)
 
 
+# ---------- INFERENCE STATS ----------
+@practice_bp.route('/inference-stats', methods=['GET'])
+def inference_stats():
+    """Batch-size and queue-delay stats of the wav2vec2 micro-batcher"""
+    if not get_model_registry().is_loaded("pronunciation"):
+        return jsonify({'success': True, 'model_loaded': False})
+
+    model = get_pronunciation_model()
+    engine = model.inference_engine
+    if engine is None:
+        return jsonify({'success': True, 'batching_enabled': False, 'reason': model.batching_disabled_reason})
+
+    return jsonify({
+        'success': True,
+        'batching_enabled': True,
+        'stats': engine.get_stats()
+    })
+
+
 # ---------- NEW: PRONUNCIATION EVALUATION ----------
+def build_evaluation_response(expected_text, w2v2_result):
+    """Response body of an evaluation, shared with the streaming endpoint"""
+    # Word feedback comes from the same alignment that scored the words;
+    # error results have none, so align here (missed/skipped words)
+    word_feedback = w2v2_result.pop('word_feedback', None)
+    if word_feedback is None:
+        spoken_text = w2v2_result.get('spoken_text', '')
+        word_feedback = get_text_aligner().word_level_feedback(expected_text, spoken_text)
+
+    # Merge results
+    # Threshold: 0.55 is more forgiving for learning
+    is_correct = w2v2_result.get('score', 0) >= 0.55 or w2v2_result.get('status') in ['correct', 'almost']
+
+    return {
+        "success": True,
+        "is_correct": is_correct,
+        "score": w2v2_result.get('score'),
+        "feedback": w2v2_result.get('feedback'),
+        "word_feedback": word_feedback,
+        "spoken_text": w2v2_result.get('spoken_text'),
+        "result": w2v2_result
+    }
+
+
 @practice_bp.post("/evaluate-pronunciation")
 def evaluate_pronunciation():
     """
@@ -213,36 +333,26 @@ def evaluate_pronunciation():
                 "message": "audio and expected text are required"
             }), 400
 
-        audio_bytes = audio_file.read()
-        
-        # 1. Use Wav2Vec2 for high-precision phoneme evaluation
-        w2v2_result = pronunciation_model.evaluate(
-            audio_bytes=audio_bytes,
-            expected_word=expected_text
+        # Expected-side artifacts prepared at ingest; clients that send the
+        # sentence's document_id/global_index skip the lookup by text
+        document_id = request.form.get("document_id")
+        reference_store = get_reference_store()
+        reference = reference_store.resolve(
+            expected_text,
+            document_id=document_id,
+            global_index=request.form.get("global_index")
+        )
+
+        # 1. Use Wav2Vec2 for high-precision phoneme evaluation; the upload
+        #    stream is decoded directly, without reading it into bytes first
+        w2v2_result = get_pronunciation_model().evaluate(
+            audio_bytes=audio_file.stream,
+            expected_word=expected_text,
+            reference=reference,
+            document_model=reference_store.language_model(document_id)
         )
         
-        # 2. Use SpeechService for word-level alignment (missed/skipped words)
-        from services.speech_service import SpeechService
-        speech_service = SpeechService()
-        
-        # We need the transcription from SpeechService (which might use Google fallback)
-        # or we just use the w2v2 spoken_text
-        spoken_text = w2v2_result.get('spoken_text', '')
-        word_feedback = speech_service._get_word_level_feedback(expected_text, spoken_text)
-        
-        # Merge results
-        # Threshold: 0.55 is more forgiving for learning
-        is_correct = w2v2_result.get('score', 0) >= 0.55 or w2v2_result.get('status') in ['correct', 'almost']
-        
-        return jsonify({
-            "success": True,
-            "is_correct": is_correct,
-            "score": w2v2_result.get('score'),
-            "feedback": w2v2_result.get('feedback'),
-            "word_feedback": word_feedback,
-            "spoken_text": w2v2_result.get('spoken_text'),
-            "result": w2v2_result 
-        })
+        return jsonify(build_evaluation_response(expected_text, w2v2_result))
 
     except Exception as e:
         print("❌ Pronunciation evaluation error:", e)
@@ -1,20 +1,26 @@
 # backend/routes/selection_routes.py (Updated)
 from flask import Blueprint, request, jsonify
-from models.pdf_processor import PDFProcessor
+from routes.auth_middleware import get_session_key
 from services.selection_service import SelectionService
+from services.document_state_store import get_document_state_store
 
 selection_bp = Blueprint('selection', __name__)
-pdf_processor = PDFProcessor()
 selection_service = SelectionService()
 
-# Store current session ID (in production, use user sessions)
-current_session_id = None
+
+def _get_document_state(data=None):
+    """The caller's document state ('document_id' in the body/query, else their current PDF)"""
+    document_id = (data or {}).get('document_id') or request.args.get('document_id')
+    return get_document_state_store().get(get_session_key(), document_id)
+
+
+def _no_document_error():
+    return jsonify({'error': 'No PDF loaded'}), 400
+
 
 @selection_bp.route('/create-session', methods=['POST'])
 def create_selection_session():
     """Create a new selection session"""
-    global current_session_id
-    
     data = request.json
     
     try:
@@ -28,7 +34,7 @@ def create_selection_session():
         }
         
         session_id = selection_service.create_selection_session(session_data)
-        current_session_id = session_id
+        get_document_state_store().set_selection_session(get_session_key(), session_id)
         
         return jsonify({
             'success': True,
@@ -41,8 +47,6 @@ def create_selection_session():
 @selection_bp.route('/update-selections', methods=['POST'])
 def update_selections():
     """Update selection status for sentences"""
-    global current_session_id
-    
     data = request.json
     
     if not data:
@@ -50,10 +54,16 @@ def update_selections():
     
     sentence_indices = data.get('sentence_indices', [])
     selected = data.get('selected', True)
+    current_session_id = get_document_state_store().get_selection_session(get_session_key())
     
     try:
-        # Update PDF processor
-        pdf_processor.update_sentence_selection(sentence_indices, selected)
+        state = _get_document_state(data)
+        if state is None:
+            return _no_document_error()
+
+        # Update this user's document state
+        state.update_selection(sentence_indices, selected)
+        pdf_processor = state.ensure_loaded()
         selected_sentences = pdf_processor.get_selected_sentences()
         
         # Update selection service
@@ -82,8 +92,14 @@ def update_sentence_text():
     if sentence_index is None or new_text is None:
         return jsonify({'error': 'Missing sentence_index or new_text'}), 400
     
+    current_session_id = get_document_state_store().get_selection_session(get_session_key())
+    
     try:
-        pdf_processor.update_sentence_text(sentence_index, new_text)
+        state = _get_document_state(data)
+        if state is None:
+            return _no_document_error()
+
+        state.update_text(sentence_index, new_text)
         
         # Track customized sentences
         if current_session_id:
@@ -106,8 +122,10 @@ def update_sentence_text():
 @selection_bp.route('/get-selected-sentences', methods=['GET'])
 def get_selected_sentences():
     """Get all selected sentences"""
+    current_session_id = get_document_state_store().get_selection_session(get_session_key())
     try:
-        selected_sentences = pdf_processor.get_selected_sentences()
+        state = _get_document_state()
+        selected_sentences = state.ensure_loaded().get_selected_sentences() if state else []
         
         return jsonify({
             'success': True,
@@ -123,6 +141,7 @@ def save_selections():
     """Save current selections to file"""
     data = request.json
     filename = data.get('filename')
+    current_session_id = get_document_state_store().get_selection_session(get_session_key())
     
     if not current_session_id:
         return jsonify({'error': 'No active selection session'}), 400
@@ -148,10 +167,13 @@ def load_selections():
     try:
         result = selection_service.load_selections_from_file(file_path)
         
-        # Apply loaded selections to PDF processor
+        # Apply loaded selections to this user's current document
         loaded_sentences = result['loaded_data']['selections']['selected_sentences']
         sentence_indices = [s['global_index'] for s in loaded_sentences]
-        pdf_processor.update_sentence_selection(sentence_indices, True)
+        state = _get_document_state(data)
+        if state is not None:
+            state.update_selection(sentence_indices, True)
+        get_document_state_store().set_selection_session(get_session_key(), result['session_id'])
         
         return jsonify({
             'success': True,
@@ -179,6 +201,7 @@ def get_saved_sessions():
 @selection_bp.route('/session-analysis', methods=['GET'])
 def get_session_analysis():
     """Get analysis of current selection patterns"""
+    current_session_id = get_document_state_store().get_selection_session(get_session_key())
     if not current_session_id:
         return jsonify({'error': 'No active session'}), 400
     
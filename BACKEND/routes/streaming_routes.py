@@ -0,0 +1,136 @@
+"""
+WebSocket streaming evaluation: /api/practice/stream
+
+Protocol (one sentence per connection):
+1. Client sends a JSON text message:
+   {"type": "start", "text": "<expected sentence>", "format": "pcm_s16le" | "f32le",
+    "sample_rate": 16000, "auto_endpoint": true}
+   plus optional "document_id" and "global_index" of the sentence, so its
+   reference artifacts (services/reference_store.py) are found without
+   processing the text again
+2. Client sends mono 16kHz PCM chunks as binary messages while the child reads;
+   the server answers with {"type": "partial", "text", "words", "audio_seconds"}
+   whenever a decoding pass ran
+3. Client sends {"type": "stop"}, or with auto_endpoint (default
+   Config.STREAMING_AUTO_ENDPOINT) the VAD detects the end of speech; the
+   server replies {"type": "final", "endpoint": "client" | "vad", ...} with the
+   same body as /api/practice/evaluate-pronunciation and closes
+
+Needs the optional flask-sock package; without it the route is not registered.
+"""
+import json
+import time
+from flask import Blueprint
+from config import Config
+from models.model_registry import get_pronunciation_model
+from services.reference_store import get_reference_store
+from services.vad import Endpointer, get_vad
+from services.streaming_transcriber import (
+    PCM_FORMATS, SAMPLE_RATE, StreamingTranscriber, StreamTooLong, partial_word_status
+)
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+streaming_bp = Blueprint('streaming', __name__)
+sock = Sock() if Sock is not None else None
+STREAMING_AVAILABLE = sock is not None
+
+
+def _send(ws, message_type, **payload):
+    ws.send(json.dumps({'type': message_type, **payload}))
+
+
+def _error(ws, message):
+    _send(ws, 'error', success=False, message=message)
+
+
+def practice_stream(ws):
+    # Imported here to avoid a cycle: practice_routes is the older blueprint
+    from routes.practice_routes import build_evaluation_response
+
+    start_message = ws.receive(timeout=Config.STREAMING_IDLE_TIMEOUT_SECONDS)
+    try:
+        start = json.loads(start_message) if isinstance(start_message, str) else {}
+    except ValueError:
+        start = {}
+    expected_text = (start.get('text') or '').strip()
+    pcm_format = start.get('format', 'pcm_s16le')
+    if start.get('type') != 'start' or not expected_text:
+        return _error(ws, 'first message must be {"type": "start", "text": ...}')
+    if pcm_format not in PCM_FORMATS:
+        return _error(ws, f"format must be one of {', '.join(PCM_FORMATS)}")
+    if int(start.get('sample_rate', SAMPLE_RATE)) != SAMPLE_RATE:
+        return _error(ws, f"audio must be mono {SAMPLE_RATE} Hz PCM")
+
+    reference_store = get_reference_store()
+    reference = reference_store.resolve(expected_text, start.get('document_id'), start.get('global_index'))
+    model = get_pronunciation_model()
+    auto_endpoint = bool(start.get('auto_endpoint', Config.STREAMING_AUTO_ENDPOINT))
+    # The final transcript is decoded like an upload's (CTC_DECODING_MODE)
+    transcriber = StreamingTranscriber(
+        model.backend,
+        endpointer=Endpointer(get_vad()) if auto_endpoint else None,
+        inference_engine=model.inference_engine,
+        decoder=model.decoder,
+        language_model=model.decoder.language_model(
+            reference, reference_store.language_model(start.get('document_id'))
+        )
+    )
+    _send(ws, 'ready')
+    print(f"[STREAM] Started: '{expected_text[:50]}'")
+
+    endpoint = 'client'
+    while True:
+        message = ws.receive(timeout=Config.STREAMING_IDLE_TIMEOUT_SECONDS)
+        if message is None:
+            return _error(ws, 'stream idle for too long')
+
+        if isinstance(message, (bytes, bytearray)):
+            try:
+                decoded = transcriber.add_pcm(message, pcm_format)
+            except (StreamTooLong, ValueError) as e:
+                return _error(ws, str(e))
+            if transcriber.endpointed:
+                endpoint = 'vad'
+                break
+            if decoded:
+                text = transcriber.text
+                _send(ws, 'partial',
+                      text=text,
+                      words=partial_word_status(expected_text, text),
+                      audio_seconds=round(transcriber.audio_seconds, 2))
+            continue
+
+        try:
+            control = json.loads(message)
+        except ValueError:
+            return _error(ws, 'text messages must be JSON')
+        if control.get('type') == 'stop':
+            break
+
+    started = time.perf_counter()
+    spoken_text = transcriber.finish()
+    # Graded like an upload, by Config.EVALUATION_STRATEGY
+    if model.evaluation_strategy == 'forced_alignment':
+        result = model.score_alignment(expected_text, transcriber.logits, SAMPLE_RATE, spoken_text)
+        model_used = 'wav2vec2 streaming forced alignment'
+    else:
+        result = model.score_transcription(expected_text, spoken_text, reference)
+        model_used = 'wav2vec2 streaming'
+    result['debug_info'] = {
+        **result.get('debug_info', {}),
+        **transcriber.stats(),
+        'finish_ms': round((time.perf_counter() - started) * 1000, 1),
+        'model_used': model_used,
+        'decoding': model.decoder.mode
+    }
+    print(f"[STREAM] Final after {transcriber.audio_seconds:.1f}s of audio: "
+          f"'{spoken_text}' ({result['debug_info']['finish_ms']:.0f} ms to score)")
+    _send(ws, 'final', endpoint=endpoint, **build_evaluation_response(expected_text, result))
+
+
+if sock is not None:
+    sock.route('/stream', bp=streaming_bp)(practice_stream)
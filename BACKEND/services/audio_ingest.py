@@ -0,0 +1,164 @@
+# backend/services/audio_ingest.py
+"""
+Allocation-lean audio ingestion for the ASR path.
+
+    upload stream --(soundfile, float32 blocks, downmix, resample)-->
+        preallocated 16kHz mono buffer --> in-place peak normalization
+        --> VAD view/trim --> one padded batch array for the model
+
+Compared with reading the upload into bytes and decoding it to float64,
+the clip only ever exists once as a full-length 16kHz float32 array; the
+native-rate audio is handled a block at a time, and model inputs are
+built with a single allocation per batch.
+"""
+import io
+from typing import List, Tuple
+import numpy as np
+from services.resampling import TARGET_RATE, polyphase_filter, rate_ratio, resample, to_mono
+
+BLOCK_FRAMES = 65536
+
+
+def read_audio(source, target_rate: int = TARGET_RATE) -> Tuple[np.ndarray, int]:
+    """
+    Decode bytes or a binary file-like (e.g. request.files[...].stream) to
+    mono float32 at target_rate. Returns (audio, original_rate).
+    """
+    # soundfile and scipy load on first use: importing the app (routes ->
+    # streaming_transcriber -> batch_input_values) must stay light
+    import soundfile as sf
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    with sf.SoundFile(source) as f:
+        src_rate = f.samplerate
+        if f.frames <= 0:
+            # Length unknown up front: decode in one go
+            data = f.read(dtype='float32', always_2d=True)
+            return resample(to_mono(data), src_rate, target_rate), src_rate
+        if src_rate == target_rate:
+            audio = np.empty(f.frames, dtype=np.float32)
+            return audio[:_read_mono(f, audio)], src_rate
+        return _read_resampled(f, target_rate), src_rate
+
+
+def _read_mono(f: "sf.SoundFile", out: np.ndarray, _block=None) -> int:
+    """Decode the next len(out) frames of f into the 1-D float32 out; returns frames read"""
+    if f.channels == 1:
+        # Straight into the caller's buffer
+        return len(f.read(len(out), dtype='float32', always_2d=True, out=out[:, None]))
+
+    block = np.empty((min(BLOCK_FRAMES, len(out)), f.channels), dtype=np.float32)
+    read = 0
+    while read < len(out):
+        got = f.read(dtype='float32', always_2d=True, out=block[:len(out) - read])
+        if len(got) == 0:
+            break
+        np.mean(got, axis=1, out=out[read:read + len(got)])
+        read += len(got)
+    return read
+
+
+def _read_resampled(f: "sf.SoundFile", target_rate: int) -> np.ndarray:
+    """
+    Decode and resample block by block into the preallocated output, so the
+    clip never exists at its native rate. Each block is resampled with
+    enough input on both sides to cover the filter, which makes the result
+    identical to resampling the whole clip at once.
+    """
+    from scipy.signal import resample_poly
+
+    up, down = rate_ratio(f.samplerate, target_rate)
+    taps = polyphase_filter(f.samplerate, target_rate)
+    # Input samples the filter reaches on each side, rounded up to whole
+    # decimation periods so block edges land on output samples
+    reach = -(-(len(taps) // 2) // up)
+    context = -(-reach // down) * down
+    step = max(1, BLOCK_FRAMES // down) * down
+
+    total = f.frames
+    out = np.empty(-(-total * up // down), dtype=np.float32)
+    window = np.empty(context + step + context, dtype=np.float32)
+    window_start = window_end = 0  # input samples held in window[:window_end - window_start]
+    written = 0
+
+    block_start = 0
+    while block_start < total:
+        block_end = min(block_start + step, total)
+        need_end = min(block_end + context, total)
+        if need_end > window_end:
+            window_end += _read_mono(f, window[window_end - window_start:need_end - window_start])
+            if window_end < need_end:
+                # Fewer frames than the header announced
+                total = window_end
+                block_end = min(block_end, total)
+                if block_end <= block_start:
+                    break
+
+        resampled = resample_poly(window[:window_end - window_start], up, down, window=taps)
+        first = (block_start - window_start) * up // down
+        count = -(-block_end * up // down) - block_start * up // down
+        out[written:written + count] = resampled[first:first + count]
+        written += count
+
+        # The last `context` samples of this block are the next one's left context
+        keep_from = max(0, block_end - context)
+        window[:window_end - keep_from] = window[keep_from - window_start:window_end - window_start]
+        window_start = keep_from
+        block_start = block_end
+
+    return out[:written]
+
+
+def source_size(source) -> int:
+    """Byte size of bytes or a seekable stream, leaving the stream position unchanged"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END) - position
+    source.seek(position)
+    return size
+
+
+def source_bytes(source) -> bytes:
+    """Full content of bytes or a seekable stream (for debug capture only)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    position = source.tell()
+    data = source.read()
+    source.seek(position)
+    return data
+
+
+def normalize_peak(audio: np.ndarray) -> np.ndarray:
+    """Scale to peak 1.0 in place (no temporary abs() array); returns audio"""
+    if len(audio) == 0:
+        return audio
+    peak = max(float(audio.max()), -float(audio.min()))
+    if peak > 0:
+        audio *= np.float32(1.0 / (peak + 1e-8))
+    return audio
+
+
+def batch_input_values(audios: List[np.ndarray], do_normalize: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (input_values, attention_mask) for a wav2vec2 feature extractor with
+    padding_value 0.0, built in one zero-padded float32 array instead of
+    the processor's per-clip copies. Matches
+    Wav2Vec2FeatureExtractor(audios, padding=True, return_attention_mask=True).
+    """
+    max_length = max((len(a) for a in audios), default=0)
+    input_values = np.zeros((len(audios), max_length), dtype=np.float32)
+    attention_mask = np.zeros((len(audios), max_length), dtype=np.int32)
+
+    for row, mask, audio in zip(input_values, attention_mask, audios):
+        audio = np.asarray(audio, dtype=np.float32)
+        mask[:len(audio)] = 1
+        target = row[:len(audio)]
+        if do_normalize:
+            np.subtract(audio, audio.mean(), out=target)
+            target /= np.sqrt(audio.var() + 1e-7)
+        else:
+            target[:] = audio
+    return input_values, attention_mask
@@ -0,0 +1,333 @@
+# backend/services/ctc_decoding.py
+"""
+CTC decoding of wav2vec2 logits into text.
+
+Three modes (Config.CTC_DECODING_MODE):
+- 'greedy' (default): argmax per frame, repeats collapsed, blanks and
+  special tokens (<s>, </s>, <unk>) dropped; the same text as
+  processor.decode(argmax ids) without the special tokens, lowercased
+- 'beam': prefix beam search over the characters, with a word language
+  model of the current document when one was built at ingest
+- 'reference': 'beam' with the language model interpolated towards the
+  expected sentence, so words the child is reading win close calls
+
+    logits --> log-softmax (whole array) --> per-frame candidate tokens
+        (vectorized top-k + threshold, near-certain blank frames marked)
+        --> prefix beam search, words scored by the language model when
+            completed (shallow fusion: acoustic + alpha * LM + beta/word)
+
+Biasing only decides between hypotheses the acoustics already support:
+the language model assigns every word, including words outside the
+document, a nonzero probability. A misread word that is clearly audible
+still comes out as spoken, which scoring needs to see.
+"""
+import math
+from collections import Counter
+from heapq import nlargest
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from config import Config
+from services.word_scorer import clean_word
+
+MODES = ('greedy', 'beam', 'reference')
+
+NEG_INF = float('-inf')
+# Frames whose blank probability is above this only extend beams with a blank
+BLANK_SKIP_PROB = 0.999
+# Tokens less likely than this in a frame are not tried
+TOKEN_MIN_LOG_PROB = -5.0
+# Most tokens tried per frame
+MAX_TOKENS_PER_FRAME = 8
+
+
+def log_softmax(logits: np.ndarray) -> np.ndarray:
+    """Log-probabilities over the last axis (float32 in, float32 out)"""
+    logits = np.asarray(logits, dtype=np.float32)
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+
+def vocabulary_labels(tokenizer) -> List[str]:
+    """A Wav2Vec2CTCTokenizer's tokens, indexed by id"""
+    vocabulary = tokenizer.get_vocab()
+    labels = [''] * len(vocabulary)
+    for token, index in vocabulary.items():
+        labels[index] = token
+    return labels
+
+
+def _log_add(a: float, b: float) -> float:
+    """log(exp(a) + exp(b)) on Python floats"""
+    if a < b:
+        a, b = b, a
+    if b == NEG_INF:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+# ---------- LANGUAGE MODELS ----------
+class DocumentLanguageModel:
+    """
+    Word unigram + bigram counts of a document's sentences (cleaned like
+    services/word_scorer.py). P(word | previous) interpolates the bigram
+    estimate with an add-one unigram, so unseen words keep some mass;
+    smoothed=False keeps plain relative frequencies (for mixing).
+    """
+
+    BIGRAM_WEIGHT = 0.6
+
+    def __init__(self, sentences: Iterable[Sequence[str]] = (), smoothed: bool = True):
+        self.smoothed = smoothed
+        self.unigrams: Counter = Counter()
+        self.bigrams: Counter = Counter()
+        self.prefixes = set()
+        self.total = 0
+        for tokens in sentences:
+            self.add(tokens)
+
+    def add(self, tokens: Sequence[str]):
+        """Count one sentence's tokens"""
+        words = [t for t in tokens if t]
+        for previous, word in zip([None] + words, words):
+            if word not in self.unigrams:
+                self.prefixes.update(word[:k] for k in range(1, len(word) + 1))
+            self.unigrams[word] += 1
+            if previous is not None:
+                self.bigrams[previous, word] += 1
+        self.total += len(words)
+
+    def probability(self, previous: Optional[str], word: str) -> float:
+        if self.smoothed:
+            probability = (self.unigrams[word] + 1) / (self.total + len(self.unigrams) + 1)
+        else:
+            probability = self.unigrams[word] / self.total if self.total else 0.0
+        context = self.unigrams[previous] if previous is not None else 0
+        if context:
+            bigram = self.bigrams[previous, word] / context
+            probability = self.BIGRAM_WEIGHT * bigram + (1 - self.BIGRAM_WEIGHT) * probability
+        return probability
+
+    def oov_probability(self) -> float:
+        """Probability of a word the document does not contain"""
+        return 1 / (self.total + len(self.unigrams) + 1) if self.smoothed else 0.0
+
+    def log_prob(self, previous: Optional[str], word: str) -> float:
+        return math.log(self.probability(previous, word))
+
+    def oov_log_prob(self) -> float:
+        return math.log(self.oov_probability())
+
+    def is_prefix(self, partial: str) -> bool:
+        return partial in self.prefixes
+
+
+class InterpolatedLanguageModel:
+    """
+    Weighted mixture of language models, e.g. the expected sentence
+    (unsmoothed) and its document; at least one must be smoothed
+    """
+
+    def __init__(self, models: Sequence[Tuple[DocumentLanguageModel, float]]):
+        total = sum(weight for _, weight in models)
+        self.models = [(model, weight / total) for model, weight in models if weight > 0]
+
+    def probability(self, previous: Optional[str], word: str) -> float:
+        return sum(weight * model.probability(previous, word) for model, weight in self.models)
+
+    def oov_probability(self) -> float:
+        return sum(weight * model.oov_probability() for model, weight in self.models)
+
+    def log_prob(self, previous: Optional[str], word: str) -> float:
+        return math.log(self.probability(previous, word))
+
+    def oov_log_prob(self) -> float:
+        return math.log(self.oov_probability())
+
+    def is_prefix(self, partial: str) -> bool:
+        return any(model.is_prefix(partial) for model, _ in self.models)
+
+
+# ---------- DECODER ----------
+class CTCDecoder:
+    """
+    Decodes one clip's logits (frames x vocabulary) to lowercase text.
+    Holds only the vocabulary and settings, so one instance is shared.
+    """
+
+    def __init__(self, labels: Sequence[str], blank_id: int, delimiter: str = '|', mode=None,
+                 beam_width=None, alpha=None, beta=None, reference_weight=None):
+        self.mode = (mode or Config.CTC_DECODING_MODE).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown CTC_DECODING_MODE: {self.mode}")
+        self.labels = [' ' if label == delimiter else label.lower() for label in labels]
+        self.blank_id = blank_id
+        self.beam_width = max(1, int(beam_width or Config.CTC_BEAM_WIDTH))
+        self.alpha = Config.CTC_LM_ALPHA if alpha is None else alpha
+        self.beta = Config.CTC_LM_BETA if beta is None else beta
+        self.reference_weight = Config.CTC_REFERENCE_WEIGHT if reference_weight is None else reference_weight
+        self._warned_no_language_model = False
+
+        # Beam search emits single characters and the delimiter only
+        # (no <s>, </s>, <unk>); the rest are masked out of every frame
+        self._searchable = np.array(
+            [i != blank_id and len(label) == 1 for i, label in enumerate(self.labels)], dtype=bool
+        )
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer, **kwargs) -> "CTCDecoder":
+        """Decoder for a Wav2Vec2CTCTokenizer's vocabulary"""
+        return cls(vocabulary_labels(tokenizer), tokenizer.pad_token_id, tokenizer.word_delimiter_token, **kwargs)
+
+    def language_model(self, reference=None, document_model: Optional[DocumentLanguageModel] = None):
+        """
+        The language model for one evaluation: the document's in 'beam'
+        mode, mixed with the expected sentence (reference artifacts from
+        services/reference_store.py) in 'reference' mode. None in 'greedy'.
+        """
+        if self.mode == 'greedy':
+            return None
+        if self.mode == 'beam' or reference is None:
+            return document_model
+        if document_model is None:
+            return DocumentLanguageModel([reference['tokens']])
+        sentence_model = DocumentLanguageModel([reference['tokens']], smoothed=False)
+        return InterpolatedLanguageModel([
+            (sentence_model, self.reference_weight),
+            (document_model, 1 - self.reference_weight)
+        ])
+
+    def decode(self, logits: np.ndarray, language_model=None) -> str:
+        """
+        Text of one clip's logits, by the decoder's mode. Without a
+        language model (the client sent no document_id) the beam search
+        has nothing to add, so the clip is decoded greedily.
+        """
+        if self.mode == 'greedy' or len(logits) == 0:
+            return self.greedy(logits)
+        if language_model is None:
+            if not self._warned_no_language_model:
+                self._warned_no_language_model = True
+                print(f"[CTC] Warning: '{self.mode}' decoding without a language model, using greedy decoding")
+            return self.greedy(logits)
+        return self.beam_search(log_softmax(logits), language_model)
+
+    def greedy(self, logits: np.ndarray) -> str:
+        ids = np.argmax(logits, axis=-1)
+        keep = np.ones(len(ids), dtype=bool)
+        keep[1:] = ids[1:] != ids[:-1]
+        ids = ids[keep]
+        # Blank and special tokens (<s>, </s>, <unk>) are not text
+        return "".join(self.labels[i] for i in ids[self._searchable[ids]].tolist()).strip()
+
+    def candidates(self, log_probs: np.ndarray) -> Tuple[List[List[int]], np.ndarray]:
+        """
+        Tokens to try per frame (most likely first, blank excluded) and a
+        mask of the frames that are almost certainly blank, for all frames
+        at once.
+        """
+        masked = np.where(self._searchable, log_probs, NEG_INF)
+        k = min(MAX_TOKENS_PER_FRAME, masked.shape[1])
+        top = np.argpartition(-masked, k - 1, axis=1)[:, :k]
+        top_log_probs = np.take_along_axis(masked, top, axis=1)
+        order = np.argsort(-top_log_probs, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        counts = (np.take_along_axis(top_log_probs, order, axis=1) >= TOKEN_MIN_LOG_PROB).sum(axis=1)
+        tokens = [row[:count] for row, count in zip(top.tolist(), counts.tolist())]
+        blank_frames = log_probs[:, self.blank_id] >= math.log(BLANK_SKIP_PROB)
+        return tokens, blank_frames
+
+    def beam_search(self, log_probs: np.ndarray, language_model=None) -> str:
+        """Prefix beam search over log-probabilities (frames x vocabulary)"""
+        tokens, blank_frames = self.candidates(log_probs)
+        rows = log_probs.tolist()
+        labels = self.labels
+        words = _WordScores(language_model, self.alpha, self.beta)
+
+        # prefix text -> [log P ending in blank, log P ending in a character]
+        beams: Dict[str, List[float]] = {'': [0.0, NEG_INF]}
+        for t, row in enumerate(rows):
+            blank = row[self.blank_id]
+            if blank_frames[t]:
+                # The repeat paths dropped here are below 1 - BLANK_SKIP_PROB
+                beams = {text: [_log_add(b, c) + blank, NEG_INF] for text, (b, c) in beams.items()}
+                continue
+
+            following: Dict[str, List[float]] = {}
+
+            def extend(text, index, value):
+                entry = following.get(text)
+                if entry is None:
+                    entry = following[text] = [NEG_INF, NEG_INF]
+                entry[index] = _log_add(entry[index], value)
+
+            for text, (ends_blank, ends_char) in beams.items():
+                total = _log_add(ends_blank, ends_char)
+                extend(text, 0, total + blank)
+                last = text[-1] if text else ' '
+                for token in tokens[t]:
+                    char = labels[token]
+                    p = row[token]
+                    if char == ' ' and last == ' ':
+                        # No empty words: another delimiter leaves the prefix as it is
+                        extend(text, 1, total + p)
+                    elif char == last:
+                        # Same token again collapses, unless a blank separated them
+                        extend(text, 1, ends_char + p)
+                        extend(text + char, 1, ends_blank + p)
+                    else:
+                        extend(text + char, 1, total + p)
+
+            beams = dict(nlargest(
+                self.beam_width, following.items(),
+                key=lambda item: _log_add(*item[1]) + words.score(item[0])
+            ))
+
+        best = max(beams.items(), key=lambda item: _log_add(*item[1]) + words.score(item[0], final=True))
+        return best[0].strip()
+
+
+class _WordScores:
+    """Language model part of a prefix's score, cached per prefix during one search"""
+
+    def __init__(self, language_model, alpha: float, beta: float):
+        self.language_model = language_model
+        self.alpha = alpha
+        self.beta = beta
+        self._complete: Dict[str, Tuple[float, Optional[str]]] = {'': (0.0, None)}
+        self._prefixes: Dict[str, float] = {}
+        self._oov = alpha * language_model.oov_log_prob() if language_model is not None else 0.0
+
+    def score(self, text: str, final: bool = False) -> float:
+        if self.language_model is None:
+            return 0.0
+        if not final:
+            cached = self._prefixes.get(text)
+            if cached is None:
+                cached = self._prefixes[text] = self._score(text, False)
+            return cached
+        return self._score(text, True)
+
+    def _score(self, text: str, final: bool) -> float:
+        head, _, partial = text.rpartition(' ')
+        score, previous = self._words(head)
+        word = clean_word(partial)
+        if not word:
+            return score
+        if final:
+            return score + self.alpha * self.language_model.log_prob(previous, word) + self.beta
+        # An unfinished word no document word starts with is scored as unknown now
+        return score if self.language_model.is_prefix(word) else score + self._oov
+
+    def _words(self, head: str) -> Tuple[float, Optional[str]]:
+        """Score of the completed words in head and the last of them"""
+        cached = self._complete.get(head)
+        if cached is not None:
+            return cached
+        before, _, last = head.rpartition(' ')
+        score, previous = self._words(before)
+        word = clean_word(last)
+        if word:
+            score += self.alpha * self.language_model.log_prob(previous, word) + self.beta
+            previous = word
+        self._complete[head] = (score, previous)
+        return score, previous
@@ -0,0 +1,116 @@
+# backend/services/debug_capture.py
+import io
+import os
+import queue
+import random
+import threading
+import uuid
+from datetime import datetime
+from config import Config
+
+
+class DebugCaptureWriter:
+    """
+    Opt-in audio capture for debugging evaluations:
+    - Off by default; when on, only a sampled fraction of requests is captured
+    - Every capture gets its own uniquely named files
+    - Files are written by a background thread through a bounded queue,
+      captures are dropped (never blocked on) when the queue is full
+    """
+
+    def __init__(self, enabled=False, sample_rate=0.0, folder=None, queue_size=64):
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, float(sample_rate)))
+        self.folder = folder
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    # ---------- REQUEST SIDE ----------
+    def start_capture(self):
+        """Return a capture id if this request is sampled, otherwise None"""
+        if not self.enabled or self.sample_rate <= 0:
+            return None
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+
+    def capture_bytes(self, capture_id, name, data):
+        """Queue raw bytes (e.g. the uploaded file) for writing"""
+        if capture_id is None:
+            return
+        self._enqueue(capture_id, name, ('bytes', bytes(data)))
+
+    def capture_audio(self, capture_id, name, audio, sr):
+        """Queue a numpy clip; it is encoded to WAV on the writer thread"""
+        if capture_id is None:
+            return
+        self._enqueue(capture_id, name, ('audio', (audio.copy(), sr)))
+
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'folder': self.folder,
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed
+        }
+
+    def _enqueue(self, capture_id, name, payload):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((capture_id, name, payload))
+        except queue.Full:
+            self.dropped += 1
+
+    # ---------- WRITER THREAD ----------
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            self._worker = threading.Thread(target=self._run, name="debug-capture-writer", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            capture_id, name, (kind, data) = self._queue.get()
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+                path = os.path.join(self.folder, f"{capture_id}_{name}")
+                if kind == 'audio':
+                    import soundfile as sf
+                    audio, sr = data
+                    buffer = io.BytesIO()
+                    sf.write(buffer, audio, sr, format='WAV')
+                    data = buffer.getvalue()
+                with open(path, 'wb') as f:
+                    f.write(data)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[WARN] Debug capture write failed for {capture_id}_{name}: {e}")
+
+
+_debug_capture = None
+
+
+def get_debug_capture():
+    """Process-wide capture writer configured from Config"""
+    global _debug_capture
+    if _debug_capture is None:
+        _debug_capture = DebugCaptureWriter(
+            enabled=Config.DEBUG_CAPTURE_ENABLED,
+            sample_rate=Config.DEBUG_CAPTURE_SAMPLE_RATE,
+            folder=Config.DEBUG_CAPTURE_FOLDER,
+            queue_size=Config.DEBUG_CAPTURE_QUEUE_SIZE
+        )
+    return _debug_capture
@@ -0,0 +1,214 @@
+# backend/services/document_state_store.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+from config import Config
+from models.pdf_processor import PDFProcessor
+from services.extraction_cache import hash_file
+
+
+class DocumentState:
+    """
+    One user's view of one document:
+    - processor holds the sentences (with selection flags) while resident
+    - the overlay (selected indices, edited texts) is small and survives
+      eviction; it is re-applied when the sentences are rehydrated
+    """
+
+    # Rough per-sentence cost of the dict, its keys and the str objects
+    SENTENCE_OVERHEAD_BYTES = 400
+
+    def __init__(self, user_key: str, document_id: str, file_path: str, filename: str, engine: str):
+        self.user_key = user_key
+        self.document_id = document_id
+        self.file_path = file_path
+        self.filename = filename
+        self.engine = engine
+        self.selected: set = set()
+        self.text_overrides: Dict[int, str] = {}
+        self.processor: PDFProcessor | None = None
+        self.size_bytes = 0
+        self.last_access = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def resident(self) -> bool:
+        return self.processor is not None
+
+    def ensure_loaded(self) -> PDFProcessor:
+        """Sentences for this state, rehydrated from the extraction cache if evicted"""
+        with self._lock:
+            if self.processor is None:
+                processor = PDFProcessor()
+                if not processor.load_cached(self.document_id, self.engine, self.file_path):
+                    processor.extract_text_with_positions(self.file_path, engine=self.engine)
+                self._apply_overlay(processor)
+                self.size_bytes = self._estimate_size(processor)
+                self.processor = processor
+            self.last_access = time.time()
+            return self.processor
+
+    def unload(self) -> int:
+        """Drop the sentences, keeping the overlay; returns the bytes freed"""
+        with self._lock:
+            freed = self.size_bytes if self.processor is not None else 0
+            self.processor = None
+            self.size_bytes = 0
+            return freed
+
+    # ---------- SELECTION (kept in the overlay too) ----------
+    def update_selection(self, sentence_indices: List[int], selected: bool = True):
+        processor = self.ensure_loaded()
+        with self._lock:
+            processor.update_sentence_selection(sentence_indices, selected)
+            valid = [i for i in sentence_indices if 0 <= i < len(processor.sentences)]
+            if selected:
+                self.selected.update(valid)
+            else:
+                self.selected.difference_update(valid)
+
+    def update_text(self, sentence_index: int, new_text: str):
+        processor = self.ensure_loaded()
+        with self._lock:
+            processor.update_sentence_text(sentence_index, new_text)
+            self.text_overrides[sentence_index] = new_text
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'document_id': self.document_id,
+            'filename': self.filename,
+            'resident': self.resident,
+            'size_bytes': self.size_bytes,
+            'selected_count': len(self.selected),
+            'customized_count': len(self.text_overrides)
+        }
+
+    def _apply_overlay(self, processor: PDFProcessor):
+        processor.update_sentence_selection(list(self.selected), True)
+        for index, text in self.text_overrides.items():
+            if 0 <= index < len(processor.sentences):
+                processor.update_sentence_text(index, text)
+
+    def _estimate_size(self, processor: PDFProcessor) -> int:
+        text_bytes = sum(len(s['text']) for s in processor.sentences)
+        page_bytes = sum(len(text) for text in processor.page_texts)
+        return text_bytes + page_bytes + len(processor.sentences) * self.SENTENCE_OVERHEAD_BYTES
+
+
+class DocumentStateStore:
+    """
+    Per-user document state, keyed by (user, document):
+    - Each user has a current document, used by endpoints that take no id
+    - Resident sentences are bounded by max_bytes; the least recently used
+      states are unloaded first and rehydrated from the extraction cache
+    - At most max_states states are tracked; beyond that the least recently
+      used ones (overlay included) are forgotten
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_states: int = 10000):
+        self.max_bytes = max_bytes
+        self.max_states = max_states
+        self._states: "OrderedDict[tuple, DocumentState]" = OrderedDict()
+        self._current: Dict[str, str] = {}
+        self._selection_sessions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.rehydrations = 0
+
+    def open(self, user_key: str, file_path: str, filename: str | None = None,
+             engine: str | None = None) -> DocumentState:
+        """Load a PDF for a user and make it their current document"""
+        document_id = hash_file(file_path)
+        engine = engine or Config.PDF_EXTRACT_ENGINE
+        with self._lock:
+            state = self._states.get((user_key, document_id))
+            if state is None:
+                state = DocumentState(user_key, document_id, file_path, filename or file_path, engine)
+                self._states[(user_key, document_id)] = state
+            self._states.move_to_end((user_key, document_id))
+            self._current[user_key] = document_id
+
+        self._load(state)
+        return state
+
+    def get(self, user_key: str, document_id: str | None = None) -> DocumentState | None:
+        """A user's state for document_id (default: their current document), loaded"""
+        with self._lock:
+            document_id = document_id or self._current.get(user_key)
+            state = self._states.get((user_key, document_id)) if document_id else None
+            if state is None:
+                return None
+            self._states.move_to_end((user_key, document_id))
+
+        self._load(state)
+        return state
+
+    def set_selection_session(self, user_key: str, session_id: str):
+        with self._lock:
+            self._selection_sessions[user_key] = session_id
+
+    def get_selection_session(self, user_key: str) -> str | None:
+        with self._lock:
+            return self._selection_sessions.get(user_key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'states': len(self._states),
+                'resident_states': sum(1 for s in self._states.values() if s.resident),
+                'resident_bytes': self._resident_bytes(),
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'rehydrations': self.rehydrations
+            }
+
+    def _load(self, state: DocumentState):
+        if state.resident:
+            state.last_access = time.time()
+            return
+
+        rehydrating = bool(state.selected or state.text_overrides)
+        state.ensure_loaded()
+        with self._lock:
+            if rehydrating:
+                self.rehydrations += 1
+            self._evict(keep=state)
+
+    # ---------- EVICTION (caller holds self._lock) ----------
+    def _resident_bytes(self) -> int:
+        return sum(state.size_bytes for state in self._states.values())
+
+    def _evict(self, keep: DocumentState):
+        # Walk from least to most recently used
+        resident_bytes = self._resident_bytes()
+        for key in list(self._states):
+            if resident_bytes <= self.max_bytes:
+                break
+            state = self._states[key]
+            if state is not keep and state.resident:
+                resident_bytes -= state.unload()
+                self.evictions += 1
+
+        while len(self._states) > self.max_states:
+            key, state = next(iter(self._states.items()))
+            if state is keep:
+                break
+            del self._states[key]
+            state.unload()
+            if self._current.get(key[0]) == key[1]:
+                del self._current[key[0]]
+
+
+_document_state_store = None
+
+
+def get_document_state_store():
+    """Process-wide per-user document state store"""
+    global _document_state_store
+    if _document_state_store is None:
+        _document_state_store = DocumentStateStore(
+            max_bytes=Config.DOCUMENT_STATE_MAX_BYTES,
+            max_states=Config.DOCUMENT_STATE_MAX_STATES
+        )
+    return _document_state_store
@@ -0,0 +1,192 @@
+# backend/services/document_store.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+from config import Config
+from models.pdf_processor import PDFProcessor, count_pages
+from services.extraction_cache import hash_file
+from services.ingestion_jobs import JobCancelled, JobLimitExceeded, get_job_backend
+from services.reference_store import get_reference_store
+
+
+class DocumentHandle:
+    """
+    One uploaded document, shared by everyone who opened the same bytes:
+    - id is the SHA-256 of the file, page count is known up front
+    - sentences grow page by page while extraction runs in the background
+    - readers block on the condition until the pages they need exist
+    """
+
+    def __init__(self, document_id: str, file_path: str, filename: str, pages: int):
+        self.id = document_id
+        self.file_path = file_path
+        self.filename = filename
+        self.pages = pages
+        self.status = 'processing'
+        self.error: str | None = None
+        self.sentences: List[Dict[str, Any]] = []
+        # page_offsets[p] is the index of the first sentence of page p + 1
+        self.page_offsets: List[int] = []
+        self.job_id: str | None = None
+        self.created_at = time.time()
+        self._condition = threading.Condition()
+
+    @property
+    def pages_done(self) -> int:
+        return len(self.page_offsets)
+
+    @property
+    def finished(self) -> bool:
+        return self.status != 'processing'
+
+    def add_page(self, page_sentences: List[Dict[str, Any]]):
+        with self._condition:
+            self.page_offsets.append(len(self.sentences))
+            self.sentences.extend(page_sentences)
+            self._condition.notify_all()
+
+    def finish(self, error: str | None = None):
+        with self._condition:
+            self.status = 'failed' if error else 'ready'
+            self.error = error
+            self._condition.notify_all()
+
+    def wait_for(self, predicate, timeout: float) -> bool:
+        """Block until predicate(self) holds or extraction ends; False on timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: predicate(self) or self.finished, timeout=timeout)
+
+    def page_sentences(self, page: int) -> List[Dict[str, Any]]:
+        """Sentences of a 1-based page number, [] if not extracted (yet)"""
+        if page < 1 or page > self.pages_done:
+            return []
+        start = self.page_offsets[page - 1]
+        end = self.page_offsets[page] if page < self.pages_done else len(self.sentences)
+        return self.sentences[start:end]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'document_id': self.id,
+            'filename': self.filename,
+            'status': self.status,
+            'error': self.error,
+            'pages': self.pages,
+            'pages_done': self.pages_done,
+            'total_sentences': len(self.sentences)
+        }
+
+
+class DocumentStore:
+    """
+    Registry of document handles:
+    - open() hashes the file and returns immediately; extraction runs as an
+      ingestion job and reuses the extraction cache when possible
+    - Identical files share a handle
+    - At most max_documents finished handles stay in memory; evicted ones
+      are reopened from their file (an extraction-cache hit) on demand
+    """
+
+    def __init__(self, max_documents: int = 64):
+        self.max_documents = max_documents
+        self._handles: "OrderedDict[str, DocumentHandle]" = OrderedDict()
+        self._known: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def open(self, file_path: str, filename: str | None = None) -> DocumentHandle:
+        """Handle for a PDF on disk, starting extraction if needed"""
+        return self.ingest(file_path, filename)[0]
+
+    def ingest(self, file_path: str, filename: str | None = None, user_id: str | None = None):
+        """
+        Like open(), but also returns the ingestion job tracking the document.
+        Raises JobLimitExceeded if user_id already has too many jobs running.
+        """
+        document_id = hash_file(file_path)
+        with self._lock:
+            handle = self._handles.get(document_id)
+            created = handle is None or handle.status == 'failed'
+            if created:
+                handle = DocumentHandle(document_id, file_path, filename or file_path, count_pages(file_path))
+                self._handles[document_id] = handle
+                self._known[document_id] = (file_path, handle.filename)
+                self._evict()
+            else:
+                self._handles.move_to_end(document_id)
+
+        # While extraction runs this joins its job; for a finished document
+        # the job completes immediately with the stored result
+        try:
+            job = get_job_backend().submit(
+                'pdf', self._extract, handle,
+                user_id=user_id,
+                dedup_key=f"pdf:{document_id}"
+            )
+        except JobLimitExceeded:
+            if created:
+                with self._lock:
+                    if self._handles.get(document_id) is handle:
+                        del self._handles[document_id]
+            raise
+
+        handle.job_id = job.id
+        return handle, job
+
+    def get(self, document_id: str) -> DocumentHandle | None:
+        """Handle by id, reopening an evicted document if its file still exists"""
+        with self._lock:
+            handle = self._handles.get(document_id)
+            if handle is not None:
+                self._handles.move_to_end(document_id)
+                return handle
+            known = self._known.get(document_id)
+
+        if known is None:
+            return None
+        try:
+            return self.open(*known)
+        except FileNotFoundError:
+            return None
+
+    def _extract(self, job, handle: DocumentHandle):
+        if handle.pages_done == 0 and not handle.finished:
+            try:
+                processor = PDFProcessor()
+                for _, page_sentences in processor.iter_pages(handle.file_path, content_hash=handle.id):
+                    handle.add_page(page_sentences)
+                    job.report(pages_done=handle.pages_done, pages_total=handle.pages)
+            except JobCancelled:
+                handle.finish(error='Extraction cancelled')
+                raise
+            except Exception as e:
+                print(f"[ERROR] Extraction of {handle.filename} failed: {e}")
+                handle.finish(error=str(e))
+                raise
+
+            handle.finish()
+            print(f"[PDF] Document {handle.id[:12]} ready: {len(handle.sentences)} sentences")
+
+            # Prepare every sentence's reference artifacts (phonemes included) for scoring
+            get_reference_store().ingest_async(handle.id, handle.sentences)
+
+        job.report(pages_done=handle.pages_done, pages_total=handle.pages)
+        return {**handle.summary(), 'sentences': handle.sentences}
+
+    def _evict(self):
+        # Only finished handles are evicted; in-flight extractions keep theirs
+        while len(self._handles) > self.max_documents:
+            victim = next((key for key, h in self._handles.items() if h.finished), None)
+            if victim is None:
+                break
+            del self._handles[victim]
+
+
+_document_store = None
+
+
+def get_document_store():
+    """Process-wide document store"""
+    global _document_store
+    if _document_store is None:
+        _document_store = DocumentStore(max_documents=Config.DOCUMENT_STORE_MAX_DOCUMENTS)
+    return _document_store
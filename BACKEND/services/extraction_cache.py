@@ -0,0 +1,124 @@
+# backend/services/extraction_cache.py
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+from config import Config
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Content-addressed store of PDF extraction results:
+    - Keyed by SHA-256 of the file bytes plus the extractor version, so
+      identical uploads from different users share one extraction
+    - Stored as gzipped JSON with one [page, line, text] row per sentence;
+      the per-sentence dicts are rebuilt on load
+    - A small in-memory LRU keeps recently opened books decoded
+    """
+
+    FORMAT = 1
+
+    def __init__(self, folder: str, memory_entries: int = 16):
+        self.folder = folder
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}.json.gz")
+
+    @staticmethod
+    def make_key(content_hash: str, extractor_version: str) -> str:
+        return f"{content_hash}-{extractor_version}"
+
+    def load(self, content_hash: str, extractor_version: str) -> Dict[str, Any] | None:
+        """Cached result as {'sentences', 'page_texts', 'pages'}, or None"""
+        key = self.make_key(content_hash, extractor_version)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None:
+            try:
+                with gzip.open(self._path(key), 'rt', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                print(f"[WARN] Ignoring unreadable extraction cache entry {key}: {e}")
+                return None
+            if entry.get('format') != self.FORMAT:
+                return None
+            self._remember(key, entry)
+
+        return {
+            'pages': entry['pages'],
+            'page_texts': list(entry['page_texts']),
+            'sentences': self.expand_sentences(entry['lines'])
+        }
+
+    def save(self, content_hash: str, extractor_version: str, pages: int,
+             page_texts: List[str], sentences: List[Dict[str, Any]]):
+        """Store an extraction result; failures only log"""
+        key = self.make_key(content_hash, extractor_version)
+        entry = {
+            'format': self.FORMAT,
+            'extractor': extractor_version,
+            'pages': pages,
+            'page_texts': page_texts,
+            'lines': [[s['page'], s['line'], s['text']] for s in sentences]
+        }
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[WARN] Extraction cache write failed: {e}")
+        self._remember(key, entry)
+
+    @staticmethod
+    def expand_sentences(lines) -> List[Dict[str, Any]]:
+        """Rebuild PDFProcessor sentence dicts from compact rows"""
+        return [
+            {
+                'text': text,
+                'page': page,
+                'line': line,
+                'selected': False,
+                'global_index': index
+            }
+            for index, (page, line, text) in enumerate(lines)
+        ]
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+
+_extraction_cache = None
+
+
+def get_extraction_cache():
+    """Process-wide extraction cache configured from Config"""
+    global _extraction_cache
+    if _extraction_cache is None:
+        _extraction_cache = ExtractionCache(Config.EXTRACTION_CACHE_FOLDER)
+    return _extraction_cache
@@ -0,0 +1,158 @@
+# backend/services/forced_alignment.py
+"""
+CTC forced alignment of the expected sentence against wav2vec2 emissions.
+
+    expected text --> character ids with word delimiters (the model's
+        vocabulary) --> one Viterbi pass over the CTC trellis
+        (blank / token states, vectorized over states per frame)
+        --> per word: start / end time and a confidence
+
+A word's confidence is the model's own posterior for the expected
+characters on the frames the path gives them, exp(mean(log P(char))),
+not a comparison with each frame's best token: silence, noise, undecided
+frames and other words all score near 0, and 1.0 means the model heard
+exactly the expected characters. It grades the word without a
+transcript, a text diff or the phonemizer.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from services.ctc_decoding import NEG_INF, log_softmax, vocabulary_labels
+from services.word_scorer import CREDIT
+
+# Word confidence from which a word counts as correct / as a near miss
+CORRECT_CONFIDENCE = 0.5
+MISPRONOUNCED_CONFIDENCE = 0.15
+
+
+def viterbi(log_probs: np.ndarray, targets: np.ndarray, blank_id: int) -> Tuple[np.ndarray, float]:
+    """
+    Best CTC path of targets through log_probs (frames x vocabulary).
+    Returns the trellis state of every frame (even = blank, 2k+1 = target
+    k) and the path's log-probability; raises ValueError when the clip
+    has too few frames for the targets.
+    """
+    n_frames, n_targets = len(log_probs), len(targets)
+    repeats = int(np.count_nonzero(targets[1:] == targets[:-1])) if n_targets else 0
+    if n_frames < n_targets + repeats or n_frames == 0:
+        raise ValueError(f"{n_frames} frames cannot hold {n_targets} tokens")
+
+    n_states = 2 * n_targets + 1
+    states = np.full(n_states, blank_id, dtype=np.int64)
+    states[1::2] = targets
+    # A token state can be entered from two states back unless that is the same token
+    can_skip = np.zeros(n_states, dtype=bool)
+    can_skip[3::2] = targets[1:] != targets[:-1]
+
+    emissions = log_probs[:, states]
+    scores = np.full(n_states, NEG_INF)
+    scores[:2] = emissions[0, :2]
+    # Predecessor per frame and state: 0 = same state, 1 = previous, 2 = two back
+    moves = np.zeros((n_frames, n_states), dtype=np.int8)
+    candidates = np.full((3, n_states), NEG_INF)
+    columns = np.arange(n_states)
+    for t in range(1, n_frames):
+        candidates[0] = scores
+        candidates[1, 1:] = scores[:-1]
+        candidates[2, 2:] = np.where(can_skip[2:], scores[:-2], NEG_INF)
+        move = candidates.argmax(axis=0)
+        scores = candidates[move, columns] + emissions[t]
+        moves[t] = move
+
+    # The path ends in the last token or the blank after it
+    state = n_states - 1 if n_states == 1 or scores[-1] >= scores[-2] else n_states - 2
+    total = float(scores[state])
+    path = np.empty(n_frames, dtype=np.int64)
+    for t in range(n_frames - 1, -1, -1):
+        path[t] = state
+        state -= int(moves[t, state])
+    return path, total
+
+
+class ForcedAligner:
+    """
+    Word timings and confidences of an expected sentence in a clip's
+    logits. Holds only the vocabulary, so one instance is shared.
+    """
+
+    def __init__(self, labels: Sequence[str], blank_id: int, delimiter: str = '|'):
+        self.blank_id = blank_id
+        self.delimiter_id = list(labels).index(delimiter) if delimiter in labels else None
+        self.char_ids = {label.lower(): i for i, label in enumerate(labels)
+                         if len(label) == 1 and i != blank_id and label != delimiter}
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer) -> "ForcedAligner":
+        """Aligner for a Wav2Vec2CTCTokenizer's vocabulary"""
+        return cls(vocabulary_labels(tokenizer), tokenizer.pad_token_id, tokenizer.word_delimiter_token)
+
+    def targets(self, text: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """
+        Token ids of text, the word index of each token (-1 for
+        delimiters) and the words. Characters outside the vocabulary
+        (digits, punctuation) are dropped; a word left empty gets no tokens.
+        """
+        words = (text or "").split()
+        ids: List[int] = []
+        owners: List[int] = []
+        for index, word in enumerate(words):
+            chars = [self.char_ids[c] for c in word.lower() if c in self.char_ids]
+            if not chars:
+                continue
+            if ids and self.delimiter_id is not None:
+                ids.append(self.delimiter_id)
+                owners.append(-1)
+            ids.extend(chars)
+            owners.extend([index] * len(chars))
+        return np.array(ids, dtype=np.int64), np.array(owners, dtype=np.int64), words
+
+    def align(self, logits: np.ndarray, text: str, frame_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Align text to one clip's logits (frames x vocabulary). Returns
+        {'score': mean word confidence, 'log_likelihood',
+         'words': [{'word', 'start', 'end', 'confidence', 'status', 'credit'}]}
+        (one entry per word of text; words without alignable characters
+        have no times and are not scored), or None if nothing can be
+        aligned (no characters, or the clip is too short).
+        """
+        targets, owners, words = self.targets(text)
+        if len(targets) == 0:
+            return None
+        log_probs = log_softmax(logits)
+        try:
+            path, total = viterbi(log_probs, targets, self.blank_id)
+        except ValueError:
+            return None
+
+        # Frames spent on each token (blank states excluded)
+        token_frames = np.flatnonzero(path % 2 == 1)
+        token_of_frame = (path[token_frames] - 1) // 2
+        word_of_frame = owners[token_of_frame]
+        forced = log_probs[token_frames, targets[token_of_frame]]
+
+        results = [{'word': word, 'start': None, 'end': None, 'confidence': None,
+                    'status': 'correct', 'credit': None} for word in words]
+        for index in np.unique(word_of_frame[word_of_frame >= 0]).tolist():
+            mask = word_of_frame == index
+            frames = token_frames[mask]
+            confidence = math.exp(float(forced[mask].mean()))
+            if confidence >= CORRECT_CONFIDENCE:
+                status = 'correct'
+            elif confidence >= MISPRONOUNCED_CONFIDENCE:
+                status = 'mispronounced'
+            else:
+                status = 'missed'
+            results[index].update(
+                start=round(int(frames[0]) * frame_seconds, 3),
+                end=round((int(frames[-1]) + 1) * frame_seconds, 3),
+                confidence=round(confidence, 3),
+                status=status,
+                credit=CREDIT[status]
+            )
+
+        confidences = [r['confidence'] for r in results if r['confidence'] is not None]
+        return {
+            'score': round(sum(confidences) / len(confidences), 2),
+            'log_likelihood': round(total, 3),
+            'words': results
+        }
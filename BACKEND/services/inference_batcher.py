@@ -0,0 +1,164 @@
+# backend/services/inference_batcher.py
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+
+class BatchedInferenceEngine:
+    """
+    Micro-batching front end for a model:
+    - Callers submit one item and block on a Future
+    - A worker thread collects up to max_batch_size items, waiting at most
+      max_wait_ms after the first one arrives
+    - The whole batch goes through batch_fn in a single call
+    - Batch-size and queue-delay statistics are kept for monitoring
+    """
+
+    STATS_WINDOW = 1000
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0, name: str = "asr"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.name = name
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._worker_pid: int | None = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    # ---------- PUBLIC API ----------
+    def submit(self, item: Any) -> Future:
+        """Queue one item for the next batch and return its Future"""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def infer(self, item: Any, timeout: float | None = None) -> Any:
+        """Submit one item and wait for its result"""
+        return self.submit(item).result(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-delay statistics since start (or last reset)"""
+        with self._stats_lock:
+            delays = sorted(self._queue_delays_ms)
+            batches = self._total_batches
+            return {
+                'engine': self.name,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'total_requests': self._total_requests,
+                'total_batches': batches,
+                'avg_batch_size': round(self._total_requests / batches, 2) if batches else 0.0,
+                'batch_size_histogram': dict(sorted(self._batch_size_histogram.items())),
+                'avg_queue_delay_ms': round(sum(delays) / len(delays), 2) if delays else 0.0,
+                'p50_queue_delay_ms': round(self._percentile(delays, 0.50), 2),
+                'p95_queue_delay_ms': round(self._percentile(delays, 0.95), 2),
+                'max_queue_delay_ms': round(delays[-1], 2) if delays else 0.0,
+                'avg_batch_inference_ms': round(self._total_inference_ms / batches, 2) if batches else 0.0,
+                'failed_batches': self._failed_batches,
+                'queue_depth': self._queue.qsize()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._reset_stats()
+
+    # ---------- WORKER ----------
+    def _ensure_worker(self):
+        # The worker is started lazily (and restarted after fork) because threads
+        # created in a pre-fork master do not survive into the workers.
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(
+                target=self._run,
+                name=f"{self.name}-batcher",
+                daemon=True
+            )
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def _collect_batch(self):
+        item = self._queue.get()
+        batch = [item]
+        deadline = item[2] + self.max_wait_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    # Still take whatever is already waiting, without blocking
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            items = [entry[0] for entry in batch]
+
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"batch_fn returned {len(results)} results for {len(items)} items"
+                    )
+                failed = False
+            except Exception as e:
+                print(f"[ERROR] {self.name} batch of {len(items)} failed: {e}")
+                results = None
+                failed = True
+                error = e
+
+            finished = time.perf_counter()
+            self._record_batch(batch, started, finished, failed)
+
+            for index, (_, future, _) in enumerate(batch):
+                if failed:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[index])
+
+    # ---------- STATS ----------
+    def _reset_stats(self):
+        self._total_requests = 0
+        self._total_batches = 0
+        self._failed_batches = 0
+        self._total_inference_ms = 0.0
+        self._batch_size_histogram: Dict[int, int] = {}
+        self._queue_delays_ms: deque = deque(maxlen=self.STATS_WINDOW)
+
+    def _record_batch(self, batch, started, finished, failed):
+        with self._stats_lock:
+            size = len(batch)
+            self._total_requests += size
+            self._total_batches += 1
+            self._failed_batches += 1 if failed else 0
+            self._total_inference_ms += (finished - started) * 1000.0
+            self._batch_size_histogram[size] = self._batch_size_histogram.get(size, 0) + 1
+            for _, _, enqueued in batch:
+                self._queue_delays_ms.append((started - enqueued) * 1000.0)
+
+    @staticmethod
+    def _percentile(sorted_values, fraction):
+        if not sorted_values:
+            return 0.0
+        index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+        return sorted_values[index]
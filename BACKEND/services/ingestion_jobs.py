@@ -0,0 +1,217 @@
+# backend/services/ingestion_jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+from config import Config
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled"""
+
+
+class JobLimitExceeded(Exception):
+    """Raised by submit() when a user already has too many active jobs"""
+
+
+class IngestionJob:
+    """
+    One unit of ingestion work (PDF extraction, online-book download):
+    - status: queued -> running -> succeeded | failed | cancelled
+    - progress is a free-form dict the job updates through report()
+    - owners are the users waiting on it (identical jobs are shared)
+    """
+
+    ACTIVE = ('queued', 'running')
+
+    def __init__(self, kind: str, dedup_key: str | None, user_id: str | None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.dedup_key = dedup_key
+        self.owners = {user_id} if user_id else set()
+        self.status = 'queued'
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in self.ACTIVE
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def report(self, **progress):
+        """Update progress; raises JobCancelled if the job was cancelled"""
+        self.progress.update(progress)
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+class JobBackend:
+    """
+    Interface for ingestion job backends. Jobs are callables taking the
+    IngestionJob as first argument; the in-process backend below is the
+    default and a queue-backed one can be plugged in via set_job_backend().
+    """
+
+    def submit(self, kind: str, fn: Callable, *args, user_id: str | None = None,
+               dedup_key: str | None = None, **kwargs) -> IngestionJob:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> IngestionJob | None:
+        raise NotImplementedError
+
+    def cancel(self, job_id: str, user_id: str | None = None) -> bool:
+        raise NotImplementedError
+
+    def list_jobs(self, user_id: str) -> List[IngestionJob]:
+        raise NotImplementedError
+
+
+class InProcessJobBackend(JobBackend):
+    """
+    Thread-pool job backend:
+    - At most max_workers jobs run at once, the rest wait in the pool queue
+    - A user may have at most max_jobs_per_user queued or running jobs
+    - Submitting a job whose dedup_key is already in flight joins that job
+    - Cancellation drops queued jobs and stops running ones at their next
+      progress report; shared jobs only stop once every owner cancelled
+    - Finished jobs are kept for retention_seconds so results can be fetched
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs_per_user: int = 2, retention_seconds: float = 3600):
+        self.max_workers = max_workers
+        self.max_jobs_per_user = max_jobs_per_user
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._in_flight: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, user_id=None, dedup_key=None, **kwargs):
+        with self._lock:
+            self._purge()
+
+            existing = self._in_flight.get(dedup_key) if dedup_key else None
+            if existing is not None and existing.active:
+                if user_id:
+                    existing.owners.add(user_id)
+                return existing
+
+            if user_id and self._active_count(user_id) >= self.max_jobs_per_user:
+                raise JobLimitExceeded(
+                    f"At most {self.max_jobs_per_user} ingestion jobs may run per user"
+                )
+
+            job = IngestionJob(kind, dedup_key, user_id)
+            self._jobs[job.id] = job
+            if dedup_key:
+                self._in_flight[dedup_key] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id, user_id=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            if user_id and job.owners - {user_id}:
+                # Someone else still waits on this shared job
+                job.owners.discard(user_id)
+                return True
+            job._cancel_event.set()
+            if job.future is not None and job.future.cancel():
+                self._finish(job, 'cancelled')
+            return True
+
+    def list_jobs(self, user_id):
+        with self._lock:
+            return [job for job in self._jobs.values() if user_id in job.owners]
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, 'cancelled')
+            return
+        except Exception as e:
+            print(f"[ERROR] Ingestion job {job.id} ({job.kind}) failed: {e}")
+            with self._lock:
+                job.error = str(e)
+                self._finish(job, 'failed')
+            return
+
+        with self._lock:
+            if job.cancel_requested:
+                self._finish(job, 'cancelled')
+            else:
+                job.result = result
+                self._finish(job, 'succeeded')
+
+    # ---------- HELPERS (caller holds self._lock) ----------
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = time.time()
+        if job.dedup_key and self._in_flight.get(job.dedup_key) is job:
+            del self._in_flight[job.dedup_key]
+
+    def _active_count(self, user_id):
+        return sum(1 for job in self._jobs.values() if job.active and user_id in job.owners)
+
+    def _purge(self):
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if not job.active and job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_job_backend = None
+
+
+def get_job_backend() -> JobBackend:
+    """Process-wide job backend (in-process unless another one was set)"""
+    global _job_backend
+    if _job_backend is None:
+        _job_backend = InProcessJobBackend(
+            max_workers=Config.INGEST_MAX_WORKERS,
+            max_jobs_per_user=Config.INGEST_MAX_JOBS_PER_USER,
+            retention_seconds=Config.INGEST_JOB_RETENTION_SECONDS
+        )
+    return _job_backend
+
+
+def set_job_backend(backend: JobBackend):
+    """Swap in another backend (e.g. a distributed queue, or one for tests)"""
+    global _job_backend
+    _job_backend = backend
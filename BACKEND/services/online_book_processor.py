@@ -2,6 +2,7 @@
 Service for processing online text-based books (Project Gutenberg, etc.)
 Extracts text content and converts to sentences similar to PDF processing
 """
+import hashlib
 import requests
 from typing import List, Dict
 import logging
@@ -42,12 +43,15 @@ class OnlineBookProcessor:
     
     TIMEOUT = 30  # seconds
     MAX_CONTENT_SIZE = 10 * 1024 * 1024  # 10MB
+    CHUNK_SIZE = 64 * 1024
     
     @classmethod
-    def extract_text_from_url(cls, text_url: str) -> Dict:
+    def extract_text_from_url(cls, text_url: str, progress_callback=None) -> Dict:
         """
         Fetch and extract text content from a URL
         Handles both HTML and plain text formats
+        progress_callback(bytes_downloaded, bytes_total) is called per chunk;
+        bytes_total is None when the server sends no Content-Length
         """
         try:
             logger.info(f"Fetching content from: {text_url}")
@@ -55,9 +59,18 @@ class OnlineBookProcessor:
             response = requests.get(
                 text_url,
                 timeout=cls.TIMEOUT,
-                headers={'User-Agent': 'Mozilla/5.0'}
+                headers={'User-Agent': 'Mozilla/5.0'},
+                stream=True
             )
-            response.raise_for_status()
+            with response:
+                response.raise_for_status()
+                raw = cls._download(response, progress_callback)
+            
+            if raw is None:
+                return {
+                    'success': False,
+                    'error': f'Content exceeds {cls.MAX_CONTENT_SIZE // (1024 * 1024)}MB limit'
+                }
             
             # Check content type
             content_type = response.headers.get('content-type', '').lower()
@@ -66,11 +79,11 @@ class OnlineBookProcessor:
                 # Parse HTML
                 logger.info("Detected HTML content, parsing...")
                 parser = HTMLTextExtractor()
-                parser.feed(response.text)
+                parser.feed(cls._decode(raw, response))
                 text_content = parser.get_text()
             else:
                 # Assume plain text
-                text_content = response.text
+                text_content = cls._decode(raw, response)
             
             # Clean up text
             text_content = cls._clean_text(text_content)
@@ -88,6 +101,7 @@ class OnlineBookProcessor:
             
             return {
                 'success': True,
+                'document_id': hashlib.sha256(text_url.encode('utf-8')).hexdigest(),
                 'sentences': sentences,
                 'sentence_count': len(sentences),
                 'character_count': len(text_content)
@@ -106,6 +120,28 @@ class OnlineBookProcessor:
                 'error': f'Error processing content: {str(e)}'
             }
     
+    @classmethod
+    def _download(cls, response, progress_callback=None):
+        """Read the body in chunks; None if it is larger than MAX_CONTENT_SIZE"""
+        content_length = response.headers.get('content-length')
+        bytes_total = int(content_length) if content_length and content_length.isdigit() else None
+        if bytes_total is not None and bytes_total > cls.MAX_CONTENT_SIZE:
+            return None
+        
+        buffer = bytearray()
+        for chunk in response.iter_content(chunk_size=cls.CHUNK_SIZE):
+            buffer.extend(chunk)
+            if len(buffer) > cls.MAX_CONTENT_SIZE:
+                return None
+            if progress_callback:
+                progress_callback(len(buffer), bytes_total)
+        return bytes(buffer)
+    
+    @classmethod
+    def _decode(cls, raw: bytes, response) -> str:
+        """Decode like response.text would, without re-reading the stream"""
+        return raw.decode(response.encoding or 'utf-8', errors='replace')
+    
     @classmethod
     def _clean_text(cls, text: str) -> str:
         """Clean and normalize text content"""
@@ -0,0 +1,237 @@
+# backend/services/phoneme_alignment.py
+"""
+Phoneme-level alignment of expected vs spoken pronunciations.
+
+    IPA per word (services/phoneme_service.py) --> phonemes (longest match
+        against a fixed espeak en-us inventory, stress marks dropped)
+        --> integer ids --> weighted edit distance (scoring_engine's
+        row-vectorized DP) with a precomputed confusion cost table
+        --> score + alignment path for feedback
+
+Substituting a similar sound costs less than an unrelated one: a voicing
+slip (s/z) or a neighbouring vowel (ɪ/i) is cheaper than t/a. Inserting or
+deleting a phoneme costs 1, the cost of the most different substitution.
+Costs are held as integer hundredths, so the DP runs on an int matrix.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from services.scoring_engine import backtrace, edit_distance_matrix
+
+# ---------- INVENTORY ----------
+# Vowels: (height 0=close..3=open, backness 0=front..2=back, rounded)
+VOWELS: Dict[str, Tuple[float, float, bool]] = {
+    'i': (0, 0, False), 'iː': (0, 0, False), 'ɪ': (0.5, 0.3, False), 'ᵻ': (0.5, 1, False),
+    'e': (1, 0, False), 'ɛ': (2, 0, False), 'æ': (2.5, 0, False), 'a': (3, 0.5, False),
+    'ɐ': (2.5, 1, False), 'ə': (1.5, 1, False), 'ɚ': (1.5, 1, False), 'ɜ': (2, 1, False),
+    'ɜː': (2, 1, False), 'ʌ': (2, 1.5, False), 'ɑ': (3, 2, False), 'ɑː': (3, 2, False),
+    'ɒ': (3, 2, True), 'ɔ': (2, 2, True), 'ɔː': (2, 2, True), 'o': (1, 2, True),
+    'oː': (1, 2, True), 'ʊ': (0.5, 1.7, True), 'u': (0, 2, True), 'uː': (0, 2, True),
+}
+# Diphthongs, by their first and last element
+DIPHTHONGS: Dict[str, Tuple[str, str]] = {
+    'eɪ': ('e', 'ɪ'), 'aɪ': ('a', 'ɪ'), 'ɔɪ': ('ɔ', 'ɪ'), 'aʊ': ('a', 'ʊ'),
+    'oʊ': ('o', 'ʊ'), 'əʊ': ('ə', 'ʊ'), 'ɪə': ('ɪ', 'ə'), 'eə': ('e', 'ə'), 'ʊə': ('ʊ', 'ə'),
+}
+# Consonants: (voiced, place, manner)
+CONSONANTS: Dict[str, Tuple[bool, str, str]] = {
+    'p': (False, 'bilabial', 'stop'), 'b': (True, 'bilabial', 'stop'),
+    't': (False, 'alveolar', 'stop'), 'd': (True, 'alveolar', 'stop'),
+    'k': (False, 'velar', 'stop'), 'ɡ': (True, 'velar', 'stop'), 'ʔ': (False, 'glottal', 'stop'),
+    'f': (False, 'labiodental', 'fricative'), 'v': (True, 'labiodental', 'fricative'),
+    'θ': (False, 'dental', 'fricative'), 'ð': (True, 'dental', 'fricative'),
+    's': (False, 'alveolar', 'fricative'), 'z': (True, 'alveolar', 'fricative'),
+    'ʃ': (False, 'postalveolar', 'fricative'), 'ʒ': (True, 'postalveolar', 'fricative'),
+    'h': (False, 'glottal', 'fricative'),
+    'tʃ': (False, 'postalveolar', 'affricate'), 'dʒ': (True, 'postalveolar', 'affricate'),
+    'm': (True, 'bilabial', 'nasal'), 'n': (True, 'alveolar', 'nasal'), 'ŋ': (True, 'velar', 'nasal'),
+    'n̩': (True, 'alveolar', 'nasal'),
+    'l': (True, 'alveolar', 'lateral'), 'l̩': (True, 'alveolar', 'lateral'),
+    'ɹ': (True, 'alveolar', 'approximant'), 'ɾ': (True, 'alveolar', 'flap'),
+    'w': (True, 'labiovelar', 'approximant'), 'j': (True, 'palatal', 'approximant'),
+}
+PLACES = ('bilabial', 'labiodental', 'dental', 'alveolar', 'postalveolar', 'palatal', 'velar', 'labiovelar', 'glottal')
+
+# Spellings espeak/phonemizer may emit for the same phoneme
+ALIASES = {'g': 'ɡ', 'r': 'ɹ', 'ʧ': 'tʃ', 'ʤ': 'dʒ', 'ɝ': 'ɜː'}
+# Marks that are not phonemes: primary/secondary stress, syllable break, tie bar
+IGNORED = set('ˈˌ.‿͡-')
+
+INVENTORY: Tuple[str, ...] = tuple(VOWELS) + tuple(DIPHTHONGS) + tuple(CONSONANTS)
+PHONEME_IDS: Dict[str, int] = {p: i for i, p in enumerate(INVENTORY)}
+UNKNOWN_ID = len(INVENTORY)  # any symbol outside the inventory
+COST_SCALE = 100  # costs in the table and the DP are hundredths of a phoneme
+MAX_SYMBOL_LENGTH = max(len(p) for p in list(INVENTORY) + list(ALIASES))
+
+# Hand-tuned pairs the feature distance undervalues (common L2 / ASR confusions)
+CLOSE_PAIRS = {
+    ('θ', 'f'): 0.4, ('ð', 'd'): 0.4, ('ð', 'v'): 0.5, ('θ', 's'): 0.5, ('θ', 't'): 0.5,
+    ('ɹ', 'l'): 0.6, ('ɾ', 't'): 0.3, ('ɾ', 'd'): 0.3, ('w', 'v'): 0.6, ('n', 'ŋ'): 0.5,
+    ('n', 'n̩'): 0.2, ('l', 'l̩'): 0.2, ('ə', 'ɚ'): 0.3, ('j', 'i'): 0.6, ('w', 'u'): 0.6,
+}
+
+
+def _substitution_cost(a: str, b: str) -> float:
+    """Cost of hearing b where a was expected (symmetric), in (0, 1]"""
+    close = CLOSE_PAIRS.get((a, b), CLOSE_PAIRS.get((b, a)))
+    if close is not None:
+        return close
+    vowel_like = {**VOWELS, **DIPHTHONGS}
+    if (a in DIPHTHONGS or b in DIPHTHONGS) and a in vowel_like and b in vowel_like:
+        # Cheaper when one is an element of the other, or they share one
+        shared = set(DIPHTHONGS.get(a, (a,))) & set(DIPHTHONGS.get(b, (b,)))
+        return 0.5 if shared else 0.8
+    if a in VOWELS and b in VOWELS:
+        (h1, b1, r1), (h2, b2, r2) = VOWELS[a], VOWELS[b]
+        return min(0.8, 0.15 + 0.15 * abs(h1 - h2) + 0.15 * abs(b1 - b2) + (0.1 if r1 != r2 else 0.0))
+    if a in CONSONANTS and b in CONSONANTS:
+        (v1, p1, m1), (v2, p2, m2) = CONSONANTS[a], CONSONANTS[b]
+        place_gap = abs(PLACES.index(p1) - PLACES.index(p2))
+        if m1 == m2 and p1 == p2:
+            return 0.4  # voicing only
+        if m1 == m2 and place_gap == 1:
+            return 0.6 if v1 == v2 else 0.7
+        if p1 == p2:
+            return 0.7 if v1 == v2 else 0.8
+        if m1 == m2:
+            return 0.8
+        return 1.0
+    return 1.0
+
+
+@lru_cache(maxsize=1)
+def confusion_costs() -> np.ndarray:
+    """
+    (len(INVENTORY)+1)^2 substitution cost table (hundredths) indexed by phoneme id. The
+    last row/column is UNKNOWN_ID, which costs 1 against everything, itself
+    included: symbols outside the inventory never count as a match.
+    """
+    size = len(INVENTORY) + 1
+    costs = np.full((size, size), COST_SCALE, dtype=np.int64)
+    for i, a in enumerate(INVENTORY):
+        for j, b in enumerate(INVENTORY):
+            costs[i, j] = 0 if i == j else round(_substitution_cost(a, b) * COST_SCALE)
+    costs.setflags(write=False)
+    return costs
+
+
+# ---------- SEGMENTATION ----------
+def segment(ipa: str) -> List[str]:
+    """Split an IPA string into inventory phonemes (longest match); unknown symbols are kept one per character"""
+    phonemes: List[str] = []
+    position = 0
+    while position < len(ipa):
+        if ipa[position] in IGNORED or ipa[position].isspace():
+            position += 1
+            continue
+        for length in range(min(MAX_SYMBOL_LENGTH, len(ipa) - position), 0, -1):
+            symbol = ipa[position:position + length]
+            symbol = ALIASES.get(symbol, symbol)
+            if symbol in PHONEME_IDS:
+                phonemes.append(symbol)
+                position += length
+                break
+        else:
+            if ipa[position] == 'ː' and phonemes:
+                # Length mark after a vowel the inventory has no long form of
+                position += 1
+                continue
+            phonemes.append(ipa[position])
+            position += 1
+    return phonemes
+
+
+def encode(phonemes: Sequence[str]) -> np.ndarray:
+    """Phoneme ids (UNKNOWN_ID outside the inventory)"""
+    return np.fromiter((PHONEME_IDS.get(p, UNKNOWN_ID) for p in phonemes), dtype=np.int64, count=len(phonemes))
+
+
+# ---------- ALIGNMENT ----------
+class PhonemeAligner:
+    """
+    Aligns expected and spoken phoneme sequences with confusion-weighted
+    edit distance. Stateless, so one instance is shared.
+    """
+
+    def __init__(self, indel_cost: float = 1.0):
+        self.indel_cost = round(indel_cost * COST_SCALE)
+        self.costs = confusion_costs()
+
+    def split_words(self, words: Optional[Sequence[str]]) -> Tuple[List[str], List[int]]:
+        """Phonemes of a list of per-word IPA strings, and the word index of each phoneme"""
+        phonemes: List[str] = []
+        word_index: List[int] = []
+        for index, word in enumerate(words or ()):
+            segmented = segment(word)
+            phonemes.extend(segmented)
+            word_index.extend([index] * len(segmented))
+        return phonemes, word_index
+
+    def align(self, expected_words: Optional[Sequence[str]], spoken_words: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """
+        Align two phonemizations (one IPA string per word, as
+        PhonemeService.phonemize returns them). Returns
+        {'score': 1 - cost / expected phonemes (floored at 0), 'cost',
+         'path': [{'op', 'expected', 'spoken', 'cost', 'word'}]}, where
+        'word' is the expected word index (None for inserted phonemes
+        after the last expected one) and op is match / substitute /
+        delete (expected phoneme not heard) / insert (extra phoneme).
+        """
+        expected, expected_word = self.split_words(expected_words)
+        return self._align(expected, expected_word, encode(expected), spoken_words)
+
+    def align_reference(self, reference: Dict[str, Any], spoken_words: Optional[Sequence[str]]) -> Dict[str, Any]:
+        """align() with the expected side taken from prepared artifacts (services/reference_store.py)"""
+        expected_word: List[int] = []
+        for index, (start, end) in enumerate(reference['word_spans']):
+            expected_word.extend([index] * (end - start))
+        return self._align(reference['phoneme_symbols'], expected_word,
+                           reference['phoneme_ids'].astype(np.int64), spoken_words)
+
+    def _align(self, expected, expected_word, a_ids, spoken_words) -> Dict[str, Any]:
+        spoken, _ = self.split_words(spoken_words)
+        b_ids = encode(spoken)
+
+        costs = dict(substitution_costs=self.costs, insert_cost=self.indel_cost, delete_cost=self.indel_cost)
+        matrix = edit_distance_matrix(a_ids, b_ids, **costs)
+        total = int(matrix[-1, -1]) / COST_SCALE
+
+        a_list, b_list = a_ids.tolist(), b_ids.tolist()
+        path: List[Dict[str, Any]] = []
+        for tag, i1, i2, j1, j2 in backtrace(matrix, a_ids, b_ids, **costs):
+            for k in range(max(i2 - i1, j2 - j1)):
+                i = i1 + k if i1 + k < i2 else None
+                j = j1 + k if j1 + k < j2 else None
+                if i is not None and j is not None:
+                    cost = self.costs.item(a_list[i], b_list[j])
+                    op = 'match' if cost == 0 else 'substitute'
+                else:
+                    cost = self.indel_cost
+                    op = 'delete' if j is None else 'insert'
+                word = expected_word[i] if i is not None else (expected_word[i1] if i1 < len(expected_word) else None)
+                path.append({
+                    'op': op,
+                    'expected': expected[i] if i is not None else None,
+                    'spoken': spoken[j] if j is not None else None,
+                    'cost': cost / COST_SCALE,
+                    'word': word
+                })
+
+        score = max(0.0, 1.0 - total / max(len(expected), 1))
+        return {'score': round(score, 2), 'cost': round(total, 2), 'path': path}
+
+
+def mistakes(alignment: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Path entries that were not clean matches"""
+    return [step for step in alignment['path'] if step['op'] != 'match']
+
+
+_phoneme_aligner = None
+
+
+def get_phoneme_aligner() -> PhonemeAligner:
+    """Process-wide phoneme aligner"""
+    global _phoneme_aligner
+    if _phoneme_aligner is None:
+        _phoneme_aligner = PhonemeAligner()
+    return _phoneme_aligner
@@ -0,0 +1,222 @@
+# backend/services/phoneme_service.py
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+from config import Config
+
+
+class PhonemeService:
+    """
+    Cached phonemization on top of the espeak backend:
+    - One espeak backend per language, created once and reused
+    - In-memory LRU cache with a TTL, keyed by normalized text + language
+    - Optional persistent SQLite store shared across restarts and workers
+    - Bulk API that phonemizes many sentences in a single backend call
+    """
+
+    def __init__(self, cache_size=4096, ttl_seconds=86400, store_path=None, with_stress=True):
+        self.cache_size = max(1, int(cache_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self.store_path = store_path or None
+        self.with_stress = with_stress
+
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._backends: Dict[str, object] = {}
+        self._backend_lock = threading.Lock()
+        self._store = None
+        self._store_lock = threading.Lock()
+
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.backend_calls = 0
+
+    # ---------- PUBLIC API ----------
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Cache key form of a text: lowercased with collapsed whitespace"""
+        return " ".join(text.lower().split()) if text else ""
+
+    def phonemize(self, text: str, language: str = "en-us") -> List[str]:
+        """Phonemes of one text, one entry per word"""
+        return self.phonemize_many([text], language)[0]
+
+    def phonemize_many(self, texts: List[str], language: str = "en-us") -> List[List[str]]:
+        """Phonemes for many texts; every cache miss goes through one backend call"""
+        keys = [self.normalize(t) for t in texts]
+        results: Dict[str, List[str]] = {"": []}
+
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in results:
+                continue
+            cached = self._cache_get(key, language)
+            if cached is None:
+                cached = self._store_get(key, language)
+                if cached is not None:
+                    self.store_hits += 1
+                    self._cache_put(key, language, cached)
+            if cached is None:
+                missing.append(key)
+            else:
+                self.hits += 1
+                results[key] = cached
+
+        if missing:
+            self.misses += len(missing)
+            phonemized = self._run_backend(missing, language)
+            for key, phonemes in zip(missing, phonemized):
+                results[key] = phonemes
+                self._cache_put(key, language, phonemes)
+            self._store_put_many(
+                [(key, phonemes) for key, phonemes in zip(missing, phonemized) if phonemes],
+                language
+            )
+
+        return [list(results[key]) for key in keys]
+
+    def warm_document(self, sentences: List[str], language: str = "en-us", chunk_size: int = 256) -> int:
+        """Phonemize a whole document up front so scoring finds it cached"""
+        texts = [s for s in sentences if s and s.strip()]
+        before = self.misses
+        # Large books go through in chunks so live scoring can take the
+        # backend lock between them
+        for start in range(0, len(texts), chunk_size):
+            self.phonemize_many(texts[start:start + chunk_size], language)
+        return self.misses - before
+
+    def warm_document_async(self, sentences: List[str], language: str = "en-us"):
+        """Run warm_document on a background thread so uploads return immediately"""
+        def run():
+            try:
+                started = time.perf_counter()
+                count = self.warm_document(sentences, language)
+                print(f"[PHONEMES] Pre-phonemized {count} new sentences in "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms")
+            except Exception as e:
+                print(f"[WARN] Document phonemization failed: {e}")
+
+        thread = threading.Thread(target=run, name="phoneme-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_stats(self) -> Dict:
+        return {
+            'cache_entries': len(self._cache),
+            'cache_size': self.cache_size,
+            'ttl_seconds': self.ttl_seconds,
+            'store_path': self.store_path,
+            'hits': self.hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'backend_calls': self.backend_calls
+        }
+
+    # ---------- BACKEND ----------
+    def _get_backend(self, language):
+        backend = self._backends.get(language)
+        if backend is None:
+            from phonemizer.backend import EspeakBackend
+            backend = EspeakBackend(
+                language,
+                preserve_punctuation=False,
+                with_stress=self.with_stress
+            )
+            self._backends[language] = backend
+        return backend
+
+    def _run_backend(self, texts, language):
+        try:
+            # espeak is not thread-safe, so calls are serialized per process
+            with self._backend_lock:
+                backend = self._get_backend(language)
+                self.backend_calls += 1
+                output = backend.phonemize(texts, strip=True)
+            return [[p for p in line.split() if p] for line in output]
+        except Exception as e:
+            print(f"Phonemizer failed: {e}")
+            return [[] for _ in texts]
+
+    # ---------- MEMORY CACHE ----------
+    def _cache_get(self, key, language):
+        with self._cache_lock:
+            entry = self._cache.get((key, language))
+            if entry is None:
+                return None
+            expires_at, phonemes = entry
+            if expires_at < time.monotonic():
+                del self._cache[(key, language)]
+                return None
+            self._cache.move_to_end((key, language))
+            return phonemes
+
+    def _cache_put(self, key, language, phonemes):
+        if not phonemes:
+            return
+        with self._cache_lock:
+            self._cache[(key, language)] = (time.monotonic() + self.ttl_seconds, list(phonemes))
+            self._cache.move_to_end((key, language))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ---------- PERSISTENT STORE ----------
+    def _get_store(self):
+        if self._store is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.store_path)), exist_ok=True)
+            self._store = sqlite3.connect(self.store_path, timeout=5, check_same_thread=False)
+            self._store.execute(
+                "CREATE TABLE IF NOT EXISTS phonemes ("
+                "text TEXT NOT NULL, language TEXT NOT NULL, phonemes TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (text, language))"
+            )
+            self._store.commit()
+        return self._store
+
+    def _store_get(self, key, language):
+        if not self.store_path:
+            return None
+        try:
+            with self._store_lock:
+                row = self._get_store().execute(
+                    "SELECT phonemes FROM phonemes WHERE text = ? AND language = ?",
+                    (key, language)
+                ).fetchone()
+            return row[0].split() if row else None
+        except Exception as e:
+            print(f"[WARN] Phoneme store read failed: {e}")
+            return None
+
+    def _store_put_many(self, entries, language):
+        if not self.store_path or not entries:
+            return
+        try:
+            now = time.time()
+            with self._store_lock:
+                store = self._get_store()
+                store.executemany(
+                    "INSERT OR REPLACE INTO phonemes (text, language, phonemes, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, language, " ".join(phonemes), now) for key, phonemes in entries]
+                )
+                store.commit()
+        except Exception as e:
+            print(f"[WARN] Phoneme store write failed: {e}")
+
+
+_phoneme_service = None
+
+
+def get_phoneme_service():
+    """Process-wide phoneme service configured from Config"""
+    global _phoneme_service
+    if _phoneme_service is None:
+        _phoneme_service = PhonemeService(
+            cache_size=Config.PHONEME_CACHE_SIZE,
+            ttl_seconds=Config.PHONEME_CACHE_TTL_SECONDS,
+            store_path=Config.PHONEME_STORE_PATH
+        )
+    return _phoneme_service
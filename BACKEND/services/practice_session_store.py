@@ -0,0 +1,71 @@
+# backend/services/practice_session_store.py
+import threading
+import time
+from typing import Any, Dict, List
+
+
+class PracticeSession:
+    """Per-user practice progress (sentence index and counts)"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.sentences: List[Dict[str, Any]] = []
+        self.current_sentence_index = 0
+        self.correct_count = 0
+        self.total_practiced = 0
+        self.is_reading = False
+        self.current_pdf = None
+        self.last_access = time.monotonic()
+
+
+class PracticeSessionStore:
+    """
+    Keyed store of practice sessions:
+    - One session per user key, created on first access
+    - Idle sessions expire after ttl_seconds
+    """
+
+    def __init__(self, ttl_seconds=3600, max_sessions=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, PracticeSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> PracticeSession:
+        """Return the session for key, creating it if needed"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None or now - session.last_access > self.ttl_seconds:
+                if len(self._sessions) >= self.max_sessions:
+                    self._evict(now)
+                session = PracticeSession(key)
+                self._sessions[key] = session
+            session.last_access = now
+            return session
+
+    def discard(self, key: str):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        expired = [k for k, s in self._sessions.items() if now - s.last_access > self.ttl_seconds]
+        for key in expired:
+            del self._sessions[key]
+        if len(self._sessions) >= self.max_sessions:
+            oldest = min(self._sessions, key=lambda k: self._sessions[k].last_access)
+            del self._sessions[oldest]
+
+
+_session_store = None
+
+
+def get_practice_session_store():
+    """Process-wide practice session store"""
+    global _session_store
+    if _session_store is None:
+        _session_store = PracticeSessionStore()
+    return _session_store
@@ -0,0 +1,112 @@
+# backend/services/readiness.py
+import threading
+import time
+from typing import Any, Dict
+from config import Config
+
+MODES = ('background', 'eager', 'lazy')
+
+
+class Readiness:
+    """
+    Startup state of heavy components, kept apart from liveness:
+    - /api/health answers as soon as the process is up
+    - /api/ready answers 200 only once every registered component is ready
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str):
+        with self._lock:
+            self._components.setdefault(name, {'status': 'pending'})
+
+    def start(self, name: str):
+        with self._lock:
+            self._components[name] = {'status': 'loading', 'started_at': time.time()}
+
+    def ready(self, name: str, **details):
+        with self._lock:
+            component = self._components.setdefault(name, {})
+            component.update(details)
+            component['status'] = 'ready'
+            component['finished_at'] = time.time()
+            if 'started_at' in component:
+                component['seconds'] = round(component['finished_at'] - component['started_at'], 2)
+
+    def fail(self, name: str, error: str):
+        with self._lock:
+            component = self._components.setdefault(name, {})
+            component['status'] = 'failed'
+            component['error'] = error
+            component['finished_at'] = time.time()
+
+    @property
+    def is_ready(self) -> bool:
+        with self._lock:
+            return all(c['status'] == 'ready' for c in self._components.values())
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {name: dict(c) for name, c in self._components.items()}
+        return {
+            'ready': all(c['status'] == 'ready' for c in components.values()),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'model_loading': Config.MODEL_LOADING,
+            'components': components
+        }
+
+
+_readiness = None
+
+
+def get_readiness() -> Readiness:
+    """Process-wide readiness state"""
+    global _readiness
+    if _readiness is None:
+        _readiness = Readiness()
+    return _readiness
+
+
+def _load_models():
+    readiness = get_readiness()
+    readiness.start('models')
+    try:
+        from models.model_registry import get_model_registry, preload_default_models
+        preload_default_models()
+        readiness.ready('models', loaded=sorted(get_model_registry().memory_report()['models']))
+    except Exception as e:
+        print(f"[ERROR] Model loading failed: {e}")
+        readiness.fail('models', str(e))
+        return
+
+    if Config.WARMUP_MODE == 'startup':
+        from services.warmup import run_warmup
+        run_warmup()
+
+
+def start_model_loading(mode: str | None = None):
+    """
+    Load heavy models according to Config.MODEL_LOADING:
+    - 'background': on a daemon thread; /api/ready is 503 until done
+    - 'eager': right now, blocking app creation (the old behaviour)
+    - 'lazy': not at all; each model loads on its first request
+    Unless Config.WARMUP_MODE is 'off', readiness also waits for warm-up,
+    which follows model loading ('startup') or runs in each forked worker
+    ('post_fork', see gunicorn.conf.py).
+    """
+    mode = mode or Config.MODEL_LOADING
+    if mode not in MODES:
+        raise ValueError(f"Unknown MODEL_LOADING mode: {mode}")
+    if mode == 'lazy':
+        return
+
+    get_readiness().register('models')
+    if Config.WARMUP_MODE != 'off':
+        get_readiness().register('warmup')
+    if mode == 'eager':
+        _load_models()
+    else:
+        threading.Thread(target=_load_models, name="model-loader", daemon=True).start()
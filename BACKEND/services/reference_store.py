@@ -0,0 +1,204 @@
+# backend/services/reference_store.py
+"""
+Expected-side reference artifacts for practice sentences.
+
+Everything scoring needs about an expected sentence is known once a
+document is ingested, so it is prepared there instead of on every
+evaluation:
+
+    document --> word unigram/bigram language model (services/ctc_decoding.py)
+    text --> normalized text (as pronunciation_score_simple compares it)
+         --> tokens (one cleaned word per whitespace word of the text)
+         --> phonemes (one IPA string per word, PhonemeService)
+         --> phoneme symbols, ids + word-to-phoneme spans (services/phoneme_alignment.py)
+
+Evaluation looks the artifacts up by (document_id, global_index), or by
+text when the client sends no ids, and only processes the spoken side.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import Config
+from services.ctc_decoding import DocumentLanguageModel
+from services.phoneme_alignment import encode, segment
+from services.phoneme_service import PhonemeService, get_phoneme_service
+from services.word_scorer import clean_word
+
+
+def build_reference(text: str, phonemes: List[str]) -> Dict[str, Any]:
+    """Reference artifacts of one sentence from its text and per-word phonemes"""
+    symbols: List[str] = []
+    ids: List[np.ndarray] = []
+    spans: List[Tuple[int, int]] = []
+    position = 0
+    for word in phonemes:
+        segmented = segment(word)
+        word_ids = encode(segmented).astype(np.uint8)
+        symbols.extend(segmented)
+        ids.append(word_ids)
+        spans.append((position, position + len(word_ids)))
+        position += len(word_ids)
+    return {
+        'text': text,
+        'normalized': re.sub(r'[^\w\s]', '', text.lower()).strip(),
+        'tokens': [clean_word(w) for w in text.split()],
+        'phonemes': list(phonemes),
+        'phoneme_symbols': symbols,
+        'phoneme_ids': np.concatenate(ids) if ids else np.empty(0, dtype=np.uint8),
+        'word_spans': spans
+    }
+
+
+class ReferenceStore:
+    """
+    Reference artifacts keyed by sentence:
+    - ingest() prepares a whole document (phonemized in batches) and maps
+      its global_index values to the sentences; it also counts the
+      document's words for the decoding language model
+    - Entries are shared by normalized text, so a sentence that occurs in
+      several documents or evaluations is processed once
+    - A bounded LRU over sentences; anything evicted or never ingested is
+      built on first use
+    """
+
+    def __init__(self, max_sentences: int = 100000, max_documents: int = 256):
+        self.max_sentences = max(1, int(max_sentences))
+        self.max_documents = max(1, int(max_documents))
+        self._by_text: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._documents: "OrderedDict[str, Dict[int, str]]" = OrderedDict()
+        self._language_models: Dict[str, DocumentLanguageModel] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- INGEST ----------
+    def ingest(self, document_id: Optional[str], sentences: List[Dict[str, Any]], chunk_size: int = 256) -> int:
+        """Prepare every sentence of a document; returns how many were built (not already stored)"""
+        keys: Dict[int, str] = {}
+        language_model = DocumentLanguageModel()
+        built = 0
+        # Chunks keep each phonemizer call short, so live scoring can take
+        # the backend lock in between (as PhonemeService.warm_document does)
+        for start in range(0, len(sentences), chunk_size):
+            chunk = sentences[start:start + chunk_size]
+            missing = []
+            for sentence in chunk:
+                key = PhonemeService.normalize(sentence['text'])
+                keys[sentence['global_index']] = key
+                language_model.add([clean_word(w) for w in sentence['text'].split()])
+                if key and not self._peek(key):
+                    missing.append(sentence['text'])
+            built += len(self._build_many(list(dict.fromkeys(missing))))
+
+        if document_id:
+            with self._lock:
+                self._documents[document_id] = keys
+                self._documents.move_to_end(document_id)
+                self._language_models[document_id] = language_model
+                while len(self._documents) > self.max_documents:
+                    evicted, _ = self._documents.popitem(last=False)
+                    self._language_models.pop(evicted, None)
+        return built
+
+    def ingest_async(self, document_id: Optional[str], sentences: List[Dict[str, Any]]):
+        """Run ingest on a background thread so uploads return immediately"""
+        def run():
+            try:
+                started = time.perf_counter()
+                built = self.ingest(document_id, sentences)
+                print(f"[REFERENCE] Prepared {built} new of {len(sentences)} sentences in "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms")
+            except Exception as e:
+                print(f"[WARN] Reference preparation failed: {e}")
+
+        thread = threading.Thread(target=run, name="reference-ingest", daemon=True)
+        thread.start()
+        return thread
+
+    # ---------- LOOKUP ----------
+    def get(self, document_id: str, global_index: int) -> Optional[Dict[str, Any]]:
+        """Artifacts of an ingested sentence, or None if the document is unknown"""
+        with self._lock:
+            key = self._documents.get(document_id, {}).get(global_index)
+        return self._peek(key) if key is not None else None
+
+    def language_model(self, document_id: Optional[str]) -> Optional[DocumentLanguageModel]:
+        """Word language model of an ingested document, for CTC decoding"""
+        with self._lock:
+            return self._language_models.get(document_id) if document_id else None
+
+    def for_text(self, text: str) -> Dict[str, Any]:
+        """Artifacts of any sentence, built (and kept) on a miss"""
+        key = PhonemeService.normalize(text)
+        entry = self._peek(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return self._build_many([text])[0]
+
+    def resolve(self, text: str, document_id: Optional[str] = None, global_index=None) -> Dict[str, Any]:
+        """
+        Artifacts for an evaluation: the ingested sentence when the ids are
+        given and still match the text (sentences can be edited), else by text
+        """
+        if document_id and global_index is not None:
+            try:
+                entry = self.get(document_id, int(global_index))
+            except (TypeError, ValueError):
+                entry = None
+            if entry is not None and PhonemeService.normalize(entry['text']) == PhonemeService.normalize(text):
+                self.hits += 1
+                return entry
+        return self.for_text(text)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'sentences': len(self._by_text),
+            'max_sentences': self.max_sentences,
+            'documents': len(self._documents),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    # ---------- INTERNALS ----------
+    def _peek(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._by_text.get(key)
+            if entry is not None:
+                self._by_text.move_to_end(key)
+            return entry
+
+    def _build_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Build and store artifacts for texts with one phonemizer call"""
+        if not texts:
+            return []
+        phonemes = get_phoneme_service().phonemize_many(texts)
+        entries = [build_reference(text, ph) for text, ph in zip(texts, phonemes)]
+        with self._lock:
+            for text, entry in zip(texts, entries):
+                if entry['normalized'] and not entry['phonemes']:
+                    continue  # phonemizer unavailable; retried on next use
+                key = PhonemeService.normalize(text)
+                self._by_text[key] = entry
+                self._by_text.move_to_end(key)
+            while len(self._by_text) > self.max_sentences:
+                self._by_text.popitem(last=False)
+        return entries
+
+
+_reference_store = None
+
+
+def get_reference_store():
+    """Process-wide reference store configured from Config"""
+    global _reference_store
+    if _reference_store is None:
+        _reference_store = ReferenceStore(
+            max_sentences=Config.REFERENCE_STORE_MAX_SENTENCES,
+            max_documents=Config.REFERENCE_STORE_MAX_DOCUMENTS
+        )
+    return _reference_store
@@ -0,0 +1,61 @@
+# backend/services/resampling.py
+"""
+Sample-rate conversion for the ASR front end (decoding is in
+services/audio_ingest.py).
+
+Resampling is polyphase (scipy.signal.resample_poly) with the anti-aliasing
+FIR designed once per (src_rate, dst_rate) pair and cached, so a request
+only pays for the filtering itself. Everything stays float32.
+"""
+from functools import lru_cache
+from math import gcd
+from typing import Tuple
+import numpy as np
+
+TARGET_RATE = 16000
+
+# Filter half-length per unit of max(up, down); 10 is scipy's default
+FILTER_HALF_LENGTH = 10
+KAISER_BETA = 5.0
+
+
+def rate_ratio(src_rate: int, dst_rate: int) -> Tuple[int, int]:
+    """(up, down) in lowest terms, e.g. 48000 -> 16000 is (1, 3)"""
+    divisor = gcd(int(src_rate), int(dst_rate))
+    return int(dst_rate) // divisor, int(src_rate) // divisor
+
+
+@lru_cache(maxsize=16)
+def polyphase_filter(src_rate: int, dst_rate: int) -> np.ndarray:
+    """Anti-aliasing low-pass for src_rate -> dst_rate (cached per pair)"""
+    # scipy.signal takes about a second to import, so it loads on first use
+    from scipy.signal import firwin
+
+    up, down = rate_ratio(src_rate, dst_rate)
+    max_rate = max(up, down)
+    taps = firwin(2 * FILTER_HALF_LENGTH * max_rate + 1, 1.0 / max_rate, window=('kaiser', KAISER_BETA))
+    taps = taps.astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+
+def to_mono(audio: np.ndarray) -> np.ndarray:
+    """Average channels of a (samples, channels) array; 1-D input is returned as is"""
+    if audio.ndim == 1:
+        return audio
+    if audio.shape[1] == 1:
+        return audio[:, 0]
+    return audio.mean(axis=1, dtype=np.float32)
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int = TARGET_RATE) -> np.ndarray:
+    """Resample 1-D float audio; a no-op when the rates already match"""
+    audio = np.asarray(audio, dtype=np.float32)
+    if int(src_rate) == int(dst_rate) or len(audio) == 0:
+        return audio
+    from scipy.signal import resample_poly
+
+    up, down = rate_ratio(src_rate, dst_rate)
+    # resample_poly works on a copy of the taps, so the cached filter stays intact
+    return resample_poly(audio, up, down, window=polyphase_filter(int(src_rate), int(dst_rate)))
+
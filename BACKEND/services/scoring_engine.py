@@ -0,0 +1,242 @@
+# backend/services/scoring_engine.py
+"""
+Edit-distance scoring for pronunciation feedback.
+
+Two modes (Config.SCORING_MODE):
+- 'fast' (default): similarity is the LCS ratio 2*LCS/(len(a)+len(b)),
+  computed bit-parallel; alignments follow that LCS (from a row-vectorized
+  NumPy DP) and report each unmatched stretch as one replace/delete/insert
+  opcode, as difflib does. rapidfuzz is used for both when installed.
+- 'compat': difflib.SequenceMatcher, reproducing the scores produced
+  before this engine existed (pronunciation_score_simple also keeps its
+  earlier order-insensitive word accuracy in this mode; the in-order
+  services/word_scorer.py result is only used for word feedback).
+
+SequenceMatcher.ratio() is 2*M/(len(a)+len(b)) where M counts the
+characters of greedily chosen matching blocks, so M <= LCS: fast-mode
+similarities equal or slightly exceed compat ones. Above 200 characters
+difflib's autojunk heuristic also discards frequent characters (spaces,
+vowels), which is why compat scores for paragraphs collapse to ~0.5
+where the LCS ratio stays ~0.9.
+
+Opcodes use the difflib format (tag, i1, i2, j1, j2) in both modes, so
+callers do not care which mode produced them. A plain Levenshtein path
+is not used for alignment because it breaks ties towards substitutions,
+trading a real word match for two 'replace' pairs.
+"""
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from config import Config
+
+try:
+    from rapidfuzz.distance import Indel as _Indel, Levenshtein as _Levenshtein
+except ImportError:  # optional compiled backend
+    _Indel = _Levenshtein = None
+
+MODES = ('fast', 'compat')
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+# ---------- ENCODING ----------
+def encode_pair(a: Sequence, b: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer ids for two sequences over a shared vocabulary (str -> code points)"""
+    if isinstance(a, str) and isinstance(b, str):
+        return (np.frombuffer(a.encode('utf-32-le'), dtype=np.uint32).astype(np.int64),
+                np.frombuffer(b.encode('utf-32-le'), dtype=np.uint32).astype(np.int64))
+    vocabulary: Dict[Any, int] = {}
+    a_ids = np.fromiter((vocabulary.setdefault(x, len(vocabulary)) for x in a), dtype=np.int64, count=len(a))
+    b_ids = np.fromiter((vocabulary.setdefault(x, len(vocabulary)) for x in b), dtype=np.int64, count=len(b))
+    return a_ids, b_ids
+
+
+# ---------- NUMPY DP ----------
+def edit_distance_matrix(a_ids: np.ndarray, b_ids: np.ndarray, substitution_costs=None,
+                         insert_cost=1, delete_cost=1, substitution_cost=1) -> np.ndarray:
+    """
+    Full (len(a)+1, len(b)+1) weighted edit-distance matrix. Each row is
+    computed with whole-array operations: the left-to-right insertion chain
+    becomes a running minimum, so the only Python loop is over len(a).
+    substitution_costs, if given, is a 2-D table indexed [a_id, b_id].
+    The matrix is int64 unless a cost is a float.
+    """
+    n, m = len(a_ids), len(b_ids)
+    floats = any(isinstance(c, float) for c in (insert_cost, delete_cost, substitution_cost))
+    if substitution_costs is not None:
+        floats = floats or substitution_costs.dtype.kind == 'f'
+    dtype = np.float64 if floats else np.int64
+    steps = np.arange(m + 1, dtype=dtype) * insert_cost
+
+    matrix = np.empty((n + 1, m + 1), dtype=dtype)
+    matrix[0] = steps
+    candidates = np.empty(m + 1, dtype=dtype)
+    if substitution_costs is not None:
+        # Cost of each symbol against every b, gathered once instead of per row
+        against_b = substitution_costs[:, b_ids]
+    for i in range(1, n + 1):
+        previous = matrix[i - 1]
+        if substitution_costs is not None:
+            costs = against_b[a_ids[i - 1]]
+        else:
+            costs = np.where(b_ids == a_ids[i - 1], 0, substitution_cost)
+        candidates[0] = i * delete_cost
+        np.minimum(previous[:-1] + costs, previous[1:] + delete_cost, out=candidates[1:])
+        # row[j] = min over k <= j of candidates[k] + (j - k) * insert_cost
+        matrix[i] = np.minimum.accumulate(candidates - steps) + steps
+    return matrix
+
+
+def backtrace(matrix: np.ndarray, a_ids: np.ndarray, b_ids: np.ndarray, substitution_costs=None,
+              insert_cost=1, delete_cost=1, substitution_cost=1) -> List[Opcode]:
+    """Cheapest edit path through an edit_distance_matrix, as difflib-style opcodes"""
+    # Plain Python scalars (item() per visited cell, not the whole matrix):
+    # NumPy scalar arithmetic would dominate the walk
+    cell = matrix.item
+    a_list, b_list = a_ids.tolist(), b_ids.tolist()
+    cost_of = substitution_costs.item if substitution_costs is not None else None
+    i, j = len(a_list), len(b_list)
+    steps: List[Tuple[str, int, int]] = []
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            same = a_list[i - 1] == b_list[j - 1]
+            if cost_of is not None:
+                cost = cost_of(a_list[i - 1], b_list[j - 1])
+            else:
+                cost = 0 if same else substitution_cost
+            if abs(cell(i, j) - (cell(i - 1, j - 1) + cost)) <= 1e-9:
+                i, j = i - 1, j - 1
+                steps.append(('equal' if same else 'replace', i, j))
+                continue
+        if i > 0 and abs(cell(i, j) - (cell(i - 1, j) + delete_cost)) <= 1e-9:
+            i -= 1
+            steps.append(('delete', i, j))
+        else:
+            j -= 1
+            steps.append(('insert', i, j))
+    steps.reverse()
+    return _group(steps)
+
+
+def _group(steps: List[Tuple[str, int, int]]) -> List[Opcode]:
+    """Merge consecutive single-element edits with the same tag into opcodes"""
+    opcodes: List[List] = []
+    for tag, i, j in steps:
+        di = 0 if tag == 'insert' else 1
+        dj = 0 if tag == 'delete' else 1
+        if opcodes and opcodes[-1][0] == tag:
+            opcodes[-1][2] += di
+            opcodes[-1][4] += dj
+        else:
+            opcodes.append([tag, i, i + di, j, j + dj])
+    return [tuple(op) for op in opcodes]
+
+
+def merge_gaps(opcodes) -> List[Opcode]:
+    """Collapse the edits between two 'equal' blocks into one opcode, like difflib"""
+    merged: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if merged and tag != 'equal' and merged[-1][0] != 'equal':
+            _, i1, _, j1, _ = merged.pop()
+        if tag != 'equal':
+            tag = 'replace' if i2 > i1 and j2 > j1 else ('delete' if i2 > i1 else 'insert')
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def lcs_length(a: Sequence, b: Sequence) -> int:
+    """Longest common subsequence, bit-parallel over Python ints (Allison-Dix / Hyyro)"""
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return 0
+    masks: Dict[Any, int] = {}
+    for index, symbol in enumerate(a):
+        masks[symbol] = masks.get(symbol, 0) | (1 << index)
+    full = (1 << len(a)) - 1
+    row = full
+    for symbol in b:
+        matches = row & masks.get(symbol, 0)
+        row = ((row + matches) | (row - matches)) & full
+    return len(a) - bin(row).count('1')
+
+
+# ---------- ENGINE ----------
+class ScoringEngine:
+    """
+    Similarities and alignments of expected vs spoken text at character,
+    word and phoneme level. Stateless, so one instance is shared.
+    """
+
+    def __init__(self, mode=None, use_rapidfuzz=True):
+        self.mode = mode or Config.SCORING_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown SCORING_MODE: {self.mode}")
+        self.use_rapidfuzz = use_rapidfuzz and _Levenshtein is not None
+
+    @property
+    def backend(self) -> str:
+        if self.mode == 'compat':
+            return 'difflib'
+        return 'rapidfuzz' if self.use_rapidfuzz else 'numpy'
+
+    def ratio(self, a: Sequence, b: Sequence) -> float:
+        """Similarity in [0, 1]; 1.0 when both are empty"""
+        if self.mode == 'compat':
+            return SequenceMatcher(None, a, b).ratio()
+        total = len(a) + len(b)
+        if total == 0:
+            return 1.0
+        if self.use_rapidfuzz:
+            return _Indel.normalized_similarity(a, b)
+        return 2.0 * lcs_length(a, b) / total
+
+    def opcodes(self, a: Sequence, b: Sequence) -> List[Opcode]:
+        """How to turn a into b, as (tag, i1, i2, j1, j2) like difflib"""
+        if self.mode == 'compat':
+            return SequenceMatcher(None, a, b).get_opcodes()
+        if self.use_rapidfuzz:
+            return merge_gaps(_Indel.opcodes(a, b).as_list())
+        # Substitution at the cost of a delete + insert: the cheapest path maximizes matches
+        a_ids, b_ids = encode_pair(a, b)
+        matrix = edit_distance_matrix(a_ids, b_ids, substitution_cost=2)
+        return merge_gaps(backtrace(matrix, a_ids, b_ids, substitution_cost=2))
+
+    def distance(self, a: Sequence, b: Sequence) -> int:
+        """Levenshtein distance (unit costs)"""
+        if self.use_rapidfuzz and self.mode != 'compat':
+            return _Levenshtein.distance(a, b)
+        a_ids, b_ids = encode_pair(a, b)
+        return int(edit_distance_matrix(a_ids, b_ids)[-1, -1])
+
+    def align(self, a: Sequence, b: Sequence) -> Dict[str, Any]:
+        """Similarity, edit distance and opcodes of one pair"""
+        return {'similarity': self.ratio(a, b), 'distance': self.distance(a, b), 'opcodes': self.opcodes(a, b)}
+
+    def compare(self, expected: str, spoken: str, expected_phonemes=None, spoken_phonemes=None) -> Dict[str, Any]:
+        """
+        Character, word and (if phonemes are given) phoneme alignments of
+        two cleaned texts. Phoneme lists are one IPA string per word, as
+        services/phoneme_service.py returns them; symbols are compared
+        one code point at a time.
+        """
+        result = {
+            'sentence_similarity': self.ratio(expected, spoken),
+            'characters': self.align(expected.replace(" ", ""), spoken.replace(" ", "")),
+            'words': self.align(expected.split(), spoken.split())
+        }
+        if expected_phonemes is not None and spoken_phonemes is not None:
+            result['phonemes'] = self.align("".join(expected_phonemes), "".join(spoken_phonemes))
+        return result
+
+
+_scoring_engine = None
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """Process-wide scoring engine for Config.SCORING_MODE"""
+    global _scoring_engine
+    if _scoring_engine is None:
+        _scoring_engine = ScoringEngine()
+        print(f"[SCORING] mode={_scoring_engine.mode} backend={_scoring_engine.backend}")
+    return _scoring_engine
@@ -1,6 +1,7 @@
 # backend/services/selection_service.py
 import json
 import os
+import uuid
 from datetime import datetime
 from typing import Dict, List, Any
 from config import Config
@@ -11,7 +12,8 @@ class SelectionService:
     
     def create_selection_session(self, session_data: Dict[str, Any]) -> str:
         """Create a new selection session"""
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Suffix keeps sessions created in the same second by different users apart
+        session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
         self.selection_sessions[session_id] = {
             'id': session_id,
             'created_at': datetime.now().isoformat(),
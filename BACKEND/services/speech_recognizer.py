@@ -0,0 +1,118 @@
+# backend/services/speech_recognizer.py
+import threading
+import numpy as np
+import speech_recognition as sr
+
+
+class SpeechRecognizer:
+    """
+    Process-wide speech recognition:
+    - One configured sr.Recognizer shared by all requests
+    - Microphone availability probed once, on first use
+    - Microphone capture is serialized; transcription is thread-safe
+    """
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        self._configure_recognizer()
+        self._microphone_available = None
+        self._listen_lock = threading.Lock()
+
+    def _configure_recognizer(self):
+        """Configure speech recognition settings"""
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 1.5
+        self.recognizer.energy_threshold = 300
+
+    @property
+    def microphone_available(self):
+        """Check (once) if a microphone is available"""
+        if self._microphone_available is None:
+            try:
+                with sr.Microphone() as source:
+                    self._microphone_available = True
+            except:
+                print("Warning: Microphone not available. Speech recognition will be disabled.")
+                self._microphone_available = False
+        return self._microphone_available
+
+    def listen_once(self, calibrate_seconds=1.0):
+        """Listen to microphone and return audio"""
+        if not self.microphone_available:
+            raise RuntimeError("Microphone not available")
+
+        with self._listen_lock:
+            try:
+                with sr.Microphone() as source:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=calibrate_seconds)
+                    audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=10)
+                    return audio
+            except sr.WaitTimeoutError:
+                raise RuntimeError("No speech detected within timeout period")
+            except Exception as e:
+                raise RuntimeError(f"Microphone error: {e}")
+
+    def transcribe(self, audio):
+        """Convert speech to text using Wav2Vec2"""
+        from models.model_registry import get_asr_backend
+        try:
+            backend = get_asr_backend()
+        except Exception as e:
+            print(f"[ERROR] Failed to load Wav2Vec2: {e}")
+            backend = None
+
+        if backend is not None:
+            try:
+                processor = backend.processor
+                # Get raw data at 16kHz
+                raw_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
+                # Convert to numpy array (int16) -> float32
+                input_values = np.frombuffer(raw_data, dtype=np.int16).astype(np.float32)
+                # Normalize (16-bit PCM)
+                input_values = input_values / 32768.0
+
+                # Tokenize
+                input_values = processor(input_values, return_tensors="np", sampling_rate=16000).input_values
+
+                # Inference (shared model from the registry)
+                logits = backend.logits(input_values.astype(np.float32))
+
+                # Decode
+                predicted_ids = np.argmax(logits, axis=-1)
+                transcription = processor.batch_decode(predicted_ids)[0]
+
+                print(f"[TRANSCRIPTION-W2V2] '{transcription}'")
+                return transcription.lower()
+
+            except Exception as e:
+                print(f"[ERROR] Wav2Vec2 Inference error: {e}")
+                # Fallback to Google if inference fails
+                try:
+                    text = self.recognizer.recognize_google(audio)
+                    print(f"[TRANSCRIPTION-GOOGLE] '{text}'")
+                    return text.lower()
+                except Exception as e_google:
+                    raise RuntimeError(f"Speech recognition service error: {e} | {e_google}")
+        else:
+            # Fallback to Google if model failed to load
+            try:
+                text = self.recognizer.recognize_google(audio)
+                return text.lower()
+            except sr.UnknownValueError:
+                raise RuntimeError("Could not understand the audio")
+            except sr.RequestError as e:
+                raise RuntimeError(f"Speech recognition service error: {e}")
+
+
+_speech_recognizer = None
+_speech_recognizer_lock = threading.Lock()
+
+
+def get_speech_recognizer():
+    """Process-wide speech recognizer"""
+    global _speech_recognizer
+    if _speech_recognizer is None:
+        with _speech_recognizer_lock:
+            if _speech_recognizer is None:
+                _speech_recognizer = SpeechRecognizer()
+    return _speech_recognizer
@@ -1,84 +1,36 @@
 # backend/services/speech_service.py
-import pyttsx3
-import speech_recognition as sr
-from difflib import SequenceMatcher
 import time
 import re
 import PyPDF2
-import io
-import uuid
 from config import Config
-import torch
-import numpy as np
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
-
-# ==========================================
-# 0. GLOBAL MODEL LOADING (SINGLETON PATTERN)
-# ==========================================
-# Global model instance
-_wav2vec2_processor = None
-_wav2vec2_model = None
-
-def load_wav2vec2_model():
-    global _wav2vec2_processor, _wav2vec2_model
-    if _wav2vec2_model is None:
-        try:
-            print("[INIT] Loading Wav2Vec2 model...")
-            from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
-            _wav2vec2_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base-960h")
-            _wav2vec2_model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-base-960h")
-            print("[INIT] Wav2Vec2 model loaded successfully")
-        except Exception as e:
-            print(f"[ERROR] Failed to load Wav2Vec2: {e}")
+from services.text_aligner import get_text_aligner
+from services.tts_engine_pool import get_tts_pool
+from services.speech_recognizer import get_speech_recognizer
+from services.practice_session_store import get_practice_session_store
 
 class SpeechService:
+    """
+    Thin per-request facade over process-wide components:
+    - TextAligner for similarity and word-level feedback
+    - TTSEnginePool for speaking and synthesis
+    - SpeechRecognizer for microphone capture and transcription
+    Per-user progress lives in PracticeSessionStore under session_key,
+    so constructing a SpeechService costs next to nothing.
+    """
+
     # ==========================================
     # 1. INITIALIZATION & SETUP
     # ==========================================
-    def __init__(self):
-        # Initialize model if not already loaded
-        if _wav2vec2_model is None:
-            load_wav2vec2_model()
-            
-        self.engine = self._init_tts()
-        self.recognizer = sr.Recognizer()
-        self._configure_recognizer()
-        self.microphone_available = self._check_microphone()
-        self.current_sentence_index = 0
-        self.sentences = []
-        self.correct_count = 0
-        self.total_practiced = 0
-        self.is_reading = False
-        self.current_pdf = None
-        
-        # Use global instances
-        self.processor = _wav2vec2_processor
-        self.model = _wav2vec2_model
-    
-    def _init_tts(self):
-        """Initialize text-to-speech engine"""
-        try:
-            engine = pyttsx3.init()
-            engine.setProperty('rate', Config.SPEECH_RATE)
-            return engine
-        except Exception as e:
-            print(f"Warning: TTS initialization failed: {e}")
-            return None
-    
-    def _check_microphone(self):
-        """Check if microphone is available"""
-        try:
-            with sr.Microphone() as source:
-                return True
-        except:
-            print("Warning: Microphone not available. Speech recognition will be disabled.")
-            return False
-    
-    def _configure_recognizer(self):
-        """Configure speech recognition settings"""
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 1.5
-        self.recognizer.energy_threshold = 300
+    def __init__(self, session_key="default"):
+        self.aligner = get_text_aligner()
+        self.tts = get_tts_pool()
+        self.recognizer = get_speech_recognizer()
+        self.session_key = session_key
+        self.session = get_practice_session_store().get(session_key)
+
+    @property
+    def microphone_available(self):
+        return self.recognizer.microphone_available
 
     # ==========================================
     # 2. PDF TEXT EXTRACTION
@@ -135,34 +87,34 @@ class SpeechService:
     # ==========================================
     def start_practice_from_pdf(self, pdf_file):
         """Start a new practice session from PDF"""
-        self.sentences = self.extract_text_from_pdf(pdf_file)
-        self.current_sentence_index = 0
-        self.correct_count = 0
-        self.total_practiced = 0
+        self.session.sentences = self.extract_text_from_pdf(pdf_file)
+        self.session.current_sentence_index = 0
+        self.session.correct_count = 0
+        self.session.total_practiced = 0
         
-        print(f"[SESSION] Started practice session with {len(self.sentences)} sentences")
+        print(f"[SESSION] Started practice session with {len(self.session.sentences)} sentences")
         return {
             'success': True,
-            'total_sentences': len(self.sentences),
-            'sentences': self.sentences
+            'total_sentences': len(self.session.sentences),
+            'sentences': self.session.sentences
         }
 
     def get_current_sentence(self):
         """Get the current sentence for display"""
-        if not self.sentences or self.current_sentence_index >= len(self.sentences):
+        if not self.session.sentences or self.session.current_sentence_index >= len(self.session.sentences):
             return {
                 'available': False,
                 'session_complete': True,
                 'message': 'Practice session completed'
             }
             
-        current_sentence = self.sentences[self.current_sentence_index]
+        current_sentence = self.session.sentences[self.session.current_sentence_index]
         return {
             'available': True,
             'sentence': current_sentence['text'],
             'full_data': current_sentence,
-            'current_index': self.current_sentence_index + 1,
-            'total_sentences': len(self.sentences),
+            'current_index': self.session.current_sentence_index + 1,
+            'total_sentences': len(self.session.sentences),
             'session_complete': False
         }
 
@@ -172,21 +124,20 @@ class SpeechService:
     def speak_sentence(self, sentence: str = None):
         """Speak a specific sentence"""
         if sentence is None:
-            if not self.sentences or self.current_sentence_index >= len(self.sentences):
+            if not self.session.sentences or self.session.current_sentence_index >= len(self.session.sentences):
                 return {'error': 'No sentence available'}
-            sentence = self.sentences[self.current_sentence_index]['text']
+            sentence = self.session.sentences[self.session.current_sentence_index]['text']
         
-        self.is_reading = True
+        self.session.is_reading = True
         self.speak(sentence)
-        self.is_reading = False
+        self.session.is_reading = False
         
         return {'success': True, 'sentence': sentence}
 
     def stop_speaking(self):
         """Stop the current TTS reading"""
-        if self.engine and self.is_reading:
-            self.engine.stop()
-            self.is_reading = False
+        if self.session.is_reading and self.tts.stop(self.session_key):
+            self.session.is_reading = False
             return {'success': True, 'message': 'Reading stopped'}
         return {'success': False, 'message': 'No active reading'}
 
@@ -249,14 +200,14 @@ class SpeechService:
 
     def practice_current_sentence(self):
         """Practice the current sentence with immediate feedback"""
-        if not self.sentences or self.current_sentence_index >= len(self.sentences):
+        if not self.session.sentences or self.session.current_sentence_index >= len(self.session.sentences):
             return {
                 'success': False,
                 'error': 'No sentences available',
                 'session_complete': True
             }
 
-        current_sentence_data = self.sentences[self.current_sentence_index]
+        current_sentence_data = self.session.sentences[self.session.current_sentence_index]
         current_sentence = current_sentence_data['text']
         
         try:
@@ -264,21 +215,21 @@ class SpeechService:
             result = self.practice_sentence(current_sentence)
             
             if result.get('success'):
-                self.total_practiced += 1
+                self.session.total_practiced += 1
                 if result.get('is_correct'):
-                    self.correct_count += 1
-                    self.current_sentence_index += 1
+                    self.session.correct_count += 1
+                    self.session.current_sentence_index += 1
                     result['message'] = "[OK] Correct! Moving to next sentence."
-                    result['next_sentence_available'] = self.current_sentence_index < len(self.sentences)
+                    result['next_sentence_available'] = self.session.current_sentence_index < len(self.session.sentences)
                 else:
                     result['message'] = "[X] Try again! Listen carefully."
-                    result['next_sentence_available'] = self.current_sentence_index < len(self.sentences)
+                    result['next_sentence_available'] = self.session.current_sentence_index < len(self.session.sentences)
                 
                 # Add session stats
-                accuracy = (self.correct_count / self.total_practiced) * 100 if self.total_practiced > 0 else 0
+                accuracy = (self.session.correct_count / self.session.total_practiced) * 100 if self.session.total_practiced > 0 else 0
                 result['accuracy'] = round(accuracy, 1)
-                result['correct_count'] = self.correct_count
-                result['total_practiced'] = self.total_practiced
+                result['correct_count'] = self.session.correct_count
+                result['total_practiced'] = self.session.total_practiced
                 result['session_complete'] = False
                 
                 return result
@@ -322,9 +273,9 @@ class SpeechService:
         """Simulate practice session without microphone"""
         print(f"[SIM] Simulation mode: {reason}")
         
-        self.total_practiced += 1
-        self.correct_count += 1
-        accuracy = (self.correct_count / self.total_practiced) * 100
+        self.session.total_practiced += 1
+        self.session.correct_count += 1
+        accuracy = (self.session.correct_count / self.session.total_practiced) * 100
         
         result = {
             'success': True,
@@ -333,25 +284,25 @@ class SpeechService:
             'score': 85.0,
             'is_correct': True,
             'accuracy': round(accuracy, 1),
-            'correct_count': self.correct_count,
-            'total_practiced': self.total_practiced,
+            'correct_count': self.session.correct_count,
+            'total_practiced': self.session.total_practiced,
             'feedback': "Simulation mode - Good job!",
             'message': "[OK] Correct! Moving to next sentence.",
-            'next_sentence_available': self.current_sentence_index + 1 < len(self.sentences),
+            'next_sentence_available': self.session.current_sentence_index + 1 < len(self.session.sentences),
             'session_complete': False
         }
         
-        self.current_sentence_index += 1
+        self.session.current_sentence_index += 1
         return result
 
     def skip_to_next_sentence(self):
         """Skip to the next sentence"""
-        if self.current_sentence_index + 1 < len(self.sentences):
-            self.current_sentence_index += 1
+        if self.session.current_sentence_index + 1 < len(self.session.sentences):
+            self.session.current_sentence_index += 1
             return {
                 'success': True,
                 'message': 'Moved to next sentence',
-                'current_sentence': self.sentences[self.current_sentence_index]['text']
+                'current_sentence': self.session.sentences[self.session.current_sentence_index]['text']
             }
         else:
             return {
@@ -361,170 +312,44 @@ class SpeechService:
 
     def get_session_progress(self):
         """Get current session progress"""
-        accuracy = (self.correct_count / self.total_practiced) * 100 if self.total_practiced > 0 else 0
+        accuracy = (self.session.correct_count / self.session.total_practiced) * 100 if self.session.total_practiced > 0 else 0
         
         return {
-            'current_sentence_index': self.current_sentence_index + 1,
-            'total_sentences': len(self.sentences),
+            'current_sentence_index': self.session.current_sentence_index + 1,
+            'total_sentences': len(self.session.sentences),
             'accuracy': round(accuracy, 1),
-            'correct_count': self.correct_count,
-            'total_practiced': self.total_practiced,
-            'session_complete': self.current_sentence_index >= len(self.sentences)
+            'correct_count': self.session.correct_count,
+            'total_practiced': self.session.total_practiced,
+            'session_complete': self.session.current_sentence_index >= len(self.session.sentences)
         }
     
     # ==========================================
     # 7. LOW-LEVEL AUDIO IO
     # ==========================================
-    def speak(self, text):
+    def speak(self, text, rate=None):
         """Speak text using TTS"""
-        if self.engine is None:
-            print(f"TTS Simulation: {text}")
-            return
-            
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-            time.sleep(0.3)
-        except Exception as e:
-            print(f"TTS Error: {e}")
+        self.tts.speak(text, rate=rate, session_key=self.session_key)
 
-    def generate_tts_audio(self, text):
+    def generate_tts_audio(self, text, rate=None):
         """Generate TTS audio and return as bytes"""
-        if not text:
-            return None
-            
-        import tempfile
-        import os
-        
-        try:
-            temp_dir = tempfile.gettempdir()
-            filename = os.path.join(temp_dir, f"tts_{uuid.uuid4()}.wav")
-            
-            # Use a separate engine instance if possible to avoid state issues in multi-threaded env
-            # But pyttsx3 is often finicky with multiple instances.
-            self.engine.save_to_file(text, filename)
-            self.engine.runAndWait()
-            
-            with open(filename, 'rb') as f:
-                audio_data = f.read()
-                
-            # Cleanup
-            try: os.remove(filename)
-            except: pass
-            
-            return audio_data
-        except Exception as e:
-            print(f"[ERROR] TTS Generation failed: {e}")
-            return None
+        return self.tts.synthesize(text, rate=rate)
     
     def listen_once(self, calibrate_seconds=1.0):
         """Listen to microphone and return audio"""
-        if not self.microphone_available:
-            raise RuntimeError("Microphone not available")
-            
-        try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=calibrate_seconds)
-                audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=10)
-                return audio
-        except sr.WaitTimeoutError:
-            raise RuntimeError("No speech detected within timeout period")
-        except Exception as e:
-            raise RuntimeError(f"Microphone error: {e}")
+        return self.recognizer.listen_once(calibrate_seconds)
     
     def transcribe(self, audio):
         """Convert speech to text using Wav2Vec2"""
-        if self.model and self.processor:
-            try:
-                # Get raw data at 16kHz
-                raw_data = audio.get_raw_data(convert_rate=16000, convert_width=2)
-                # Convert to numpy array (int16) -> float32
-                input_values = np.frombuffer(raw_data, dtype=np.int16).astype(np.float32)
-                # Normalize (16-bit PCM)
-                input_values = input_values / 32768.0
-                
-                # Tokenize
-                input_values = self.processor(input_values, return_tensors="pt", sampling_rate=16000).input_values
-                
-                # Inference
-                with torch.no_grad():
-                    logits = self.model(input_values).logits
-                
-                # Decode
-                predicted_ids = torch.argmax(logits, dim=-1)
-                transcription = self.processor.batch_decode(predicted_ids)[0]
-                
-                print(f"[TRANSCRIPTION-W2V2] '{transcription}'")
-                return transcription.lower()
-                
-            except Exception as e:
-                print(f"[ERROR] Wav2Vec2 Inference error: {e}")
-                # Fallback to Google if inference fails
-                try:
-                    text = self.recognizer.recognize_google(audio)
-                    print(f"[TRANSCRIPTION-GOOGLE] '{text}'")
-                    return text.lower()
-                except Exception as e_google:
-                     raise RuntimeError(f"Speech recognition service error: {e} | {e_google}")
-        else:
-             # Fallback to Google if model failed to load
-             try:
-                text = self.recognizer.recognize_google(audio)
-                return text.lower()
-             except sr.UnknownValueError:
-                raise RuntimeError("Could not understand the audio")
-             except sr.RequestError as e:
-                raise RuntimeError(f"Speech recognition service error: {e}")
+        return self.recognizer.transcribe(audio)
     
     def calculate_similarity(self, original, spoken):
         """Calculate similarity between original and spoken text"""
-        if not original or not spoken:
-            return 0.0
-            
-        original_clean = self._clean_text(original)
-        spoken_clean = self._clean_text(spoken)
-        
-        return SequenceMatcher(None, original_clean, spoken_clean).ratio()
+        return self.aligner.calculate_similarity(original, spoken)
 
     def _clean_text(self, text):
         """Remove punctuation and lowercase text for comparison"""
-        return re.sub(r'[^\w\s]', '', text.lower()).strip()
+        return self.aligner.clean_text(text)
 
     def _get_word_level_feedback(self, original, spoken):
         """Generate word-by-word feedback with robust alignment"""
-        if not original:
-            return []
-            
-        from difflib import SequenceMatcher
-        
-        orig_words = original.split()
-        spoken_words = spoken.lower().split() if spoken else []
-        
-        clean_orig = [self._clean_text(w) for w in orig_words]
-        clean_spoken = [self._clean_text(w) for w in spoken_words]
-        
-        matcher = SequenceMatcher(None, clean_orig, clean_spoken)
-        feedback = []
-        
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                for i in range(i1, i2):
-                    feedback.append({'word': orig_words[i], 'status': 'correct'})
-            elif tag == 'replace':
-                for i in range(i1, i2):
-                    # Check for mispronunciation
-                    spoken_idx = j1 + (i - i1)
-                    if spoken_idx < j2:
-                        sim = SequenceMatcher(None, clean_orig[i], clean_spoken[spoken_idx]).ratio()
-                        if sim > 0.6:
-                            feedback.append({'word': orig_words[i], 'status': 'mispronounced'})
-                        else:
-                            feedback.append({'word': orig_words[i], 'status': 'missed'})
-                    else:
-                        feedback.append({'word': orig_words[i], 'status': 'missed'})
-            elif tag == 'delete':
-                for i in range(i1, i2):
-                    feedback.append({'word': orig_words[i], 'status': 'missed'})
-            # 'insert' (extra spoken words) - we ignore for feedback on original text
-            
-        return feedback
\ No newline at end of file
+        return self.aligner.word_level_feedback(original, spoken)
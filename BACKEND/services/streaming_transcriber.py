@@ -0,0 +1,168 @@
+# backend/services/streaming_transcriber.py
+import time
+from typing import Any, Dict, List
+import numpy as np
+from config import Config
+from services.audio_ingest import batch_input_values
+from services.text_aligner import get_text_aligner
+
+SAMPLE_RATE = 16000
+PCM_FORMATS = ('pcm_s16le', 'f32le')
+
+
+class StreamTooLong(Exception):
+    """The stream exceeded Config.STREAMING_MAX_SECONDS"""
+
+
+class StreamingTranscriber:
+    """
+    Incremental wav2vec2 transcription of a 16kHz PCM stream:
+    - Every step_seconds of new audio, the backend runs over a window that
+      starts context_seconds before the last committed frame
+    - Frame-level CTC logits are merged, not strings: frames older than
+      lookahead_seconds are committed, newer ones stay provisional and are
+      recomputed with more right context on the next pass
+    - finish() only has to process the uncommitted tail, so the final
+      transcript is ready right after the reader stops
+    - With an Endpointer (services/vad.py), `endpointed` turns True once
+      the reader has gone quiet after speaking
+    - With an inference_engine (the model's BatchedInferenceEngine over
+      batch_logits), windows share forward passes with other streams and
+      uploads instead of calling the backend one by one
+    - Committed logit frames are kept, so with a decoder (CTCDecoder) the
+      final transcript is decoded in its mode (beam / reference, with
+      language_model) like an uploaded recording; partials stay greedy
+    One instance per stream; the ASR backend is shared.
+    """
+
+    def __init__(self, backend, context_seconds=None, step_seconds=None,
+                 lookahead_seconds=None, max_seconds=None, endpointer=None,
+                 inference_engine=None, decoder=None, language_model=None):
+        self.backend = backend
+        self.inference_engine = inference_engine
+        self.decoder = decoder
+        self.language_model = language_model
+        self.endpointer = endpointer
+        self.endpointed = False
+        self.processor = backend.processor
+        # Samples per logit frame (320 for wav2vec2-base)
+        self.frame_stride = int(np.prod(backend.config.conv_stride))
+
+        def frames(seconds):
+            return int(round(seconds * SAMPLE_RATE / self.frame_stride))
+
+        self.context_frames = frames(Config.STREAMING_CONTEXT_SECONDS if context_seconds is None else context_seconds)
+        self.lookahead_frames = frames(Config.STREAMING_LOOKAHEAD_SECONDS if lookahead_seconds is None else lookahead_seconds)
+        self.step_samples = max(self.frame_stride, int((Config.STREAMING_STEP_SECONDS if step_seconds is None else step_seconds) * SAMPLE_RATE))
+        max_seconds = Config.STREAMING_MAX_SECONDS if max_seconds is None else max_seconds
+
+        self._audio = np.empty(int(max_seconds * SAMPLE_RATE), dtype=np.float32)
+        self._length = 0
+        self._decoded_length = 0
+        self._committed: List[np.ndarray] = []
+        self._committed_frames = 0
+        self._tail = np.empty((0, 0), dtype=np.float32)
+        self.passes = 0
+        self.inference_ms = 0.0
+
+    @property
+    def audio_seconds(self) -> float:
+        return self._length / SAMPLE_RATE
+
+    def add_pcm(self, data: bytes, pcm_format: str = 'pcm_s16le') -> bool:
+        """Append a raw mono 16kHz chunk; True if a decoding pass ran"""
+        if pcm_format == 'pcm_s16le':
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+        elif pcm_format == 'f32le':
+            samples = np.frombuffer(data, dtype='<f4')
+        else:
+            raise ValueError(f"Unknown PCM format: {pcm_format}")
+        return self.add_audio(samples)
+
+    def add_audio(self, samples: np.ndarray) -> bool:
+        end = self._length + len(samples)
+        if end > len(self._audio):
+            raise StreamTooLong(f"Stream longer than {len(self._audio) / SAMPLE_RATE:.0f}s")
+        self._audio[self._length:end] = samples
+        self._length = end
+        if self.endpointer is not None and not self.endpointed:
+            self.endpointed = self.endpointer.update(samples)
+
+        if self._length - self._decoded_length < self.step_samples:
+            return False
+        self._decode()
+        return True
+
+    def finish(self) -> str:
+        """Decode the remaining audio and return the final transcript"""
+        if self._length > self._decoded_length or len(self._tail):
+            self._decode(final=True)
+        logits = self.logits
+        if self.decoder is None or len(logits) == 0:
+            return self.text
+        return self.decoder.decode(logits, self.language_model).lower().strip()
+
+    @property
+    def logits(self) -> np.ndarray:
+        """Committed plus provisional logit frames so far (frames x vocabulary)"""
+        parts = [part for part in self._committed + [self._tail] if len(part)]
+        return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+
+    @property
+    def text(self) -> str:
+        """Committed plus provisional transcript so far"""
+        logits = self.logits
+        if len(logits) == 0:
+            return ""
+        ids = np.argmax(logits, axis=-1)
+        # decode() collapses repeats and blanks across window boundaries too
+        return self.processor.decode(ids).lower().strip()
+
+    def _decode(self, final=False):
+        # Window: left context + everything not committed yet
+        first_frame = max(0, self._committed_frames - self.context_frames)
+        window = self._audio[first_frame * self.frame_stride:self._length]
+        if len(window) < self.frame_stride * 2:
+            return
+
+        start = time.perf_counter()
+        logits = self._window_logits(window)
+        n_frames = len(logits)
+        self.inference_ms += (time.perf_counter() - start) * 1000
+        self.passes += 1
+
+        offset = self._committed_frames - first_frame
+        commit_end = n_frames if final else max(offset, n_frames - self.lookahead_frames)
+        if commit_end > offset:
+            self._committed.append(logits[offset:commit_end])
+            self._committed_frames += commit_end - offset
+        self._tail = logits[commit_end:]
+        self._decoded_length = self._length
+
+    def _window_logits(self, window: np.ndarray) -> np.ndarray:
+        """Logits of one window (frames x vocabulary)"""
+        if self.inference_engine is not None:
+            return self.inference_engine.infer(window)
+        # Each window is normalized on its own, as the feature extractor would
+        input_values, _ = batch_input_values([window], do_normalize=self.processor.feature_extractor.do_normalize)
+        logits = self.backend.logits(input_values)[0]
+        return logits[:int(self.backend.output_lengths([len(window)])[0])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'audio_seconds': round(self.audio_seconds, 2),
+            'passes': self.passes,
+            'inference_ms': round(self.inference_ms, 1)
+        }
+
+
+def partial_word_status(expected_text: str, spoken_text: str) -> List[Dict[str, str]]:
+    """
+    Word feedback for a transcript still in progress: expected words after
+    the last one reached are 'pending' rather than 'missed'.
+    """
+    feedback = get_text_aligner().word_level_feedback(expected_text, spoken_text)
+    reached = max((i for i, w in enumerate(feedback) if w['status'] != 'missed'), default=-1)
+    for word in feedback[reached + 1:]:
+        word['status'] = 'pending'
+    return feedback
@@ -0,0 +1,46 @@
+# backend/services/text_aligner.py
+import re
+from services.scoring_engine import get_scoring_engine
+from services.word_scorer import get_word_scorer, word_feedback
+
+
+class TextAligner:
+    """
+    Stateless text comparison used by practice feedback:
+    - Sentence similarity between expected and spoken text
+    - Word-by-word alignment into correct / mispronounced / missed
+    Sequence comparison goes through services/scoring_engine.py
+    (Config.SCORING_MODE), word alignment through services/word_scorer.py.
+    Holds no per-request state, so one instance is shared by all threads.
+    """
+
+    def clean_text(self, text):
+        """Remove punctuation and lowercase text for comparison"""
+        return re.sub(r'[^\w\s]', '', text.lower()).strip()
+
+    def calculate_similarity(self, original, spoken):
+        """Calculate similarity between original and spoken text"""
+        if not original or not spoken:
+            return 0.0
+
+        original_clean = self.clean_text(original)
+        spoken_clean = self.clean_text(spoken)
+
+        return get_scoring_engine().ratio(original_clean, spoken_clean)
+
+    def word_level_feedback(self, original, spoken):
+        """Word-by-word feedback: in-order alignment from services/word_scorer.py"""
+        if not original:
+            return []
+        return word_feedback(get_word_scorer().score(original, spoken))
+
+
+_text_aligner = None
+
+
+def get_text_aligner():
+    """Process-wide text aligner"""
+    global _text_aligner
+    if _text_aligner is None:
+        _text_aligner = TextAligner()
+    return _text_aligner
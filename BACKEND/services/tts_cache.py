@@ -0,0 +1,231 @@
+# backend/services/tts_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from services.tts_engine_pool import get_tts_pool
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized speech:
+    - Key is the SHA-256 of (text, voice, rate, engine)
+    - Memory tier: LRU bounded by total bytes
+    - Disk tier: one WAV per key, LRU by mtime, bounded by total bytes
+    - Prefetch synthesizes upcoming sentences on a background thread
+    """
+
+    ENGINE = "pyttsx3"
+
+    def __init__(self, folder, memory_bytes=32 * 1024 * 1024, disk_bytes=512 * 1024 * 1024,
+                 prefetch_workers=1, default_rate=100):
+        self.folder = folder
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.default_rate = default_rate
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_index = None  # OrderedDict key -> size, built lazily from the folder
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+        self._prefetcher = ThreadPoolExecutor(max_workers=max(1, prefetch_workers),
+                                              thread_name_prefix="tts-prefetch")
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- KEYS ----------
+    def make_key(self, text, voice=None, rate=None):
+        """Content address of one synthesis request"""
+        parts = [text.strip(), voice or "", str(int(rate or self.default_rate)), self.ENGINE]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.folder, f"{key}.wav")
+
+    # ---------- LOOKUP ----------
+    def get(self, key):
+        """Cached WAV bytes for key, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            index = self._load_disk_index()
+            if key in index:
+                index.move_to_end(key)
+            self._memory_put(key, data)
+        return data
+
+    def get_path(self, key):
+        """Disk path of a cached entry, or None"""
+        path = self._disk_path(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key, data):
+        """Store WAV bytes in both tiers"""
+        if not data:
+            return
+        with self._lock:
+            self._memory_put(key, data)
+
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmp_path = f"{self._disk_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            print(f"[WARN] TTS cache write failed: {e}")
+            return
+
+        with self._lock:
+            index = self._load_disk_index()
+            if key in index:
+                self._disk_size -= index.pop(key)
+            index[key] = len(data)
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def get_or_synthesize(self, text, voice=None, rate=None):
+        """Return (key, wav_bytes), synthesizing and caching on a miss"""
+        key = self.make_key(text, voice, rate)
+        data = self.get(key)
+        if data is not None:
+            return key, data
+
+        # A prefetch for the same sentence may already be running
+        with self._in_flight_lock:
+            pending = self._in_flight.get(key)
+        if pending is not None:
+            pending.result()
+            data = self.get(key)
+            if data is not None:
+                return key, data
+
+        self.misses += 1
+        data = get_tts_pool().synthesize(text, rate=rate or self.default_rate, voice=voice)
+        self.put(key, data)
+        return key, data
+
+    # ---------- PREFETCH ----------
+    def prefetch(self, texts, voice=None, rate=None):
+        """Synthesize texts in the background; returns the keys that were queued"""
+        queued = []
+        for text in texts:
+            if not text or not text.strip():
+                continue
+            key = self.make_key(text, voice, rate)
+            if key in self._memory or os.path.exists(self._disk_path(key)):
+                continue
+            with self._in_flight_lock:
+                if key in self._in_flight:
+                    continue
+                future = self._prefetcher.submit(self._prefetch_one, key, text, voice, rate)
+                self._in_flight[key] = future
+            queued.append(key)
+        return queued
+
+    def _prefetch_one(self, key, text, voice, rate):
+        try:
+            if self.get(key) is None:
+                data = get_tts_pool().synthesize(text, rate=rate or self.default_rate, voice=voice)
+                self.put(key, data)
+        except Exception as e:
+            print(f"[WARN] TTS prefetch failed: {e}")
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(key, None)
+
+    def get_stats(self):
+        with self._lock:
+            self._load_disk_index()
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_size,
+                'memory_limit_bytes': self.memory_bytes,
+                'disk_entries': len(self._disk_index),
+                'disk_bytes': self._disk_size,
+                'disk_limit_bytes': self.disk_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'prefetch_in_flight': len(self._in_flight)
+            }
+
+    # ---------- EVICTION (caller holds self._lock) ----------
+    def _memory_put(self, key, data):
+        if len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _load_disk_index(self):
+        if self._disk_index is None:
+            entries = []
+            if os.path.isdir(self.folder):
+                for name in os.listdir(self.folder):
+                    if not name.endswith('.wav'):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(self.folder, name))
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+            entries.sort()
+            self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+            self._disk_size = sum(size for _, _, size in entries)
+        return self._disk_index
+
+    def _evict_disk(self):
+        while self._disk_size > self.disk_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+
+_tts_cache = None
+
+
+def get_tts_cache():
+    """Process-wide TTS cache configured from Config"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache(
+            folder=Config.TTS_CACHE_FOLDER,
+            memory_bytes=Config.TTS_CACHE_MEMORY_BYTES,
+            disk_bytes=Config.TTS_CACHE_DISK_BYTES,
+            prefetch_workers=Config.TTS_PREFETCH_WORKERS,
+            default_rate=Config.SPEECH_RATE
+        )
+    return _tts_cache
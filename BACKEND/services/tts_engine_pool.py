@@ -0,0 +1,154 @@
+# backend/services/tts_engine_pool.py
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from config import Config
+
+
+class TTSBusy(Exception):
+    """Every pooled engine stayed busy for the whole wait (routes answer 503)"""
+
+
+class TTSEnginePool:
+    """
+    Process-wide pool of pyttsx3 engines:
+    - Engines are created lazily, at most `size` of them, and reused
+    - A pyttsx3 engine is not thread-safe, so each one is lent to a single
+      caller at a time; other callers wait for a free engine
+    - An engine that failed to initialise is pooled as None and callers
+      fall back to simulation, as before
+    - Engines are lent under the caller's session key, so stop() only
+      silences that caller's speech
+    """
+
+    def __init__(self, size=1, rate=100):
+        self.size = max(1, int(size))
+        self.rate = rate
+        self._idle = queue.Queue()
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._active = {}
+        self._active_lock = threading.Lock()
+        self._default_voice = None
+
+    def _create_engine(self):
+        try:
+            import pyttsx3
+            # pyttsx3.init() hands back one cached engine per driver, so pooled
+            # engines are constructed directly
+            engine = pyttsx3.Engine() if self.size > 1 else pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            if self._default_voice is None:
+                self._default_voice = engine.getProperty('voice')
+            return engine
+        except Exception as e:
+            print(f"Warning: TTS initialization failed: {e}")
+            return None
+
+    @contextmanager
+    def engine(self, timeout=60, session_key=None):
+        """Borrow an engine for the duration of the with-block; TTSBusy after timeout seconds"""
+        try:
+            engine = self._idle.get_nowait()
+        except queue.Empty:
+            engine = None
+            create = False
+            with self._create_lock:
+                if self._created < self.size:
+                    self._created += 1
+                    create = True
+            if create:
+                engine = self._create_engine()
+            else:
+                try:
+                    engine = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TTSBusy(f"All {self.size} TTS engine(s) busy for {timeout}s") from None
+
+        if engine is not None:
+            with self._active_lock:
+                self._active.setdefault(session_key, set()).add(engine)
+        try:
+            yield engine
+        finally:
+            if engine is not None:
+                with self._active_lock:
+                    engines = self._active.get(session_key, set())
+                    engines.discard(engine)
+                    if not engines:
+                        self._active.pop(session_key, None)
+            self._idle.put(engine)
+
+    def speak(self, text, rate=None, voice=None, session_key=None):
+        """Speak text using TTS; session_key lets stop() find this utterance"""
+        with self.engine(session_key=session_key) as engine:
+            if engine is None:
+                print(f"TTS Simulation: {text}")
+                return
+
+            try:
+                self._configure(engine, rate, voice)
+                engine.say(text)
+                engine.runAndWait()
+                time.sleep(0.3)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+
+    def synthesize(self, text, rate=None, voice=None):
+        """Generate TTS audio and return it as WAV bytes"""
+        if not text:
+            return None
+
+        filename = os.path.join(tempfile.gettempdir(), f"tts_{uuid.uuid4()}.wav")
+        with self.engine() as engine:
+            if engine is None:
+                return None
+
+            try:
+                self._configure(engine, rate, voice)
+                engine.save_to_file(text, filename)
+                engine.runAndWait()
+
+                with open(filename, 'rb') as f:
+                    return f.read()
+            except Exception as e:
+                print(f"[ERROR] TTS Generation failed: {e}")
+                return None
+            finally:
+                try: os.remove(filename)
+                except: pass
+
+    def _configure(self, engine, rate, voice):
+        engine.setProperty('rate', rate or self.rate)
+        if voice:
+            engine.setProperty('voice', voice)
+        elif self._default_voice is not None:
+            engine.setProperty('voice', self._default_voice)
+
+    def stop(self, session_key=None):
+        """Stop the engines currently speaking for session_key"""
+        with self._active_lock:
+            engines = list(self._active.get(session_key, ()))
+        stopped = False
+        for engine in engines:
+            try:
+                engine.stop()
+                stopped = True
+            except Exception as e:
+                print(f"TTS Error: {e}")
+        return stopped
+
+
+_tts_pool = None
+
+
+def get_tts_pool():
+    """Process-wide TTS engine pool configured from Config"""
+    global _tts_pool
+    if _tts_pool is None:
+        _tts_pool = TTSEnginePool(size=Config.TTS_POOL_SIZE, rate=Config.SPEECH_RATE)
+    return _tts_pool
@@ -0,0 +1,193 @@
+# backend/services/vad.py
+from typing import List, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from config import Config
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+FEATURE_BLOCK_FRAMES = 256
+NOISE_FLOOR_PERCENTILE = 10
+
+
+class VoiceActivityDetector:
+    """
+    Energy + spectral voice activity detection, vectorized over frames:
+    - A frame is speech when its energy is margin_db above the clip's noise
+      floor (a low percentile of frame energies) and above an absolute floor;
+      the floor is only measured when the clip has real silence (see
+      has_silence), so continuous or quiet speech is not cut against itself
+    - Spectral flatness separates voiced speech from broadband noise; frames
+      far above the floor pass regardless, so loud fricatives are kept
+    - Runs shorter than min_speech_seconds are dropped (clicks, bumps) and
+      hangover_seconds bridges the dips between syllables
+    Stateless, so one instance is shared by all requests.
+    """
+
+    def __init__(self, sample_rate=16000, margin_db=None, max_flatness=None,
+                 min_speech_seconds=None, hangover_seconds=None, absolute_floor_db=-55.0):
+        self.sample_rate = sample_rate
+        self.frame_length = int(FRAME_SECONDS * sample_rate)
+        self.hop_length = int(HOP_SECONDS * sample_rate)
+        self.margin_db = Config.VAD_ENERGY_MARGIN_DB if margin_db is None else margin_db
+        self.max_flatness = Config.VAD_MAX_FLATNESS if max_flatness is None else max_flatness
+        self.min_speech_frames = self._frames(Config.VAD_MIN_SPEECH_SECONDS if min_speech_seconds is None else min_speech_seconds)
+        self.hangover_frames = self._frames(Config.VAD_HANGOVER_SECONDS if hangover_seconds is None else hangover_seconds)
+        self.absolute_floor_db = absolute_floor_db
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+
+    def _frames(self, seconds) -> int:
+        return max(1, int(round(seconds * self.sample_rate / self.hop_length)))
+
+    # ---------- FEATURES ----------
+    def frame_count(self, n_samples: int) -> int:
+        if n_samples < self.frame_length:
+            return 0
+        return 1 + (n_samples - self.frame_length) // self.hop_length
+
+    def frame_features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(energy in dBFS, spectral flatness in [0, 1]) of every full frame"""
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.frame_count(len(audio)) == 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+        frames = sliding_window_view(audio, self.frame_length)[::self.hop_length]
+        energy_db = np.empty(len(frames), dtype=np.float32)
+        flatness = np.empty(len(frames), dtype=np.float32)
+
+        # Blocks of frames keep the spectra small for long recordings
+        for start in range(0, len(frames), FEATURE_BLOCK_FRAMES):
+            block = frames[start:start + FEATURE_BLOCK_FRAMES]
+            end = start + len(block)
+            energy_db[start:end] = 10 * np.log10(np.einsum('ij,ij->i', block, block) / self.frame_length + 1e-10)
+
+            power = np.abs(np.fft.rfft(block * self._window, axis=1)) ** 2 + 1e-10
+            flatness[start:end] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    # ---------- DECISION ----------
+    def has_silence(self, energy_db: np.ndarray, flatness: np.ndarray) -> bool:
+        """
+        Whether the quietest frames are background rather than soft speech:
+        at least 2 * margin_db below the loud frames and not voiced. Only
+        then is a low percentile of the clip a noise floor.
+        """
+        floor = np.percentile(energy_db, NOISE_FLOOR_PERCENTILE)
+        if np.percentile(energy_db, 95) - floor < 2 * self.margin_db:
+            return False
+        quietest = energy_db <= floor
+        return bool(np.median(flatness[quietest]) >= self.max_flatness / 2)
+
+    def speech_mask(self, energy_db: np.ndarray, flatness: np.ndarray) -> np.ndarray:
+        """Per-frame speech decision, smoothed"""
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+
+        if self.has_silence(energy_db, flatness):
+            threshold = max(np.percentile(energy_db, NOISE_FLOOR_PERCENTILE) + self.margin_db, self.absolute_floor_db)
+            loud = energy_db > threshold
+            mask = loud & ((flatness < self.max_flatness) | (energy_db > threshold + self.margin_db))
+        else:
+            # No pause to measure the noise against: every frame may be speech,
+            # so only the absolute floor and the spectral shape decide
+            mask = (energy_db > self.absolute_floor_db) & (flatness < self.max_flatness)
+
+        # Drop short bursts, then bridge short dips
+        starts, ends = _runs(mask)
+        for start, end in zip(starts, ends):
+            if end - start < self.min_speech_frames:
+                mask[start:end] = False
+        if self.hangover_frames > 1:
+            mask = np.convolve(mask, np.ones(self.hangover_frames, dtype=int))[:len(mask)] > 0
+        return mask
+
+    def segments(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Speech segments as (start, end) sample indices"""
+        mask = self.speech_mask(*self.frame_features(audio))
+        starts, ends = _runs(mask)
+        return [
+            (int(s) * self.hop_length, min(len(audio), (int(e) - 1) * self.hop_length + self.frame_length))
+            for s, e in zip(starts, ends)
+        ]
+
+    def remove_silence(self, audio: np.ndarray, max_pause_seconds=None, padding_seconds=None) -> np.ndarray:
+        """
+        Keep speech segments with padding_seconds of margin on each side.
+        Pauses up to max_pause_seconds are kept whole; longer ones (and
+        leading/trailing silence) shrink to the padding. Returns an empty
+        array when no speech is found.
+        """
+        max_pause = int((Config.VAD_MAX_PAUSE_SECONDS if max_pause_seconds is None else max_pause_seconds) * self.sample_rate)
+        padding = int((Config.VAD_PADDING_SECONDS if padding_seconds is None else padding_seconds) * self.sample_rate)
+
+        kept: List[List[int]] = []
+        for start, end in self.segments(audio):
+            start, end = max(0, start - padding), min(len(audio), end + padding)
+            if kept and start - kept[-1][1] <= max_pause:
+                kept[-1][1] = max(kept[-1][1], end)
+            else:
+                kept.append([start, end])
+
+        if not kept:
+            return audio[:0]
+        if len(kept) == 1:
+            return audio[kept[0][0]:kept[0][1]]
+        return np.concatenate([audio[start:end] for start, end in kept])
+
+
+class Endpointer:
+    """
+    Streaming end-of-utterance detection: reports the endpoint once speech
+    has started and been followed by silence_seconds of non-speech. The
+    whole history is re-scored on each update, so the noise floor keeps
+    improving as the stream goes on. One instance per stream.
+    """
+
+    def __init__(self, vad: VoiceActivityDetector, silence_seconds=None):
+        self.vad = vad
+        self.silence_frames = vad._frames(Config.VAD_ENDPOINT_SILENCE_SECONDS if silence_seconds is None else silence_seconds)
+        self._pending = np.empty(0, dtype=np.float32)
+        self._energy: List[np.ndarray] = []
+        self._flatness: List[np.ndarray] = []
+        self.speech_started = False
+        self.trailing_silence_frames = 0
+
+    def update(self, samples: np.ndarray) -> bool:
+        """Add audio; True once the speaker has finished"""
+        buffer = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        n_frames = self.vad.frame_count(len(buffer))
+        if n_frames:
+            used = (n_frames - 1) * self.vad.hop_length + self.vad.frame_length
+            energy, flatness = self.vad.frame_features(buffer[:used])
+            self._energy.append(energy)
+            self._flatness.append(flatness)
+        self._pending = buffer[n_frames * self.vad.hop_length:]
+        if not self._energy:
+            return False
+
+        mask = self.vad.speech_mask(np.concatenate(self._energy), np.concatenate(self._flatness))
+        speech = np.flatnonzero(mask)
+        self.speech_started = len(speech) > 0
+        self.trailing_silence_frames = len(mask) - 1 - speech[-1] if self.speech_started else 0
+        return self.speech_started and self.trailing_silence_frames >= self.silence_frames
+
+    @property
+    def trailing_silence_seconds(self) -> float:
+        return self.trailing_silence_frames * self.vad.hop_length / self.vad.sample_rate
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of the True runs in mask"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+_vad = None
+
+
+def get_vad() -> VoiceActivityDetector:
+    """Process-wide 16kHz voice activity detector"""
+    global _vad
+    if _vad is None:
+        _vad = VoiceActivityDetector()
+    return _vad
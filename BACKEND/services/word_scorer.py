@@ -0,0 +1,249 @@
+# backend/services/word_scorer.py
+"""
+In-order word scoring of a transcript against the expected text.
+
+    spoken tokens --> hash index of token positions
+        --> exact anchors: Hunt-Szymanski LCS over the index, with
+            patience-diff splitting where repeated words make it dense
+        --> words between two anchors: near matches within a small window
+
+Anchoring costs hash lookups and binary searches, so scoring stays close
+to linear in the text length instead of comparing every expected word
+with every spoken word. The per-word results are the word feedback as
+well as the word accuracy, so one alignment serves both.
+"""
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from services.scoring_engine import get_scoring_engine
+
+# Near match: similarity above this (or a substring, see below)
+MISPRONOUNCED_SIMILARITY = 0.6
+# Shortest word that counts as a near match by being a substring ("run" / "running")
+MIN_SUBSTRING_LENGTH = 3
+# Spoken words skipped at most when looking for an expected word's near match
+GAP_LOOKAHEAD = 2
+# Matching token pairs per word above which a range is split before Hunt-Szymanski
+DENSE_GAP_FACTOR = 8
+
+CREDIT = {'correct': 1.0, 'mispronounced': 0.5, 'missed': 0.0}
+
+
+def clean_word(word: str) -> str:
+    """Lowercase, without punctuation (same cleaning as TextAligner.clean_text)"""
+    return re.sub(r'[^\w\s]', '', word.lower()).strip()
+
+
+def anchor_matches(expected: Sequence[str], spoken: Sequence[str]) -> List[Optional[int]]:
+    """
+    For each expected token, the index of the spoken token it is matched to
+    exactly, or None. Matches are in order and use each spoken token once.
+
+    After stripping the common prefix/suffix, a range whose tokens form few
+    matching pairs is aligned exactly (Hunt-Szymanski longest common
+    subsequence). Dense ranges, where repeated words would make that n*m,
+    are split like patience diff at tokens occurring once on each side and
+    the pieces aligned the same way; dense ranges without such tokens go to
+    the scoring engine's word opcodes.
+    """
+    matches: List[Optional[int]] = [None] * len(expected)
+    stack = [(0, len(expected), 0, len(spoken))]
+    while stack:
+        i0, i1, j0, j1 = stack.pop()
+        # Common prefix and suffix
+        while i0 < i1 and j0 < j1 and expected[i0] == spoken[j0]:
+            matches[i0] = j0
+            i0, j0 = i0 + 1, j0 + 1
+        while i0 < i1 and j0 < j1 and expected[i1 - 1] == spoken[j1 - 1]:
+            i1, j1 = i1 - 1, j1 - 1
+            matches[i1] = j1
+        if i0 == i1 or j0 == j1:
+            continue
+
+        positions: Dict[str, List[int]] = {}
+        for j in range(j0, j1):
+            positions.setdefault(spoken[j], []).append(j)
+        candidates = sum(len(positions.get(expected[i], ())) for i in range(i0, i1))
+        if candidates <= DENSE_GAP_FACTOR * (i1 - i0 + j1 - j0):
+            for i, j in _lcs_pairs(expected, i0, i1, positions):
+                matches[i] = j
+            continue
+
+        anchors = _unique_anchors(expected, i0, i1, positions)
+        if not anchors:
+            for i, j in _engine_pairs(expected, spoken, i0, i1, j0, j1):
+                matches[i] = j
+            continue
+        for i, j in anchors:
+            matches[i] = j
+        bounds = [(i0 - 1, j0 - 1)] + anchors + [(i1, j1)]
+        for (a_i, a_j), (b_i, b_j) in zip(bounds, bounds[1:]):
+            if b_i - a_i > 1 and b_j - a_j > 1:
+                stack.append((a_i + 1, b_i, a_j + 1, b_j))
+    return matches
+
+
+def _lcs_pairs(expected, i0, i1, positions) -> List[Tuple[int, int]]:
+    """Longest common subsequence as (i, j) pairs (Hunt-Szymanski over the spoken index)"""
+    # thresholds[k]: smallest spoken index ending a common subsequence of length k+1
+    thresholds: List[int] = []
+    links: List[Any] = []
+    for i in range(i0, i1):
+        # Descending, so one expected token extends each chain at most once
+        for j in reversed(positions.get(expected[i], ())):
+            k = bisect_left(thresholds, j)
+            if k == len(thresholds):
+                thresholds.append(j)
+                links.append((i, j, links[k - 1] if k else None))
+            elif j < thresholds[k]:
+                thresholds[k] = j
+                links[k] = (i, j, links[k - 1] if k else None)
+    return _chain(links)
+
+
+def _unique_anchors(expected, i0, i1, positions) -> List[Tuple[int, int]]:
+    """Longest in-order chain of tokens occurring exactly once on each side"""
+    counts: Dict[str, int] = {}
+    for i in range(i0, i1):
+        counts[expected[i]] = counts.get(expected[i], 0) + 1
+    pairs = [
+        (i, positions[expected[i]][0]) for i in range(i0, i1)
+        if counts[expected[i]] == 1 and len(positions.get(expected[i], ())) == 1
+    ]
+
+    # Longest increasing run of spoken positions (patience sorting)
+    tails: List[int] = []
+    links: List[Any] = []
+    for i, j in pairs:
+        k = bisect_left(tails, j)
+        node = (i, j, links[k - 1] if k else None)
+        if k == len(tails):
+            tails.append(j)
+            links.append(node)
+        else:
+            tails[k] = j
+            links[k] = node
+    return _chain(links)
+
+
+def _engine_pairs(expected, spoken, i0, i1, j0, j1) -> List[Tuple[int, int]]:
+    """Matched (i, j) pairs from the scoring engine's word opcodes"""
+    opcodes = get_scoring_engine().opcodes(list(expected[i0:i1]), list(spoken[j0:j1]))
+    return [
+        (i0 + a + k, j0 + b + k)
+        for tag, a, a_end, b, _ in opcodes if tag == 'equal'
+        for k in range(a_end - a)
+    ]
+
+
+def _chain(links) -> List[Tuple[int, int]]:
+    """(i, j) pairs of the longest chain, in order"""
+    pairs: List[Tuple[int, int]] = []
+    node = links[-1] if links else None
+    while node is not None:
+        i, j, node = node
+        pairs.append((i, j))
+    pairs.reverse()
+    return pairs
+
+
+class WordScorer:
+    """
+    Per-word status (correct / mispronounced / missed) and word accuracy.
+    Stateless, so one instance is shared.
+    """
+
+    def similar(self, expected: str, spoken: str) -> bool:
+        """Near match: a misrecognized or partly pronounced form of the expected word"""
+        if min(len(expected), len(spoken)) >= MIN_SUBSTRING_LENGTH and (expected in spoken or spoken in expected):
+            return True
+        return get_scoring_engine().ratio(expected, spoken) > MISPRONOUNCED_SIMILARITY
+
+    def score(self, expected_text: str, spoken_text: str,
+              expected_tokens: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Align spoken_text to expected_text word by word. Returns
+        {'words': [{'word', 'status', 'spoken', 'credit'}] (one per expected
+        word, original spelling), 'accuracy', 'extra_words'}. Tokens that are
+        only punctuation are marked correct and not scored. expected_tokens
+        are the cleaned words of expected_text when already known.
+        """
+        words = (expected_text or "").split()
+        expected = expected_tokens if expected_tokens is not None else [clean_word(w) for w in words]
+        spoken = [t for t in (clean_word(w) for w in (spoken_text or "").split()) if t]
+
+        scored = [i for i, token in enumerate(expected) if token]
+        matches = anchor_matches([expected[i] for i in scored], spoken)
+
+        results = [{'word': word, 'status': 'correct', 'spoken': None, 'credit': None} for word in words]
+        used = 0
+        previous = -1  # last spoken index consumed
+        pending: List[int] = []  # expected words since the last anchor
+        for position, (i, j) in enumerate(zip(scored, matches)):
+            if j is None:
+                pending.append(i)
+                if position < len(scored) - 1:
+                    continue
+                j = len(spoken)  # close the trailing gap
+            used += self._match_gap(pending, expected, spoken, previous + 1, j, results)
+            pending = []
+            if j < len(spoken):
+                results[i].update(status='correct', spoken=spoken[j], credit=CREDIT['correct'])
+                used += 1
+            previous = j
+
+        credits = [r['credit'] for r in results if r['credit'] is not None]
+        return {
+            'words': results,
+            'accuracy': sum(credits) / len(credits) if credits else 0.0,
+            'extra_words': len(spoken) - used
+        }
+
+    def _match_gap(self, pending, expected, spoken, start, end, results) -> int:
+        """Near-match the expected words of a gap to spoken[start:end] in order; returns spoken words used"""
+        cursor = start
+        used = 0
+        for i in pending:
+            result = results[i]
+            result.update(status='missed', credit=CREDIT['missed'])
+            for j in range(cursor, min(end, cursor + GAP_LOOKAHEAD + 1)):
+                if self.similar(expected[i], spoken[j]):
+                    result.update(status='mispronounced', spoken=spoken[j], credit=CREDIT['mispronounced'])
+                    cursor = j + 1
+                    used += 1
+                    break
+        return used
+
+
+def unordered_word_accuracy(expected: Sequence[str], spoken: Sequence[str]) -> float:
+    """
+    Word accuracy as computed before WordScorer (SCORING_MODE=compat):
+    each expected word takes the first spoken word equal to it (1.0) or
+    containing / contained in it (0.5), anywhere in the transcript
+    """
+    correct = 0.0
+    for exp_word in expected:
+        for spk_word in spoken:
+            if exp_word == spk_word:
+                correct += 1
+                break
+            elif exp_word in spk_word or spk_word in exp_word:
+                correct += 0.5
+                break
+    return correct / len(expected) if expected else 0
+
+
+def word_feedback(scored: Dict[str, Any]) -> List[Dict[str, str]]:
+    """The [{'word', 'status'}] list sent to the frontend"""
+    return [{'word': w['word'], 'status': w['status']} for w in scored['words']]
+
+
+_word_scorer = None
+
+
+def get_word_scorer() -> WordScorer:
+    """Process-wide word scorer"""
+    global _word_scorer
+    if _word_scorer is None:
+        _word_scorer = WordScorer()
+    return _word_scorer
@@ -0,0 +1,52 @@
+# backend/test_batching_parity.py
+"""
+Parity check of batched ASR inference against one clip at a time.
+
+Clips of different lengths go through Wav2Vec2PronunciationModel.batch_logits
+together and alone; logits and greedy CTC ids must match. Models without
+attention masks (wav2vec2-base) would differ if short clips were zero-padded
+next to long ones.
+
+    python test_batching_parity.py [model_name]
+"""
+import sys
+import numpy as np
+from models.wav2vec2_pronunciation_model import Wav2Vec2PronunciationModel
+
+MAX_ABS_DIFF = 1e-3
+
+
+def test_batching_parity(model_name="facebook/wav2vec2-base-960h"):
+    rng = np.random.default_rng(0)
+    model = Wav2Vec2PronunciationModel(model_name)
+
+    t = np.arange(64000) / 16000
+    speechlike = (0.3 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 3 * t)).astype(np.float32)
+    clips = [
+        speechlike[:16000],
+        speechlike,
+        rng.standard_normal(16000, dtype=np.float32) * 0.1,
+        rng.standard_normal(37123, dtype=np.float32) * 0.1,
+    ]
+
+    batched = model.batch_logits(clips)
+    failures = 0
+    for clip, logits in zip(clips, batched):
+        solo = model.batch_logits([clip])[0]
+        max_diff = float(np.abs(solo - logits).max()) if solo.shape == logits.shape else float('inf')
+        ids_match = solo.shape == logits.shape and np.array_equal(solo.argmax(-1), logits.argmax(-1))
+        ok = max_diff < MAX_ABS_DIFF and ids_match
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'} samples={len(clip)} logits={logits.shape} "
+              f"max_abs_diff={max_diff:.2e} greedy_ids_match={ids_match}")
+
+    assert failures == 0, f"{failures} batching parity check(s) failed"
+
+
+if __name__ == "__main__":
+    try:
+        test_batching_parity(*sys.argv[1:2])
+        print("Batching parity OK")
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
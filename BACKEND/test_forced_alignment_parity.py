@@ -0,0 +1,202 @@
+# backend/test_forced_alignment_parity.py
+"""
+Parity check of the forced-alignment evaluation strategy.
+
+- viterbi() against a plain Python CTC Viterbi (and torchaudio's
+  forced_align when installed) on random emissions: same path, same score
+- ForcedAligner on emissions built from known word timings: the timings
+  come back exactly, and a substituted word is the one marked down
+- Clips without the expected speech (silence, noise, flat emissions,
+  another sentence) score low, though the path still fits the frames
+- Word statuses of the 'forced_alignment' strategy against the
+  'transcribe' strategy's word scorer on the same clips
+
+    python test_forced_alignment_parity.py
+"""
+import math
+import sys
+import numpy as np
+from services.ctc_decoding import CTCDecoder, NEG_INF, log_softmax
+from services.forced_alignment import ForcedAligner, viterbi
+from services.word_scorer import get_word_scorer, word_feedback
+
+try:
+    import torch
+    from torchaudio.functional import forced_align
+except ImportError:
+    forced_align = None
+
+# facebook/wav2vec2-base-960h vocabulary, by id
+LABELS = ['<pad>', '<s>', '</s>', '<unk>', '|', 'E', 'T', 'A', 'O', 'N', 'I', 'H', 'S', 'R', 'D', 'L',
+          'U', 'M', 'W', 'C', 'F', 'G', 'Y', 'P', 'B', 'V', 'K', "'", 'X', 'J', 'Q', 'Z']
+FRAME_SECONDS = 0.02
+
+
+def reference_viterbi(log_probs, targets, blank):
+    """CTC Viterbi one cell at a time, same tie order as viterbi()"""
+    states = [blank]
+    for token in targets:
+        states += [token, blank]
+    n_states = len(states)
+    score = [[NEG_INF] * n_states for _ in log_probs]
+    move = [[0] * n_states for _ in log_probs]
+    score[0][0] = float(log_probs[0][states[0]])
+    if n_states > 1:
+        score[0][1] = float(log_probs[0][states[1]])
+    for t in range(1, len(log_probs)):
+        for s in range(n_states):
+            options = [score[t - 1][s]]
+            options.append(score[t - 1][s - 1] if s >= 1 else NEG_INF)
+            skip = s >= 2 and states[s] != blank and states[s] != states[s - 2]
+            options.append(score[t - 1][s - 2] if skip else NEG_INF)
+            best = max(range(3), key=lambda k: (options[k], -k))
+            move[t][s] = best
+            score[t][s] = options[best] + float(log_probs[t][states[s]])
+    s = n_states - 1 if n_states == 1 or score[-1][-1] >= score[-1][-2] else n_states - 2
+    total = score[-1][s]
+    path = []
+    for t in range(len(log_probs) - 1, -1, -1):
+        path.append(s)
+        s -= move[t][s]
+    return path[::-1], total
+
+
+def emissions(rng, segments, n_labels=len(LABELS)):
+    """Logits where each (token, frames) segment peaks at its token"""
+    frames = []
+    for token, count in segments:
+        for _ in range(count):
+            frame = rng.normal(0, 1, n_labels)
+            frame[token] += 12.0
+            frames.append(frame)
+    return np.array(frames, dtype=np.float32)
+
+
+def speak(rng, aligner, words, substitute=None):
+    """Emissions of words read aloud (one word replaced by substitute), and each word's frames"""
+    segments = [(0, 3)]
+    timings = []
+    frame = 3
+    for index, word in enumerate(words):
+        if index:
+            segments += [(aligner.delimiter_id, 1), (0, 2)]
+            frame += 3
+        said = substitute if substitute and index == 1 else word
+        start = frame
+        for i, char in enumerate(said.lower()):
+            if i and said[i - 1].lower() == char:
+                segments.append((0, 1))
+                frame += 1
+            count = int(rng.integers(1, 4))
+            segments.append((aligner.char_ids[char], count))
+            frame += count
+        timings.append((start, frame))
+    segments.append((0, 4))
+    return emissions(rng, segments), timings
+
+
+def test_viterbi_parity():
+    rng = np.random.default_rng(0)
+    failures = 0
+    for case in range(60):
+        n_targets = int(rng.integers(1, 12))
+        targets = rng.integers(1, 8, n_targets)
+        if case % 3 == 0 and n_targets > 1:
+            targets[1] = targets[0]  # repeated token needs a blank in between
+        n_frames = 2 * n_targets + int(rng.integers(1, 20))
+        log_probs = log_softmax(rng.normal(0, 2, (n_frames, 8)))
+        path, total = viterbi(log_probs, targets, 0)
+        expected_path, expected_total = reference_viterbi(log_probs, targets.tolist(), 0)
+        ok = path.tolist() == expected_path and math.isclose(total, expected_total, rel_tol=1e-5, abs_tol=1e-4)
+        if ok and forced_align is not None:
+            labels, _ = forced_align(torch.from_numpy(log_probs)[None], torch.from_numpy(targets)[None], blank=0)
+            tokens = [targets[(s - 1) // 2] if s % 2 else 0 for s in path.tolist()]
+            ok = labels[0].tolist() == tokens
+        failures += not ok
+    print(f"{'PASS' if failures == 0 else 'FAIL'} viterbi vs reference"
+          f"{' and torchaudio' if forced_align is not None else ''}: {60 - failures}/60")
+    assert failures == 0, f"{failures} forced alignment parity check(s) failed"
+
+
+def test_word_timings():
+    rng = np.random.default_rng(1)
+    aligner = ForcedAligner(LABELS, 0)
+    words = "the little book sees a happy red balloon".split()
+    failures = 0
+
+    logits, timings = speak(rng, aligner, words)
+    result = aligner.align(logits, " ".join(words), FRAME_SECONDS)
+    for word, (start, end) in zip(result['words'], timings):
+        ok = (word['start'], word['end']) == (round(start * FRAME_SECONDS, 3), round(end * FRAME_SECONDS, 3))
+        ok = ok and word['status'] == 'correct' and word['confidence'] > 0.99
+        failures += not ok
+    print(f"{'PASS' if failures == 0 else 'FAIL'} word timings, clean reading: score {result['score']}")
+
+    logits, _ = speak(rng, aligner, words, substitute="buck")
+    result = aligner.align(logits, " ".join(words), FRAME_SECONDS)
+    statuses = [w['status'] for w in result['words']]
+    ok = statuses[1] != 'correct' and statuses.count('correct') == len(words) - 1
+    failures += not ok
+    print(f"{'PASS' if ok else 'FAIL'} substituted word marked down: {statuses}")
+
+    too_short = aligner.align(logits[:5], " ".join(words), FRAME_SECONDS)
+    failures += too_short is not None
+    print(f"{'PASS' if too_short is None else 'FAIL'} clip too short for the text")
+    assert failures == 0, f"{failures} forced alignment parity check(s) failed"
+
+
+def test_non_speech_and_wrong_speech():
+    """Confidence is an absolute posterior: nothing heard, or something else heard, scores low"""
+    rng = np.random.default_rng(3)
+    aligner = ForcedAligner(LABELS, 0)
+    sentence = "the little book sees a happy red balloon"
+    silence = emissions(rng, [(0, 150)])
+    clips = {
+        'silence': silence,
+        'noise': rng.normal(0, 1, (150, len(LABELS))).astype(np.float32),
+        'flat': np.zeros((150, len(LABELS)), dtype=np.float32),
+        # Every frame undecided between blank and all letters
+        'uncertain': (silence * 0.05).astype(np.float32),
+        'other sentence': speak(rng, aligner, "we will go to the river tomorrow".split())[0],
+    }
+    failures = 0
+    for name, logits in clips.items():
+        result = aligner.align(logits, sentence, FRAME_SECONDS)
+        statuses = [w['status'] for w in result['words']]
+        ok = result['score'] < 0.2 and statuses.count('correct') <= 1
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'} {name}: score {result['score']} {statuses}")
+    assert failures == 0, f"{failures} forced alignment parity check(s) failed"
+
+
+def test_strategy_parity():
+    """Forced-alignment word statuses vs transcribe-then-score on the same logits"""
+    rng = np.random.default_rng(2)
+    aligner = ForcedAligner(LABELS, 0)
+    decoder = CTCDecoder(LABELS, 0, mode='greedy')
+    sentences = ["the cat sat on the mat", "we will go to the river tomorrow", "a bee sees three green trees"]
+    failures = 0
+    for sentence in sentences:
+        words = sentence.split()
+        for substitute in (None, "zzz"):
+            logits, _ = speak(rng, aligner, words, substitute=substitute)
+            aligned = [w['status'] for w in aligner.align(logits, sentence, FRAME_SECONDS)['words']]
+            spoken = decoder.greedy(logits)
+            transcribed = [w['status'] for w in word_feedback(get_word_scorer().score(sentence, spoken))]
+            # Both agree on which words were read correctly
+            ok = [s == 'correct' for s in aligned] == [s == 'correct' for s in transcribed]
+            failures += not ok
+            print(f"{'PASS' if ok else 'FAIL'} '{spoken}': aligned {aligned} transcribed {transcribed}")
+    assert failures == 0, f"{failures} forced alignment parity check(s) failed"
+
+
+if __name__ == "__main__":
+    try:
+        test_viterbi_parity()
+        test_word_timings()
+        test_non_speech_and_wrong_speech()
+        test_strategy_parity()
+        print("Forced alignment parity OK")
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,55 @@
+# backend/test_onnx_parity.py
+"""
+Parity check of the ONNX Runtime ASR backend against torch.
+
+Exports the model to a temporary file and compares logits and greedy CTC
+ids on clips of several lengths, batched and unbatched.
+
+    python test_onnx_parity.py [model_name]
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+from models.asr_backends import OnnxASRBackend, TorchASRBackend, export_onnx
+
+MAX_ABS_DIFF = 1e-3
+
+
+def test_onnx_parity(model_name="facebook/wav2vec2-base-960h"):
+    rng = np.random.default_rng(0)
+    torch_backend = TorchASRBackend(model_name, precision="fp32")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        onnx_path = export_onnx(model_name, os.path.join(tmp, "model.onnx"))
+        onnx_backend = OnnxASRBackend(model_name, onnx_path=onnx_path)
+
+        t = np.arange(48000) / 16000
+        speechlike = (0.3 * np.sin(2 * np.pi * 220 * t) * np.sin(2 * np.pi * 3 * t)).astype(np.float32)
+        batches = [
+            rng.standard_normal((1, 8000), dtype=np.float32) * 0.1,
+            rng.standard_normal((1, 37123), dtype=np.float32) * 0.1,
+            np.stack([speechlike, speechlike[::-1].copy()]),
+        ]
+
+        failures = 0
+        for batch in batches:
+            expected = torch_backend.logits(batch)
+            actual = onnx_backend.logits(batch)
+            max_diff = float(np.abs(expected - actual).max())
+            ids_match = np.array_equal(expected.argmax(-1), actual.argmax(-1))
+            ok = expected.shape == actual.shape and max_diff < MAX_ABS_DIFF and ids_match
+            failures += not ok
+            print(f"{'PASS' if ok else 'FAIL'} shape={tuple(batch.shape)} logits={actual.shape} "
+                  f"max_abs_diff={max_diff:.2e} greedy_ids_match={ids_match}")
+
+    assert failures == 0, f"{failures} ONNX parity check(s) failed"
+
+
+if __name__ == "__main__":
+    try:
+        test_onnx_parity(*sys.argv[1:2])
+        print("ONNX parity OK")
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
@@ -0,0 +1,100 @@
+# backend/test_vad.py
+"""
+Checks of the voice activity detector (services/vad.py) on synthetic clips:
+
+- Continuous speech (no pause anywhere) is kept whole: with no silence in
+  the clip there is no noise floor to measure against
+- Quiet speech, continuous or between silences, is kept
+- Silence around and between words is still cut
+- Broadband noise alone is not speech
+
+    python test_vad.py
+"""
+import sys
+import numpy as np
+from services.vad import VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+
+
+def voiced(seconds, level_db, rng, f0=140.0, syllable_hz=4.0, dip_db=12.0, trail_db=0.0):
+    """
+    Harmonic 'speech' at level_db dBFS whose syllables dip by up to dip_db
+    and whose voice trails off by trail_db towards the end
+    """
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * f0 * k * t + rng.uniform(0, 2 * np.pi)) / k for k in range(1, 12))
+    envelope_db = -dip_db * (0.5 - 0.5 * np.cos(2 * np.pi * syllable_hz * t)) - trail_db * t / seconds
+    wave = wave / np.sqrt(np.mean(wave ** 2)) * 10 ** (envelope_db / 20)
+    return (wave * 10 ** (level_db / 20)).astype(np.float32)
+
+
+def noise(seconds, level_db, rng):
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 10 ** (level_db / 20)).astype(np.float32)
+
+
+def kept_fraction(vad, audio, start, end):
+    """Fraction of audio[start:end] (in samples) inside detected speech"""
+    covered = np.zeros(len(audio), dtype=bool)
+    for s, e in vad.segments(audio):
+        covered[s:e] = True
+    return float(covered[start:end].mean())
+
+
+def test_continuous_speech():
+    rng = np.random.default_rng(0)
+    vad = VoiceActivityDetector()
+    failures = 0
+    for level_db, trail_db in ((-20, 0), (-20, 15), (-30, 20), (-40, 10)):
+        speech = voiced(3.0, level_db, rng, trail_db=trail_db) + noise(3.0, -80, rng)
+        fraction = kept_fraction(vad, speech, 0, len(speech))
+        ok = fraction > 0.97
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'} continuous speech at {level_db} dBFS trailing off {trail_db} dB: "
+              f"{fraction:.1%} kept")
+    assert failures == 0, f"{failures} VAD check(s) failed"
+
+
+def test_speech_between_silences():
+    rng = np.random.default_rng(1)
+    vad = VoiceActivityDetector()
+    failures = 0
+    for level_db, noise_db in ((-20, -70), (-45, -75), (-25, -50)):
+        silence = int(1.0 * SAMPLE_RATE)
+        word = voiced(0.8, level_db, rng)
+        audio = np.concatenate([np.zeros(silence, np.float32), word, np.zeros(silence, np.float32),
+                                word, np.zeros(silence, np.float32)])
+        audio = audio + noise(len(audio) / SAMPLE_RATE, noise_db, rng)
+        words_kept = min(kept_fraction(vad, audio, silence, silence + len(word)),
+                         kept_fraction(vad, audio, 2 * silence + len(word), 2 * silence + 2 * len(word)))
+        trimmed = vad.remove_silence(audio, max_pause_seconds=0.5, padding_seconds=0.1)
+        # Two words plus at most the padding and hangover around each
+        margin = 2 * int(0.1 * SAMPLE_RATE) + vad.hangover_frames * vad.hop_length + vad.frame_length
+        ok = words_kept > 0.97 and len(trimmed) <= 2 * (len(word) + margin)
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'} speech at {level_db} dBFS, noise at {noise_db} dBFS: "
+              f"{words_kept:.1%} of words kept, {len(audio) / SAMPLE_RATE:.1f}s -> {len(trimmed) / SAMPLE_RATE:.2f}s")
+    assert failures == 0, f"{failures} VAD check(s) failed"
+
+
+def test_noise_only():
+    rng = np.random.default_rng(2)
+    vad = VoiceActivityDetector()
+    failures = 0
+    for level_db in (-60, -40, -25):
+        segments = vad.segments(noise(2.0, level_db, rng))
+        ok = not segments
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'} noise only at {level_db} dBFS: {len(segments)} segment(s)")
+    assert failures == 0, f"{failures} VAD check(s) failed"
+
+
+if __name__ == "__main__":
+    try:
+        test_continuous_speech()
+        test_speech_between_silences()
+        test_noise_only()
+        print("VAD checks OK")
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)